@@ -0,0 +1,164 @@
+"""
+Response cache for Gemini market analyses.
+
+Analyses are keyed on a fingerprint of the quantized market data, the
+hashes of the news titles and the model name, so a request whose inputs
+only moved by a few rupees reuses the previous recommendation. Entries live
+in an in-memory TTL/LRU cache with an optional JSON-file tier on disk
+(AI_CACHE_DIR) that survives restarts and is shared between workers.
+"""
+import hashlib
+import json
+import os
+import time
+
+from ttl_cache import TTLCache
+
+AI_CACHE_TTL = float(os.getenv("AI_CACHE_TTL", "900"))  # seconds
+AI_CACHE_SIZE = int(os.getenv("AI_CACHE_SIZE", "64"))
+AI_CACHE_DIR = os.getenv("AI_CACHE_DIR")  # unset disables the disk tier
+
+# Bucket sizes used when fingerprinting market data
+PRICE_BUCKET = float(os.getenv("AI_CACHE_PRICE_BUCKET", "500"))  # INR
+PERCENT_BUCKET = 0.5
+RSI_BUCKET = 5.0
+EXCHANGE_RATE_BUCKET = 0.1
+ZSCORE_BUCKET = 0.5
+PERCENTILE_BUCKET = 10.0
+
+_PERCENT_KEYS = {
+    "premium_percent", "premium_mean_percent", "price_change_7d", "price_change_30d",
+    "usd_index_change", "gold_change",
+}
+
+
+def _bucket(value, step):
+    return round(float(value) / step) * step
+
+
+def quantize_market_data(data, key=None):
+    """Round every number in `data` to its bucket so small moves compare equal"""
+    if isinstance(data, dict):
+        return {k: quantize_market_data(v, k) for k, v in sorted(data.items())}
+    if isinstance(data, (list, tuple)):
+        return [quantize_market_data(v, key) for v in data]
+    if isinstance(data, bool) or not isinstance(data, (int, float)):
+        return data
+    if key in _PERCENT_KEYS:
+        return _bucket(data, PERCENT_BUCKET)
+    if key == "rsi":
+        return _bucket(data, RSI_BUCKET)
+    if key == "exchange_rate":
+        return _bucket(data, EXCHANGE_RATE_BUCKET)
+    if key == "premium_zscore":
+        return _bucket(data, ZSCORE_BUCKET)
+    if key == "premium_percentile":
+        return _bucket(data, PERCENTILE_BUCKET)
+    return _bucket(data, PRICE_BUCKET)
+
+
+def analysis_fingerprint(market_data, news_articles, model):
+    """Stable hash of everything that should change the AI's answer"""
+    titles = sorted(
+        hashlib.sha1(article["title"].encode("utf-8")).hexdigest()
+        for article in news_articles if article.get("title")
+    )
+    payload = json.dumps(
+        {"market": quantize_market_data(market_data), "news": titles, "model": model},
+        sort_keys=True, default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class AnalysisCache:
+    """Memory TTL/LRU cache backed by an optional directory of JSON files"""
+
+    def __init__(self, ttl=AI_CACHE_TTL, maxsize=AI_CACHE_SIZE, directory=AI_CACHE_DIR):
+        self.ttl = ttl
+        self.memory = TTLCache(maxsize=maxsize, name="ai_analysis")
+        self.directory = directory
+        self.disk_hits = 0
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def _read_disk(self, key):
+        if not self.directory:
+            return None
+        try:
+            with open(self._path(key), encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if time.time() - entry["created_at"] > self.ttl:
+            return None
+        return entry
+
+    def _write_disk(self, key, entry):
+        if not self.directory:
+            return
+        tmp_path = f"{self._path(key)}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(entry, f)
+            os.replace(tmp_path, self._path(key))  # atomic for concurrent workers
+        except OSError as e:
+            print(f"Error writing AI cache entry: {e}")
+
+    def _promote(self, key, entry):
+        """Keep a disk entry in memory only for what is left of its TTL"""
+        remaining = self.ttl - (time.time() - entry["created_at"])
+        if remaining > 0:
+            self.memory.set(key, entry, remaining)
+
+    def get_or_generate(self, key, generate):
+        """
+        Return (text, cached, age_seconds) for `key`, calling `generate()` on a miss.
+
+        Concurrent misses for the same key share one `generate()` call, and
+        every caller that waited on it gets cached=False; exceptions
+        propagate and are not cached.
+        """
+        hit = self.memory.get(key)
+        if hit is not None:
+            return hit["text"], True, round(time.time() - hit["created_at"], 1)
+
+        def load():
+            stored = self.memory.get_entry(key)  # filled while we raced for the flight
+            if stored is not None:
+                return stored[0], False
+            entry = self._read_disk(key)
+            if entry is not None:
+                self.disk_hits += 1
+                self._promote(key, entry)
+                return entry, False
+            entry = {"text": generate(), "created_at": time.time()}
+            self.memory.set(key, entry, self.ttl)
+            self._write_disk(key, entry)
+            return entry, True
+
+        entry, generated = self.memory.load_once(key, load)
+        return entry["text"], not generated, round(time.time() - entry["created_at"], 1)
+
+    def peek(self, key):
+        """Cached text for `key` without generating, or None"""
+        hit = self.memory.get(key)
+        if hit is not None:
+            return hit["text"]
+        entry = self._read_disk(key)
+        if entry is not None:
+            self.disk_hits += 1
+            self._promote(key, entry)
+            return entry["text"]
+        return None
+
+    def put(self, key, text):
+        """Store a complete analysis produced outside get_or_generate"""
+        entry = {"text": text, "created_at": time.time()}
+        self.memory.set(key, entry, self.ttl)
+        self._write_disk(key, entry)
+
+    def stats(self):
+        return {**self.memory.stats(), "disk_hits": self.disk_hits, "disk_tier": bool(self.directory)}
@@ -1,103 +1,328 @@
 import os
-from flask import Flask, jsonify, request
+import time
+from flask import Flask, Response, jsonify, request, stream_with_context
 from flask_cors import CORS
-from playwright.sync_api import sync_playwright
-import requests
 from dotenv import load_dotenv
+from concurrent.futures import wait
 from datetime import datetime
-import feedparser
 
 # Import technical analysis functions
 from technical_analysis import (
     get_usd_to_inr_rate, 
     convert_usd_to_inr, 
     get_complete_market_analysis,
-    calculate_premium_analysis
+    build_market_data,
+    stream_ai_analysis,
+    calculate_premium_analysis,
+    fetch_market_data,
+    market_data_cache,
+    ai_analysis_cache,
+    get_gemini_model,
+    get_ohlcv_store,
+    get_stored_inr_closes,
+    get_intraday_series,
+    get_intraday_bars,
+    get_timeframe_indicators,
+    RETAIL_SERIES,
+    SILVER_SYMBOL,
+    USD_INR_SYMBOL
 )
+from browser_pool import get_browser_pool
+from price_feed import PriceFeed
+from tick_ring import TickRing
+from premium_series import PREMIUM_HISTORY_PAGE, PREMIUM_SIGNAL_WINDOW, PremiumSeries
+from chart_data import CHART_DEFAULT_POINTS, ChartData
+from intraday_bars import TIMEFRAMES
+from price_stream import EventHub, TradeEventRelay, format_event, publish_snapshot, sse_response
+from http_client import get_session, get_executor, fetch_parsed
+from jobs import JobRunner, QueueFullError
+from trade_ledger import HISTORY_PAGE_SIZE, TradeLedger
+from trigger_engine import TriggerEngine
+from metrics import REGISTRY, SCRAPE_RESULTS, STAGE_SECONDS, count_fallback, init_app, timed, timed_function
+from html_select import select_text
+from lazy_imports import lazy_import, warm_up
+from price_resolver import PriceResolver
+from news_index import NewsIndex, NewsRefresher, article_key, parse_published
+
+feedparser = lazy_import("feedparser")
+np = lazy_import("numpy")
 
 load_dotenv()
 
 app = Flask(__name__)
 CORS(app)
+init_app(app)
 
 NEWS_API_KEY = os.getenv("NEWS_API_KEY")
 
-# ✅ Store active trades and completed trades
-active_trades = {}
-completed_trades = []
-total_pnl = 0
+# ✅ Trades are persisted in SQLite and shared by every worker process
+trade_ledger = TradeLedger()
 
+# ✅ Deduplicated articles from every feed, newest first
+news_index = NewsIndex()
 
-def get_latest_price():
-    """Scrape current silver price from shankarsilvermart.in with fallback methods"""
+
+SPOT_DATA_NEEDS = {SILVER_SYMBOL: "1d", USD_INR_SYMBOL: "1d"}
+
+SHANKAR_URL = "http://www.shankarsilvermart.in/"
+SHANKAR_RATE_SELECTOR = "div#divProduct td.p-h.ph.product-rate div.mn-rate-cover span.bgm.e"
+SHANKAR_HTTP_TIMEOUT = float(os.getenv("SHANKAR_HTTP_TIMEOUT", "5"))  # seconds
+# Allowed distance of a scraped rate from the spot-derived estimate (fraction)
+SHANKAR_SANITY_BAND = float(os.getenv("SHANKAR_SANITY_BAND", "0.3"))
+# Typical retail premium over spot, used for the estimate
+RETAIL_PREMIUM_FACTOR = 1.0851
+
+
+def scrape_shankar_rate(page):
+    """Read the rate cells from a pooled page, refreshing it if already loaded"""
+    if page.url.startswith(SHANKAR_URL):
+        page.reload(wait_until="networkidle")
+    else:
+        page.goto(SHANKAR_URL, wait_until="networkidle")
+    page.wait_for_selector(SHANKAR_RATE_SELECTOR)
+    return [el.inner_text() for el in page.query_selector_all(SHANKAR_RATE_SELECTOR)]
+
+
+def get_retail_estimate():
+    """Spot-derived retail price in INR/kg, or None when the spot quote is unavailable"""
+    spot = get_spot_quote()
+    if spot["spot_usd"] is None:
+        return None
+    spot_inr_per_kg = spot["spot_usd"] * 32.15 * spot["exchange_rate"]
+    return int(spot_inr_per_kg * RETAIL_PREMIUM_FACTOR)
+
+
+def parse_shankar_rate(price_values):
+    """Rupee rate from the scraped cells (the last one is the 1 kg sell rate), or None"""
+    last_val = price_values[-1] if price_values else "--"
+    digits = last_val.replace(",", "").strip()
+    return int(digits) if digits.isdigit() else None
+
+
+def is_plausible_rate(price, estimate):
+    """Reject parses that are far from the spot-derived estimate (e.g. a wrong cell)"""
+    if estimate is None:
+        return price > 0
+    return abs(price - estimate) <= estimate * SHANKAR_SANITY_BAND
+
+
+def fetch_shankar_rate_http(estimate):
+    """Fast path: plain GET on the pooled session and a streaming parse of the rate cells"""
+    response = get_session().get(SHANKAR_URL, timeout=SHANKAR_HTTP_TIMEOUT)
+    response.raise_for_status()
+    price = parse_shankar_rate(select_text(response.text, SHANKAR_RATE_SELECTOR))
+    if price is None:
+        raise ValueError("no rate in the static page")
+    if not is_plausible_rate(price, estimate):
+        raise ValueError(f"rate {price} is implausible against the spot estimate {estimate}")
+    return price
+
+
+def fetch_shankar_rate_browser():
+    """Slow path: render the page in a pooled Chromium tab"""
+    price = parse_shankar_rate(get_browser_pool().run(scrape_shankar_rate))
+    if price is None:
+        raise ValueError("no rate on the rendered page")
+    return price
+
+
+def try_scrape_path(path, fetch):
+    """Run one scrape path, recording its outcome; returns the price or None"""
     try:
-        with sync_playwright() as p:
-            browser = p.chromium.launch(headless=True)
-            page = browser.new_page()
-            page.goto("http://www.shankarsilvermart.in/", wait_until="networkidle")
-            page.wait_for_selector(
-                "div#divProduct td.p-h.ph.product-rate div.mn-rate-cover span.bgm.e"
-            )
-            prices = page.query_selector_all(
-                "div#divProduct td.p-h.ph.product-rate div.mn-rate-cover span.bgm.e"
-            )
-            price_values = [el.inner_text() for el in prices]
-            browser.close()
-
-            last_val = price_values[-1] if price_values else "--"
-            if last_val != "--":
-                return {"currVal": int(last_val.replace(",", ""))}
+        with timed("scrape", path):
+            price = fetch()
+    except ValueError as e:
+        print(f"Scrape via {path} rejected: {e}")
+        SCRAPE_RESULTS.inc(path, "invalid")
+        return None
     except Exception as e:
-        print(f"Error scraping shankarsilvermart.in: {e}")
-    
-    # Fallback: Calculate approximate retail price based on spot + premium
+        print(f"Error scraping shankarsilvermart.in via {path}: {e}")
+        SCRAPE_RESULTS.inc(path, "error")
+        return None
+    SCRAPE_RESULTS.inc(path, "ok")
+    return price
+
+
+def scrape_path_stats():
+    """Attempts, success rate and mean latency of each scrape path"""
+    stats = {}
+    for path in ("http", "browser"):
+        outcomes = {outcome: SCRAPE_RESULTS.get(path, outcome) for outcome in ("ok", "invalid", "error")}
+        attempts = sum(outcomes.values())
+        timings = STAGE_SECONDS.count("scrape", path)
+        stats[path] = {
+            "attempts": attempts,
+            **outcomes,
+            "success_rate": round(outcomes["ok"] / attempts, 3) if attempts else None,
+            "avg_ms": round(STAGE_SECONDS.total("scrape", path) / timings * 1000, 1) if timings else None,
+        }
+    return stats
+
+
+def fetch_shankar_rate():
+    """Rate from shankarsilvermart.in: cheap HTTP parse first, the browser only when it fails validation"""
     try:
-        print("Using fallback method for price calculation...")
-        import yfinance as yf
-        
-        exchange_rate = get_usd_to_inr_rate()
-        silver_data = yf.download("SI=F", period="1d", interval="1d", auto_adjust=False)
-        
-        if not silver_data.empty:
-            if hasattr(silver_data.columns, 'levels'):  # MultiIndex check
-                silver_data.columns = silver_data.columns.droplevel(1)
-            
-            if "Close" in silver_data.columns:
-                spot_usd_per_ounce = float(silver_data["Close"].iloc[-1])
-                spot_inr_per_kg = spot_usd_per_ounce * 32.15 * exchange_rate
-                
-                # Add typical retail premium (6-8%)
-                retail_price = int(spot_inr_per_kg * 1.0851)  # 7% premium
-                print(f"Calculated retail price: ₹{retail_price:,}/kg")
-                return {"currVal": retail_price}
+        estimate = get_retail_estimate()
     except Exception as e:
-        print(f"Fallback method failed: {e}")
-    
-    # Last resort fallback
-    return {"currVal": 116000}
+        print(f"Spot estimate unavailable: {e}")
+        estimate = None
+
+    price = try_scrape_path("http", lambda: fetch_shankar_rate_http(estimate))
+    if price is None:
+        price = try_scrape_path("browser", fetch_shankar_rate_browser)
+    if price is None:
+        raise ValueError("no valid rate from shankarsilvermart.in")
+    return price
+
+
+# ✅ The scrape gets a head start; if it is slow the spot+premium estimate races it
+price_resolver = PriceResolver(
+    [("shankar", fetch_shankar_rate), ("spot_estimate", get_retail_estimate)],
+    default=116000,
+    validate=lambda price: isinstance(price, int) and price > 0,
+)
+
+
+@timed_function("get_latest_price")
+def get_latest_price():
+    """Current retail silver price (INR/kg) and the source that produced it"""
+    price, source = price_resolver.resolve()
+    if source == "spot_estimate":
+        print(f"Calculated retail price: ₹{price:,}/kg")
+        count_fallback("retail_estimate")
+    elif source == "default":
+        count_fallback("retail_default")
+    return {"currVal": price, "source": source}
+
+
+
+def get_spot_quote():
+    """Fetch COMEX silver spot (USD/oz) and the USD/INR rate in one download"""
+    bundle = fetch_market_data(SPOT_DATA_NEEDS)
+    exchange_rate = get_usd_to_inr_rate(bundle)
+    data = bundle[SILVER_SYMBOL]
+
+    spot_usd = None
+    if "Close" in data.columns and not data.empty:
+        spot_usd = float(data["Close"].iloc[-1])
+
+    return {"spot_usd": spot_usd, "exchange_rate": exchange_rate}
+
+
+# ✅ Latest quote is refreshed in the background and served from memory;
+# one elected worker fetches upstream and the rest read its ticks from shared memory
+price_feed = PriceFeed(get_latest_price, get_spot_quote, ring=TickRing())
+
+# ✅ One upstream refresh fans out to every /price-stream subscriber
+event_hub = EventHub()
+price_feed.subscribe(lambda snapshot: publish_snapshot(event_hub, snapshot))
+# ✅ Buys, sells and trigger auto-closes from any worker reach this worker's
+# subscribers through the ledger's trade events
+trade_events = TradeEventRelay(event_hub, trade_ledger)
+
+# ✅ Every quote's premium feeds rolling mean/std/z-score/percentile series,
+# seeded from the shared tick ring so restarts and new workers keep the history
+premium_series = PremiumSeries()
+for tick in price_feed.ring.recent(price_feed.ring.capacity):
+    premium_series.observe_quote(tick["ts"], tick["retail_price"], tick["spot_usd"], tick["exchange_rate"],
+                                 tick["retail_source"])
+
+
+def record_premium(snapshot):
+    """Price feed listener: add the quote's premium to the rolling series"""
+    ts = datetime.fromisoformat(snapshot["as_of"]).timestamp()
+    premium_series.observe_quote(ts, snapshot.get("retail_price"), snapshot.get("spot_usd"),
+                                 snapshot.get("exchange_rate"), snapshot.get("retail_source"))
+
+
+price_feed.subscribe(record_premium)
+
+# ✅ Retail and spot quotes are folded into 1m bars; 5m/15m/1h/1d views are
+# resampled from them in memory, so no timeframe needs its own download
+retail_bars = get_intraday_series(RETAIL_SERIES)
+for tick in price_feed.ring.recent(price_feed.ring.capacity):
+    retail_bars.add_tick(tick["ts"], tick["retail_price"])
+
+INTRADAY_CHART_DAYS = 7  # chart ranges up to this long are drawn from 1m bars
+
+
+def record_bars(snapshot):
+    """Price feed listener: fold the quote into the retail and spot 1m bars"""
+    ts = datetime.fromisoformat(snapshot["as_of"]).timestamp()
+    retail_bars.add_tick(ts, snapshot.get("retail_price"))
+    get_intraday_series(SILVER_SYMBOL, refresh=False).add_tick(ts, snapshot.get("spot_usd"))
+
+
+price_feed.subscribe(record_bars)
+
+
+def get_exchange_rate():
+    return get_usd_to_inr_rate(fetch_market_data(SPOT_DATA_NEEDS))
+
+
+def load_spot_chart(days):
+    """Silver in INR/kg as (epoch seconds, prices): 1m bars for short ranges, stored daily closes otherwise"""
+    if days <= INTRADAY_CHART_DAYS:
+        bars = get_intraday_bars(SILVER_SYMBOL, "1m", since=time.time() - days * 86400, refresh=False)
+        if not bars.empty:
+            # Intraday bars are converted at the current USD/INR rate
+            return bars.index.as_unit("s").asi8, bars["Close"].to_numpy() * 32.15 * get_exchange_rate()
+    closes = get_stored_inr_closes(days)
+    return closes.index.as_unit("s").asi8, closes.to_numpy()
+
+
+def load_retail_chart(days):
+    """Retail quotes from the 1m bars as (epoch seconds, prices)"""
+    ts, columns = retail_bars.bars("1m", since=time.time() - days * 86400)
+    return ts, columns["close"]
+
+
+def spot_chart_version(days):
+    """Changes when the data behind a `days` chart does; ticks only move the intraday ranges"""
+    store = get_ohlcv_store()
+    version = (store.last_timestamp(SILVER_SYMBOL), store.last_timestamp(USD_INR_SYMBOL))
+    if days <= INTRADAY_CHART_DAYS:
+        version += (get_intraday_series(SILVER_SYMBOL, refresh=False).version,)
+    return version
+
+
+# ✅ Chart series are downsampled from cached LTTB pyramids, rebuilt only when new data lands
+chart_data = ChartData({
+    "spot": (spot_chart_version, load_spot_chart),
+    "retail": (lambda days: retail_bars.version, load_retail_chart),
+})
+
+# ✅ Targets and stop losses are enforced server-side on every price tick
+# (only the feed leader watches trades; it loads them on its first tick)
+trigger_engine = TriggerEngine(lambda trade_id, price, reason: close_trade_position(trade_id, price, reason))
+
+
+def check_triggers(snapshot):
+    """Price feed listener: close positions whose target or stop was crossed"""
+    trigger_engine.sync(trade_ledger)
+    for trade in trigger_engine.on_snapshot(snapshot):
+        print(f"{trade['trade_id']} closed at {trade['sell_price']} ({trade['reason']})")
+
+
+price_feed.subscribe(check_triggers, leader_only=True)
 
+# ✅ Slow AI analyses run off the request thread on a bounded pool
+ai_jobs = JobRunner(name="ai-analysis")
 
 
 def get_prices_with_premium():
     """Get retail and spot prices with premium calculation"""
     try:
-        # Retail Price (from bullion site)
-        retail_data = get_latest_price()
-        retail_price = retail_data.get("currVal", 0)
+        snapshot = price_feed.snapshot()
+        if not snapshot:
+            return {"error": "Price feed unavailable"}
 
-        # COMEX Spot Price (from Yahoo Finance)
-        exchange_rate = get_usd_to_inr_rate()
-        
-        import yfinance as yf
-        data = yf.download("SI=F", period="1d", interval="1d", auto_adjust=False)
-
-        if hasattr(data.columns, 'levels'):  # MultiIndex check
-            data.columns = data.columns.droplevel(1)
+        retail_price = snapshot.get("retail_price") or 0
 
-        if "Close" not in data.columns or data.empty:
+        if snapshot.get("spot_usd") is None:
             return {"error": "Unable to fetch spot price"}
 
-        comex_price_inr = float(data["Close"].iloc[-1]) * 32.15 * exchange_rate
+        comex_price_inr = snapshot["spot_usd"] * 32.15 * snapshot["exchange_rate"]
 
         # Premium Difference
         premium_diff = retail_price - comex_price_inr
@@ -105,65 +330,120 @@ def get_prices_with_premium():
 
         return {
             "retail_price": round(retail_price, 2),
+            "retail_source": snapshot.get("retail_source"),
             "spot_price": round(comex_price_inr, 2),
             "premium_diff": round(premium_diff, 2),
-            "premium_percent": round(premium_percent, 2)
+            "premium_percent": round(premium_percent, 2),
+            "as_of": snapshot["as_of"],
+            "stale": snapshot["stale"]
         }
 
     except Exception as e:
         return {"error": str(e)}
 
-def get_silver_news():
-    """Fetch silver-specific news from reliable RSS sources"""
-    news_sources = [
-        {
-            "name": "Money Metals Exchange",
-            "url": "https://www.moneymetals.com/news/rss",
-            "weight": 0.4
-        },
-        {
-            "name": "Gold Silver",
-            "url": "https://goldsilver.com/feed/",
-            "weight": 0.3
-        },
-        {
-            "name": "Silver News",
-            "url": "https://www.silvernews.com/feed/",
-            "weight": 0.3
-        }
-    ]
-    
-    all_articles = []
-    
-    for source in news_sources:
-        try:
-            # Set timeout and user agent for RSS feeds
-            headers = {'User-Agent': 'Mozilla/5.0 (compatible; RSS Reader)'}
-            response = requests.get(source["url"], headers=headers, timeout=10)
-            
-            if response.status_code == 200:
-                feed = feedparser.parse(response.content)
-                
-                for entry in feed.entries[:3]:  # Top 3 from each source
-                    # Filter silver-related articles
-                    title_lower = entry.title.lower() if hasattr(entry, 'title') else ''
-                    summary_lower = entry.get('summary', '').lower()
-                    
-                    if any(keyword in title_lower + summary_lower for keyword in ['silver', 'precious metals', 'commodity', 'bullion', 'gold']):
-                        all_articles.append({
-                            'title': entry.title if hasattr(entry, 'title') else 'No title',
-                            'description': entry.get('summary', 'No description')[:200],  # Limit description length
-                            'source': source["name"],
-                            'published': entry.get('published', ''),
-                            'weight': source["weight"]
-                        })
-        except Exception as e:
-            print(f"Error fetching from {source['name']}: {e}")
+NEWS_SOURCES = [
+    {
+        "name": "Money Metals Exchange",
+        "url": "https://www.moneymetals.com/news/rss",
+        "weight": 0.4
+    },
+    {
+        "name": "Gold Silver",
+        "url": "https://goldsilver.com/feed/",
+        "weight": 0.3
+    },
+    {
+        "name": "Silver News",
+        "url": "https://www.silvernews.com/feed/",
+        "weight": 0.3
+    }
+]
+
+NEWS_KEYWORDS = ['silver', 'precious metals', 'commodity', 'bullion', 'gold']
+
+# Overall budget for all RSS sources together
+NEWS_DEADLINE = float(os.getenv("NEWS_DEADLINE", "8"))
+# Articles returned by /news and fed to the AI analysis
+NEWS_LIMIT = 8
+
+
+def parse_feed_articles(content, source):
+    """Parse an RSS body into index rows for the entries the news index has not seen yet"""
+    feed = feedparser.parse(content)
+    entries = []
+    for entry in feed.entries:
+        title = entry.title if hasattr(entry, 'title') else 'No title'
+        description = entry.get('summary', 'No description')[:200]  # Limit description length
+        entries.append((article_key(title, description), entry, title, description))
+
+    # Only unseen entries are keyword-checked; seen ones are already indexed
+    known = news_index.known_keys(key for key, _, _, _ in entries)
+    articles = []
+    for key, entry, title, description in entries:
+        if key in known:
             continue
-    
-    # Sort by publication date and return top 8
-    all_articles.sort(key=lambda x: x.get('published', ''), reverse=True)
-    return all_articles[:8]
+        text = (title + entry.get('summary', '')).lower()
+        published = entry.get('published', '')
+        articles.append({
+            'key': key,
+            'published_ts': parse_published(published, entry.get('published_parsed')) or time.time(),
+            'relevant': int(any(keyword in text for keyword in NEWS_KEYWORDS)),
+            'title': title,
+            'description': description,
+            'source': source["name"],
+            'published': published,
+            'weight': source["weight"]
+        })
+    return articles
+
+
+def fetch_source_articles(source, timeout):
+    """Conditional fetch of one RSS source; unchanged feeds are not re-parsed"""
+    with timed("rss", source["name"]):
+        return fetch_parsed(source["url"], lambda content: parse_feed_articles(content, source), timeout=timeout)
+
+
+def ingest_news():
+    """Fetch every RSS source in parallel and add unseen articles to the news index"""
+    executor = get_executor()
+    futures = {
+        executor.submit(fetch_source_articles, source, NEWS_DEADLINE): source
+        for source in NEWS_SOURCES
+    }
+    done, not_done = wait(futures, timeout=NEWS_DEADLINE)
+
+    added = 0
+    for future, source in futures.items():
+        if future in done:
+            try:
+                added += news_index.add(future.result())
+                continue
+            except Exception as e:
+                print(f"Error fetching from {source['name']}: {e}")
+        else:
+            print(f"Timed out fetching from {source['name']}")
+        # The index keeps serving what this feed returned earlier
+        count_fallback("news_cached_feed")
+    news_index.prune()
+    return added
+
+
+# ✅ Only the feed leader fetches RSS; other workers read the shared index
+news_refresher = NewsRefresher(ingest_news, is_leader=price_feed.is_leader)
+
+
+def get_silver_news():
+    """Newest silver-related articles from the rolling news index"""
+    news_refresher.start()
+    if news_index.count() == 0:
+        # Nothing indexed yet: wait for the first pass (the leader's, on a follower)
+        if price_feed.is_leader():
+            news_refresher.run()
+        else:
+            deadline = time.monotonic() + NEWS_DEADLINE
+            while news_index.count() == 0 and time.monotonic() < deadline:
+                time.sleep(0.2)
+    return news_index.latest(NEWS_LIMIT)
 
 def get_fallback_news():
     """Fallback to NewsAPI if RSS feeds fail"""
@@ -177,7 +457,7 @@ def get_fallback_news():
         f"apiKey={NEWS_API_KEY}"
     )
     try:
-        res = requests.get(url)
+        res = get_session().get(url, timeout=10)
         news_data = res.json().get("articles", [])
         return [
             {
@@ -193,6 +473,11 @@ def get_fallback_news():
         print(f"NewsAPI also failed: {e}")
         return []
 
+def warm_up_worker():
+    """Import the heavy SDKs and configure Gemini off the request path (see gunicorn.conf.py)"""
+    return warm_up(then=get_gemini_model)
+
+
 # ===== FLASK ROUTES =====
 
 @app.route("/prices", methods=["GET"])
@@ -205,29 +490,55 @@ def get_prices():
 def silver_price():
     """Get current silver price"""
     try:
-        price = get_latest_price()
-        return jsonify(price)
+        snapshot = price_feed.snapshot()
+        if not snapshot or snapshot.get("retail_price") is None:
+            count_fallback("retail_default")
+            return jsonify({"currVal": 116000, "source": "default", "stale": True})
+        return jsonify({
+            "currVal": snapshot["retail_price"],
+            "source": snapshot.get("retail_source"),
+            "as_of": snapshot["as_of"],
+            "stale": snapshot["stale"]
+        })
     except Exception as e:
-        return jsonify({"error": str(e), "currVal": 116000}), 200
+        count_fallback("retail_default")
+        return jsonify({"error": str(e), "currVal": 116000, "source": "default"}), 200
+
+@app.route("/price-stream", methods=["GET"])
+def price_stream():
+    """Stream price, premium and trade events as Server-Sent Events"""
+    price_feed.start()
+    trade_events.start()
+    return sse_response(event_hub, request)
+
+def get_analysis_inputs():
+    """Current retail price and news articles for an AI analysis"""
+    # Get current retail price from the background feed
+    snapshot = price_feed.snapshot()
+    retail_price = snapshot["retail_price"] if snapshot else get_latest_price()["currVal"]
+    
+    # Get news articles
+    news_articles = get_silver_news()
+    
+    # Fallback to NewsAPI if RSS feeds fail
+    if not news_articles:
+        print("RSS feeds failed, falling back to NewsAPI...")
+        count_fallback("news_newsapi")
+        news_articles = get_fallback_news()
+    return retail_price, news_articles
+
+def run_ai_analysis():
+    """Full analysis pipeline: inputs, market data and the AI recommendation"""
+    retail_price, news_articles = get_analysis_inputs()
+    
+    # Get complete market analysis from technical_analysis module
+    return get_complete_market_analysis(retail_price, news_articles, premium_series.signal())
 
 @app.route("/ai-analysis", methods=["GET"])
 def ai_analysis():
     """Get comprehensive AI-powered market analysis"""
     try:
-        # Get current retail price
-        price_data = get_latest_price()
-        retail_price = price_data["currVal"]
-        
-        # Get news articles
-        news_articles = get_silver_news()
-        
-        # Fallback to NewsAPI if RSS feeds fail
-        if not news_articles:
-            print("RSS feeds failed, falling back to NewsAPI...")
-            news_articles = get_fallback_news()
-        
-        # Get complete market analysis from technical_analysis module
-        analysis_result = get_complete_market_analysis(retail_price, news_articles)
+        analysis_result = run_ai_analysis()
         
         if "error" in analysis_result:
             return jsonify(analysis_result), 500
@@ -238,6 +549,67 @@ def ai_analysis():
         print(f"AI Analysis Error: {e}")
         return jsonify({"error": str(e)}), 500
 
+@app.route("/ai-analysis/jobs", methods=["POST"])
+def submit_ai_analysis_job():
+    """Queue an AI analysis and return its job id immediately"""
+    try:
+        job_id = ai_jobs.submit(run_ai_analysis)
+    except QueueFullError as e:
+        return jsonify({"error": str(e)}), 503
+
+    return jsonify({
+        "job_id": job_id,
+        "status": "queued",
+        "status_url": f"/ai-analysis/jobs/{job_id}"
+    }), 202
+
+@app.route("/ai-analysis/jobs/<job_id>", methods=["GET"])
+def get_ai_analysis_job(job_id):
+    """Get the status, and once finished the result, of an analysis job"""
+    job = ai_jobs.get(job_id)
+    if not job:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(job)
+
+@app.route("/ai-analysis/jobs", methods=["GET"])
+def ai_analysis_job_metrics():
+    """Get queue depth and throughput of the analysis job runner"""
+    return jsonify(ai_jobs.metrics())
+
+@app.route("/ai-analysis/stream", methods=["GET"])
+def ai_analysis_stream():
+    """Stream the analysis as SSE: market data first, then AI text chunks"""
+    def generate():
+        event_id = 0
+
+        def event(event_type, data):
+            nonlocal event_id
+            event_id += 1
+            return format_event(event_id, event_type, data)
+
+        # Flush something immediately so time-to-first-byte stays low
+        yield event("status", {"stage": "started"})
+        try:
+            retail_price, news_articles = get_analysis_inputs()
+            market_data = build_market_data(retail_price, premium_series.signal())
+            if "error" in market_data:
+                yield event("error", market_data)
+                return
+            yield event("market_data", market_data)
+
+            for text in stream_ai_analysis(market_data, news_articles):
+                yield event("chunk", {"text": text})
+            yield event("done", {"news_count": len(news_articles)})
+        except Exception as e:
+            print(f"AI Analysis Stream Error: {e}")
+            yield event("error", {"error": str(e)})
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 @app.route("/news", methods=["GET"])  
 def get_news():
     """Get latest silver-related news"""
@@ -246,6 +618,7 @@ def get_news():
     
     # Fallback to NewsAPI if RSS fails
     if not news_articles:
+        count_fallback("news_newsapi")
         url = (
             "https://newsapi.org/v2/everything?"
             "q=(silver OR gold OR bullion OR commodities OR trading OR investment OR forex OR metal OR shareMarket)&"
@@ -253,7 +626,7 @@ def get_news():
             f"apiKey={NEWS_API_KEY}"
         )
         try:
-            res = requests.get(url)
+            res = get_session().get(url, timeout=10)
             data = res.json()
 
             articles = [
@@ -289,6 +662,15 @@ def get_news():
 
 # ===== TRADING ROUTES =====
 
+def close_trade_position(trade_id, sell_price, reason="manual"):
+    """Close a trade and announce it; shared by /sell and the trigger engine"""
+    # Atomic: a concurrent /sell on another worker cannot close it twice
+    completed_trade = trade_ledger.close_trade(trade_id, sell_price, reason)
+    if completed_trade is not None:
+        trigger_engine.remove(trade_id)
+        trade_events.poll()  # announce here now; other workers pick it up from the ledger
+    return completed_trade
+
 @app.route("/buy", methods=["POST"])
 def place_buy_order():
     """Place a buy order"""
@@ -304,13 +686,11 @@ def place_buy_order():
         if not all([buy_price, booked_profit, min_loss]):
             return jsonify({"error": "Missing required fields"}), 400
 
-        trade_id = f"trade_{len(active_trades) + len(completed_trades) + 1}"
-        active_trades[trade_id] = {
-            "buy_price": buy_price,
-            "booked_profit": booked_profit,
-            "min_loss": min_loss,
-            "timestamp": datetime.now().isoformat(),
-        }
+        trade_id, trade = trade_ledger.open_trade(buy_price, booked_profit, min_loss)
+        if price_feed.is_leader():
+            trigger_engine.add_trade(trade_id, trade)  # followers leave it to the leader's sync
+        price_feed.start()  # triggers are evaluated on feed ticks
+        trade_events.poll()
 
         return jsonify({
             "success": True,
@@ -327,45 +707,27 @@ def place_buy_order():
 @app.route("/sell", methods=["POST"])
 def close_position():
     """Close a trading position"""
-    global total_pnl
     try:
         data = request.get_json()
         trade_id = data.get("trade_id")
         sell_price = data.get("sell_price")
         reason = data.get("reason", "manual")
 
-        if not trade_id or trade_id not in active_trades:
+        if not trade_id or trade_ledger.get_active_trade(trade_id) is None:
             return jsonify({"error": "Trade not found"}), 404
 
         if not sell_price:
             return jsonify({"error": "Sell price required"}), 400
 
-        trade = active_trades[trade_id]
-        buy_price = trade["buy_price"]
-        pnl = sell_price - buy_price
-
-        completed_trade = {
-            "trade_id": trade_id,
-            "buy_price": buy_price,
-            "sell_price": sell_price,
-            "pnl": pnl,
-            "pnl_percentage": (pnl / buy_price) * 100,
-            "reason": reason,
-            "buy_time": trade["timestamp"],
-            "sell_time": datetime.now().isoformat(),
-            "target_profit": trade["booked_profit"],
-            "stop_loss": trade["min_loss"]
-        }
-
-        completed_trades.append(completed_trade)
-        del active_trades[trade_id]
-        total_pnl += pnl
+        completed_trade = close_trade_position(trade_id, sell_price, reason)
+        if completed_trade is None:
+            return jsonify({"error": "Trade not found"}), 404
 
         return jsonify({
             "success": True,
             "message": "Position closed successfully",
             "trade": completed_trade,
-            "total_pnl": total_pnl
+            "total_pnl": trade_ledger.total_pnl()
         })
 
     except Exception as e:
@@ -373,26 +735,127 @@ def close_position():
 
 @app.route("/history", methods=["GET"])
 def get_trading_history():
-    """Get trading history"""
+    """Get a page of trading history (newest first) with portfolio aggregates"""
+    try:
+        completed_trades, next_cursor = trade_ledger.completed_page(
+            limit=request.args.get("limit", HISTORY_PAGE_SIZE, type=int),
+            cursor=request.args.get("cursor"),
+            since=request.args.get("since") or None,
+            until=request.args.get("until") or None,
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
     try:
         return jsonify({
             "completed_trades": completed_trades,
-            "total_pnl": total_pnl,
-            "total_trades": len(completed_trades),
-            "winning_trades": len([t for t in completed_trades if t["pnl"] > 0]),
-            "losing_trades": len([t for t in completed_trades if t["pnl"] < 0])
+            "next_cursor": next_cursor,
+            **trade_ledger.stats()
         })
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@app.route("/premium-history", methods=["GET"])
+def get_premium_history():
+    """Recorded premium observations with rolling mean, std-dev, z-score and percentile rank"""
+    window = request.args.get("window", PREMIUM_SIGNAL_WINDOW)
+    since_param = request.args.get("since")
+    since = parse_published(since_param)
+    if since_param and since is None:
+        return jsonify({"error": f"Invalid timestamp: {since_param}"}), 400
+    try:
+        history = premium_series.history(
+            window, since=since, limit=request.args.get("limit", PREMIUM_HISTORY_PAGE, type=int))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify({
+        **history,
+        "latest": {name: premium_series.latest(name) for name in premium_series.windows}
+    })
+
+@app.route("/chart-data", methods=["GET"])
+def get_chart_data():
+    """Price history for PriceChart, downsampled to the requested number of points"""
+    try:
+        return jsonify(chart_data.get(
+            request.args.get("series", "spot"),
+            request.args.get("range", "1y"),
+            points=request.args.get("points", CHART_DEFAULT_POINTS, type=int),
+            method=request.args.get("method", "lttb"),
+        ))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route("/bars", methods=["GET"])
+def get_bars():
+    """OHLC bars at any intraday timeframe (resampled from 1m) with indicators on that timeframe"""
+    series = request.args.get("series", "spot")
+    timeframe = request.args.get("timeframe", "5m")
+    limit = request.args.get("limit", 300, type=int)
+    if series not in ("spot", "retail"):
+        return jsonify({"error": f"Unknown series: {series} (expected spot or retail)"}), 400
+    if timeframe not in TIMEFRAMES:
+        return jsonify({"error": f"Unknown timeframe: {timeframe} (expected one of {', '.join(TIMEFRAMES)})"}), 400
+    if limit < 1:
+        return jsonify({"error": "limit must be positive"}), 400
+    try:
+        symbol = SILVER_SYMBOL if series == "spot" else RETAIL_SERIES
+        exchange_rate = get_exchange_rate()
+        ts, columns = get_intraday_series(symbol).bars(timeframe, limit=limit)
+        # Spot bars are USD/oz; report them in INR/kg like the rest of the API
+        to_inr = 32.15 * exchange_rate if series == "spot" else 1.0
+        return jsonify({
+            "series": series,
+            "timeframe": timeframe,
+            "points": len(ts),
+            "ts": [int(t) for t in ts],
+            **{field: np.round(np.asarray(columns[field]) * to_inr, 2).tolist() for field in ("open", "high", "low", "close")},
+            "volume": columns["volume"].tolist(),
+            "technical_indicators": get_timeframe_indicators(symbol, timeframe, exchange_rate) if ts else {},
+        })
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route("/scraper-stats", methods=["GET"])
+def scraper_stats():
+    """Get browser pool health, scrape latency percentiles and feed schedule"""
+    return jsonify({
+        **get_browser_pool().stats(),
+        "scrape_paths": scrape_path_stats(),
+        "price_sources": price_resolver.status(),
+        "price_feed": price_feed.status(),
+        "price_stream": event_hub.stats(),
+        "triggers": trigger_engine.stats()
+    })
+
+@app.route("/cache-stats", methods=["GET"])
+def cache_stats():
+    """Get hit/miss counters for the market data and AI analysis caches"""
+    return jsonify({
+        "market_data": market_data_cache.stats(),
+        "ai_analysis": ai_analysis_cache.stats(),
+        "news_index": {"articles": news_index.count(), **news_refresher.status()},
+        "chart_pyramids": chart_data.pyramids.stats(),
+        "intraday_bars": {"spot": get_intraday_series(SILVER_SYMBOL, refresh=False).status(),
+                          "retail": retail_bars.status()}
+    })
+
+@app.route("/metrics", methods=["GET"])
+def metrics():
+    """Stage latency histograms and fallback counters in Prometheus text format"""
+    return Response(REGISTRY.render(), mimetype="text/plain; version=0.0.4")
+
 @app.route("/portfolio", methods=["GET"])
 def get_portfolio():
     """Get current portfolio status"""
     try:
+        active_trades = trade_ledger.active_trades()
         return jsonify({
             "active_trades": active_trades,
-            "total_pnl": total_pnl,
-            "active_positions": len(active_trades)
+            "active_positions": len(active_trades),
+            **trade_ledger.stats()
         })
     except Exception as e:
         return jsonify({"error": str(e)}), 500
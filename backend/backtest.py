@@ -0,0 +1,216 @@
+"""
+Vectorized backtest of the /buy strategy on stored daily bars.
+
+A position is opened at a bar's close when the SMA trend is bullish and
+the RSI is inside [rsi_min, rsi_max], and closed at the first later bar
+whose high reaches buy + booked_profit ("target") or whose low reaches
+buy - min_loss ("stop_loss"); after `max_hold` bars it is sold at the
+close ("max_hold"). Exits for every candidate entry are found at once on a
+(entries, max_hold) window of highs and lows, so the only Python loop is
+over trades taken (one position at a time, as on the dashboard), never
+over bars. Results use the same trade and summary fields as /history.
+"""
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from indicator_batch import rsi, sma
+
+BACKTEST_WORKERS = int(os.getenv("BACKTEST_WORKERS", str(os.cpu_count() or 1)))
+OUNCES_PER_KG = 32.15
+
+DEFAULT_PARAMS = {
+    "booked_profit": 500,  # INR per kg, as on the dashboard
+    "min_loss": 300,
+    "fast": 5,
+    "slow": 20,
+    "rsi_period": 14,
+    "rsi_min": 0,
+    "rsi_max": 70,
+    "max_hold": 60,  # bars
+}
+
+
+def load_inr_bars(store, silver_symbol, fx_symbol, start=None, end=None):
+    """Daily silver Open/High/Low/Close in INR per kg, using each day's USD/INR close"""
+    silver = store.load(silver_symbol, "1d", start, end)
+    fx = store.load(fx_symbol, "1d", start, end)["Close"]
+    fx = fx.reindex(silver.index.union(fx.index)).ffill().reindex(silver.index).bfill()
+    return silver[["Open", "High", "Low", "Close"]].mul(fx * OUNCES_PER_KG, axis=0).dropna()
+
+
+def _arrays(bars):
+    return {
+        "open": bars["Open"].to_numpy(dtype=float),
+        "high": bars["High"].to_numpy(dtype=float),
+        "low": bars["Low"].to_numpy(dtype=float),
+        "close": bars["Close"].to_numpy(dtype=float),
+    }
+
+
+def entry_signals(close, params, cache=None):
+    """Bar indices where the entry rule holds"""
+    cache = {} if cache is None else cache
+    key = (params["fast"], params["slow"], params["rsi_period"])
+    if key not in cache:
+        fast, slow = sma(close, (params["fast"], params["slow"]))[:, 0]
+        cache[key] = (fast > slow, rsi(close, (params["rsi_period"],))[0, 0])
+    bullish, strength = cache[key]
+    with np.errstate(invalid="ignore"):
+        mask = bullish & (strength >= params["rsi_min"]) & (strength <= params["rsi_max"])
+    return np.flatnonzero(mask)
+
+
+def find_exits(arrays, entries, booked_profit, min_loss, max_hold):
+    """
+    (exit_bar, exit_price, reason_code) for every entry bar at once.
+
+    reason_code is 0 for target, 1 for stop_loss, 2 for max_hold and -1 when
+    the data ends before the trade resolves. A bar touching both levels counts
+    as a stop, and gaps through a level fill at the bar's open.
+    """
+    close, high, low, opens = arrays["close"], arrays["high"], arrays["low"], arrays["open"]
+    n = len(close)
+    offsets = np.arange(1, max_hold + 1)
+    window = entries[:, None] + offsets
+    valid = window < n
+    window = np.minimum(window, n - 1)
+
+    buy = close[entries]
+    target = buy + booked_profit
+    stop = buy - min_loss
+    hit_stop = (low[window] <= stop[:, None]) & valid
+    hit_target = (high[window] >= target[:, None]) & valid
+    hit = hit_stop | hit_target
+
+    resolved = hit.any(axis=1)
+    first = hit.argmax(axis=1)
+    rows = np.arange(len(entries))
+    exit_bar = np.where(resolved, entries + 1 + first, entries + max_hold)
+    is_stop = hit_stop[rows, first]
+
+    reason = np.where(resolved, np.where(is_stop, 1, 0), np.where(exit_bar < n, 2, -1))
+    exit_bar = np.minimum(exit_bar, n - 1)
+    bar_open = opens[exit_bar]
+    price = np.select(
+        [reason == 0, reason == 1],
+        [np.maximum(target, bar_open), np.minimum(stop, bar_open)],
+        close[exit_bar],
+    )
+    return exit_bar, price, reason
+
+
+REASONS = ("target", "stop_loss", "max_hold")
+
+
+def simulate(arrays, params, cache=None):
+    """(entry_bars, exit_bars, buy_prices, sell_prices, reason_codes) for one parameter set"""
+    signals = entry_signals(arrays["close"], params, cache)
+    exit_bar, sell, reason = find_exits(
+        arrays, signals, params["booked_profit"], params["min_loss"], params["max_hold"]
+    )
+
+    # One position at a time: the next entry is the first signal after the exit
+    taken, k = [], 0
+    while k < len(signals) and reason[k] >= 0:
+        taken.append(k)
+        k = np.searchsorted(signals, exit_bar[k], side="right")
+    taken = np.asarray(taken, dtype=int)
+    entries = signals[taken]
+    return entries, exit_bar[taken], arrays["close"][entries], sell[taken], reason[taken]
+
+
+def summarize(pnl, reasons):
+    """The aggregate fields /history reports, from arrays of P&L and reason names"""
+    pnl = np.asarray(pnl, dtype=float)
+    reasons = np.asarray(reasons)
+    wins, losses = pnl[pnl > 0], pnl[pnl < 0]
+    equity = np.cumsum(pnl)
+    peak = np.maximum.accumulate(np.maximum(equity, 0)) if len(pnl) else equity
+    by_reason = {}
+    for reason in sorted(set(reasons.tolist())):
+        selected = pnl[reasons == reason]
+        by_reason[reason] = {
+            "trades": int(len(selected)),
+            "winning_trades": int((selected > 0).sum()),
+            "losing_trades": int((selected < 0).sum()),
+            "total_pnl": round(float(selected.sum()), 2),
+        }
+    return {
+        "total_pnl": round(float(pnl.sum()), 2),
+        "total_trades": int(len(pnl)),
+        "winning_trades": int(len(wins)),
+        "losing_trades": int(len(losses)),
+        "average_win": round(float(wins.mean()), 2) if len(wins) else 0,
+        "average_loss": round(float(losses.mean()), 2) if len(losses) else 0,
+        "max_drawdown": round(float((peak - equity).max()), 2) if len(pnl) else 0,
+        "by_reason": by_reason,
+    }
+
+
+def run_backtest(bars, params=None):
+    """Trade list and summary for one parameter set, shaped like the /history response"""
+    params = {**DEFAULT_PARAMS, **(params or {})}
+    entries, exits, buy, sell, codes = simulate(_arrays(bars), params)
+    reasons = [REASONS[code] for code in codes]
+    buy, sell = buy.round(2), sell.round(2)
+    pnl = (sell - buy).round(2)
+    times = bars.index
+
+    trades = [
+        {
+            "trade_id": f"backtest_{i + 1}",
+            "buy_price": float(buy[i]),
+            "sell_price": float(sell[i]),
+            "pnl": float(pnl[i]),
+            "pnl_percentage": round(float(pnl[i] / buy[i] * 100), 4),
+            "reason": reasons[i],
+            "buy_time": times[entries[i]].isoformat(),
+            "sell_time": times[exits[i]].isoformat(),
+            "target_profit": params["booked_profit"],
+            "stop_loss": params["min_loss"],
+        }
+        for i in range(len(entries))
+    ]
+    return {"params": params, "completed_trades": trades, **summarize(pnl, reasons)}
+
+
+def parameter_grid(grid):
+    """Every combination of a {name: [values]} grid, merged over DEFAULT_PARAMS"""
+    names = list(grid)
+    return [
+        {**DEFAULT_PARAMS, **dict(zip(names, values))}
+        for values in itertools.product(*(grid[name] for name in names))
+    ]
+
+
+def _sweep_chunk(args):
+    arrays, combos = args
+    cache = {}  # indicators shared by combos with the same windows
+    results = []
+    for params in combos:
+        _, _, buy, sell, codes = simulate(arrays, params, cache)
+        results.append({"params": params, **summarize(sell - buy, [REASONS[c] for c in codes])})
+    return results
+
+
+def sweep(bars, grid, workers=BACKTEST_WORKERS, chunk_size=None):
+    """
+    Summaries for every combination in `grid`, best total P&L first.
+
+    Combinations are split into chunks and run in a process pool; combos
+    sharing SMA/RSI windows are grouped so each chunk computes them once.
+    """
+    arrays = _arrays(bars)
+    combos = sorted(parameter_grid(grid), key=lambda p: (p["fast"], p["slow"], p["rsi_period"]))
+    chunk_size = chunk_size or max(1, -(-len(combos) // (workers * 4)))
+    chunks = [(arrays, combos[i:i + chunk_size]) for i in range(0, len(combos), chunk_size)]
+
+    if workers <= 1:
+        results = [row for chunk in chunks for row in _sweep_chunk(chunk)]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = [row for part in executor.map(_sweep_chunk, chunks) for row in part]
+    return sorted(results, key=lambda row: row["total_pnl"], reverse=True)
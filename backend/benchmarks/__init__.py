@@ -0,0 +1 @@
+"""Performance benchmarks for the backend. Run from `backend/` with `python -m benchmarks.<name>`."""
@@ -0,0 +1,65 @@
+"""
+Grid sweep throughput of the vectorized backtest.
+
+Uses stored SI=F / USDINR=X bars when the local store has them, otherwise a
+synthetic random walk of the same length.
+
+    python -m benchmarks.bench_backtest --years 5 --workers 4
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from backtest import load_inr_bars, parameter_grid, sweep
+from ohlcv_store import OHLCVStore
+
+GRID = {
+    "booked_profit": [250, 500, 1000, 1500, 2000, 3000, 4000, 5000],
+    "min_loss": [150, 300, 600, 1000, 1500, 2500],
+    "rsi_max": [55, 60, 65, 70, 75, 80],
+    "fast": [5, 10],
+    "slow": [20, 50],
+    "max_hold": [20, 60],
+}
+
+
+def synthetic_bars(days, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 90000 + np.cumsum(rng.normal(0, 900, days))
+    opens = close + rng.normal(0, 300, days)
+    high = np.maximum(opens, close) + rng.uniform(0, 800, days)
+    low = np.minimum(opens, close) - rng.uniform(0, 800, days)
+    index = pd.bdate_range("2020-01-01", periods=days)
+    return pd.DataFrame({"Open": opens, "High": high, "Low": low, "Close": close}, index=index)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="backtest sweep benchmark")
+    parser.add_argument("--years", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    days = args.years * 252
+    try:
+        bars = load_inr_bars(OHLCVStore(), "SI=F", "USDINR=X").iloc[-days:]
+    except Exception:
+        bars = pd.DataFrame()
+    source = "stored"
+    if len(bars) < days // 2:
+        bars, source = synthetic_bars(days), "synthetic"
+
+    combos = len(parameter_grid(GRID))
+    print(f"{source} bars={len(bars)} combinations={combos}")
+    for workers in (1, args.workers):
+        start = time.perf_counter()
+        results = sweep(bars, GRID, workers=workers)
+        elapsed = time.perf_counter() - start
+        print(f"workers={workers}: {elapsed:.2f}s ({combos / elapsed:,.0f} combos/s)")
+    best = results[0]
+    print(f"best total_pnl={best['total_pnl']} trades={best['total_trades']} params={best['params']}")
+
+
+if __name__ == "__main__":
+    main()
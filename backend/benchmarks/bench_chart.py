@@ -0,0 +1,53 @@
+"""
+Cost of serving a downsampled chart from the min/max pyramid vs. from raw points.
+
+Builds a synthetic minute-resolution year (525,600 points), then times the
+pyramid build, pyramid-backed samples at several point budgets and a
+direct LTTB pass over the raw series for comparison.
+
+    python -m benchmarks.bench_chart --points 500 --repeat 20
+"""
+import argparse
+import time
+
+import numpy as np
+
+from browser_pool import percentile
+from chart_data import ChartPyramid, lttb, minmax
+
+
+def timed_ms(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="chart downsampling latency")
+    parser.add_argument("--size", type=int, default=365 * 24 * 60)
+    parser.add_argument("--points", type=int, nargs="+", default=[200, 500, 1000, 2000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(11)
+    x = 1_700_000_000 + np.arange(args.size) * 60.0
+    y = 116000 + np.cumsum(rng.normal(0, 25, args.size))
+
+    start = time.perf_counter()
+    pyramid = ChartPyramid(x, y)
+    build_ms = (time.perf_counter() - start) * 1000
+    print(f"source points={args.size} pyramid levels={len(pyramid.levels)} build={build_ms:.0f}ms")
+
+    for points in args.points:
+        cached = timed_ms(lambda: pyramid.sample(points), args.repeat)
+        raw = timed_ms(lambda: lttb(x, y, points), max(1, args.repeat // 10))
+        extremes = timed_ms(lambda: minmax(x, y, points), max(1, args.repeat // 10))
+        print(f"points={points:5d} pyramid p50={percentile(cached, 50):7.2f}ms  "
+              f"raw lttb p50={percentile(raw, 50):8.2f}ms  raw minmax p50={percentile(extremes, 50):8.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
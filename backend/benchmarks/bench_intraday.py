@@ -0,0 +1,72 @@
+"""
+Cost of keeping every intraday timeframe current as ticks arrive.
+
+Loads two weeks of synthetic 1m bars into a BarSeries, times the lazy
+build of each resampled view, then the per-tick cost with all views
+materialized against re-running a pandas resample for every timeframe.
+
+    python -m benchmarks.bench_intraday --days 14 --ticks 2000
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from browser_pool import percentile
+from intraday_bars import TIMEFRAMES, BarSeries
+
+PANDAS_RULES = {"5m": "5min", "15m": "15min", "1h": "1h", "1d": "1D"}
+AGGREGATION = {"Open": "first", "High": "max", "Low": "min", "Close": "last", "Volume": "sum"}
+
+
+def minute_bars(days, seed=13):
+    n = days * 1440
+    rng = np.random.default_rng(seed)
+    close = 40 * np.exp(np.cumsum(rng.normal(0, 0.0005, n)))
+    index = pd.date_range(end=pd.Timestamp.now().floor("min"), periods=n, freq="min")
+    return pd.DataFrame({"Open": close, "High": close * 1.0002, "Low": close * 0.9998,
+                         "Close": close, "Volume": rng.integers(10, 1000, n).astype(float)}, index=index)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="intraday resampling latency")
+    parser.add_argument("--days", type=int, default=14)
+    parser.add_argument("--ticks", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    frame = minute_bars(args.days)
+    series = BarSeries(max_bars=len(frame) + args.ticks)
+    start = time.perf_counter()
+    series.add_bars(frame)
+    print(f"base bars={len(series)} load={(time.perf_counter() - start) * 1000:.1f}ms")
+
+    for timeframe in TIMEFRAMES:
+        start = time.perf_counter()
+        series.frame(timeframe, limit=1)
+        print(f"view {timeframe:>3} first build={(time.perf_counter() - start) * 1000:6.2f}ms "
+              f"buckets={series.status()['views'].get(timeframe, len(series))}")
+
+    rng = np.random.default_rng(5)
+    ts = series.last_timestamp() + 60
+    price = float(frame["Close"].iloc[-1])
+    timings = []
+    for i in range(args.ticks):
+        price *= 1 + rng.normal(0, 0.0002)
+        start = time.perf_counter()
+        series.add_tick(ts + i * 20, price, 1.0)  # three ticks a minute
+        timings.append((time.perf_counter() - start) * 1e6)
+    print(f"tick with {len(series.views)} views: p50={percentile(timings, 50):.1f}us p99={percentile(timings, 99):.1f}us")
+
+    rebuild = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        for rule in PANDAS_RULES.values():
+            frame.resample(rule).agg(AGGREGATION)
+        rebuild.append((time.perf_counter() - start) * 1000)
+    print(f"pandas resample of every view per tick: p50={percentile(rebuild, 50):.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Concurrent order placement against the SQLite trade ledger.
+
+Spawns worker processes that each place buys and close them, like several
+gunicorn workers taking orders at once, and reports throughput.
+
+    python -m benchmarks.bench_ledger --processes 4 --orders 500
+"""
+import argparse
+import os
+import tempfile
+import time
+from multiprocessing import Pool
+
+from trade_ledger import TradeLedger
+
+
+def place_orders(args):
+    path, orders = args
+    ledger = TradeLedger(path)
+    ids = []
+    for i in range(orders):
+        trade_id, _ = ledger.open_trade(110000 + i, 500, 300)
+        ids.append(trade_id)
+        if ledger.close_trade(trade_id, 110200 + i, "manual") is None:
+            raise RuntimeError(f"{trade_id} could not be closed")
+    return ids
+
+
+def main():
+    parser = argparse.ArgumentParser(description="trade ledger throughput")
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--orders", type=int, default=500, help="buy+sell pairs per process")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "trades.sqlite3")
+        TradeLedger(path)  # create the schema up front
+
+        start = time.perf_counter()
+        with Pool(args.processes) as pool:
+            batches = pool.map(place_orders, [(path, args.orders)] * args.processes)
+        elapsed = time.perf_counter() - start
+
+        ids = [trade_id for batch in batches for trade_id in batch]
+        ledger = TradeLedger(path)
+        transactions = len(ids) * 2
+        print(f"processes={args.processes} orders={len(ids)} unique_ids={len(set(ids))} "
+              f"closed={len(ledger.completed_trades())}")
+        print(f"{transactions} transactions in {elapsed:.2f}s -> {transactions / elapsed:,.0f} tx/s")
+
+
+if __name__ == "__main__":
+    main()
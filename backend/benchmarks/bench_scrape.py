@@ -0,0 +1,72 @@
+"""
+Retail price scrape latency: cold browser per call vs the warm browser pool.
+
+    python -m benchmarks.bench_scrape --iterations 20
+    python -m benchmarks.bench_scrape --url http://127.0.0.1:8765/ --pool-size 2
+"""
+import argparse
+import time
+
+from playwright.sync_api import sync_playwright
+
+from browser_pool import BrowserPool, percentile
+
+RATE_SELECTOR = "div#divProduct td.p-h.ph.product-rate div.mn-rate-cover span.bgm.e"
+
+
+def cold_scrape(url):
+    """The original get_latest_price path: launch, load, read, close"""
+    with sync_playwright() as p:
+        browser = p.chromium.launch(headless=True)
+        page = browser.new_page()
+        page.goto(url, wait_until="networkidle")
+        page.wait_for_selector(RATE_SELECTOR)
+        values = [el.inner_text() for el in page.query_selector_all(RATE_SELECTOR)]
+        browser.close()
+        return values
+
+
+def pooled_scrape(url):
+    def scrape(page):
+        if page.url.startswith(url):
+            page.reload(wait_until="networkidle")
+        else:
+            page.goto(url, wait_until="networkidle")
+        page.wait_for_selector(RATE_SELECTOR)
+        return [el.inner_text() for el in page.query_selector_all(RATE_SELECTOR)]
+    return scrape
+
+
+def measure(label, fn, iterations):
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    print(f"{label:<8} n={iterations:<4} p50={percentile(samples, 50):8.1f} ms  "
+          f"p99={percentile(samples, 99):8.1f} ms")
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", default="http://www.shankarsilvermart.in/")
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--pool-size", type=int, default=1)
+    parser.add_argument("--max-page-age", type=float, default=300)
+    args = parser.parse_args()
+
+    measure("before", lambda: cold_scrape(args.url), args.iterations)
+
+    pool = BrowserPool(size=args.pool_size, max_page_age=args.max_page_age)
+    scrape = pooled_scrape(args.url)
+    try:
+        pool.run(scrape)  # warm-up: the first call pays the browser launch once
+        measure("after", lambda: pool.run(scrape), args.iterations)
+        print("pool:", pool.stats())
+    finally:
+        pool.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+How many /price-stream subscribers can one gunicorn worker hold?
+
+Starts `gunicorn -w 1 -k gthread` on benchmarks.stream_app, opens an
+increasing number of SSE connections from a single selector loop and reports
+how many of them receive the next tick and the fan-out latency.
+
+    python -m benchmarks.bench_stream --subscribers 100,500,1000 --threads 1000
+"""
+import argparse
+import json
+import os
+import selectors
+import socket
+import subprocess
+import sys
+import time
+
+from browser_pool import percentile
+
+
+def start_server(port, threads, tick):
+    env = {**os.environ, "BENCH_TICK_SECONDS": str(tick)}
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "benchmarks.stream_app:app",
+         "-w", "1", "-k", "gthread", "--threads", str(threads),
+         "--bind", f"127.0.0.1:{port}", "--timeout", "0", "--log-level", "warning"],
+        env=env,
+    )
+    deadline = time.time() + 15
+    while time.time() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+            return proc
+        except OSError:
+            time.sleep(0.1)
+    proc.kill()
+    raise RuntimeError("gunicorn did not start")
+
+
+def run_round(port, count, tick):
+    sel = selectors.DefaultSelector()
+    request = (f"GET /price-stream HTTP/1.1\r\nHost: 127.0.0.1:{port}\r\n"
+               "Accept: text/event-stream\r\n\r\n").encode()
+    socks = []
+    for _ in range(count):
+        try:
+            s = socket.create_connection(("127.0.0.1", port), timeout=2)
+        except OSError:
+            break
+        s.sendall(request)
+        s.setblocking(False)
+        sel.register(s, selectors.EVENT_READ, {"buf": b"", "latency": None})
+        socks.append(s)
+
+    # Wait two ticks so every subscriber has had a chance to see one
+    deadline = time.time() + tick * 2 + 1
+    while time.time() < deadline:
+        for key, _ in sel.select(timeout=0.1):
+            state = key.data
+            try:
+                chunk = key.fileobj.recv(65536)
+            except BlockingIOError:
+                continue
+            if not chunk:
+                sel.unregister(key.fileobj)
+                continue
+            state["buf"] += chunk
+            if state["latency"] is None and b"data: " in state["buf"]:
+                line = state["buf"].split(b"data: ", 1)[1].split(b"\n", 1)[0]
+                try:
+                    state["latency"] = (time.time() - json.loads(line)["sent_at"]) * 1000
+                except (ValueError, KeyError):
+                    pass
+
+    latencies = [k.data["latency"] for k in sel.get_map().values() if k.data["latency"] is not None]
+    for s in socks:
+        s.close()
+    sel.close()
+    return len(socks), latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SSE subscribers per gunicorn worker")
+    parser.add_argument("--subscribers", default="50,200,500,1000")
+    parser.add_argument("--threads", type=int, default=1000)
+    parser.add_argument("--tick", type=float, default=1.0)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    proc = start_server(args.port, args.threads, args.tick)
+    try:
+        for count in [int(c) for c in args.subscribers.split(",")]:
+            connected, latencies = run_round(args.port, count, args.tick)
+            print(f"subscribers={count:<6} connected={connected:<6} received={len(latencies):<6} "
+                  f"p50={percentile(latencies, 50):7.1f} ms  p99={percentile(latencies, 99):7.1f} ms")
+            time.sleep(args.tick)  # let the worker reap closed streams
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Upstream fetches and read latency with N worker processes sharing one tick ring.
+
+Each worker runs a PriceFeed on the same ring with a fetcher that only
+counts calls; the feeds elect one leader, which refreshes every
+--interval seconds while the followers poll the ring. Reports upstream
+fetches per worker count (should stay flat) and the cost of a follower's
+latest-tick read.
+
+    python -m benchmarks.bench_tick_ring --workers 1 2 4 8 --seconds 3
+"""
+import argparse
+import multiprocessing
+import os
+import tempfile
+import time
+
+from browser_pool import percentile
+from price_feed import PriceFeed
+from tick_ring import TickRing
+
+
+def run_worker(path, seconds, interval, fetches):
+    def fetch_retail():
+        with fetches.get_lock():
+            fetches.value += 1
+        return {"currVal": 116000, "source": "shankar"}
+
+    feed = PriceFeed(fetch_retail, lambda: {"spot_usd": 40.0, "exchange_rate": 83.0},
+                     min_interval=interval, max_interval=interval, off_hours_interval=interval,
+                     ring=TickRing(path), poll_interval=interval / 4)
+    feed.start()
+    time.sleep(seconds)
+    feed.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="tick ring leader election and follower reads")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--interval", type=float, default=0.2, help="leader refresh interval (s)")
+    parser.add_argument("--reads", type=int, default=100000)
+    args = parser.parse_args()
+
+    context = multiprocessing.get_context("fork")
+    for workers in args.workers:
+        path = os.path.join(tempfile.mkdtemp(prefix="bench-"), "ticks.ring")
+        fetches = context.Value("i", 0)
+        processes = [
+            context.Process(target=run_worker, args=(path, args.seconds, args.interval, fetches))
+            for _ in range(workers)
+        ]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+        print(f"workers={workers:2d} upstream fetches={fetches.value:4d} ticks={TickRing(path).count()}")
+
+    ring = TickRing(os.path.join(tempfile.mkdtemp(prefix="bench-"), "ticks.ring"))
+    for i in range(ring.capacity):
+        ring.append(116000 + i, 40.0, 83.0, 2700.0, "shankar")
+    timings = []
+    for _ in range(args.reads):
+        start = time.perf_counter()
+        ring.latest()
+        timings.append((time.perf_counter() - start) * 1e6)
+    print(f"latest tick read: p50={percentile(timings, 50):.2f}us p99={percentile(timings, 99):.2f}us")
+
+
+if __name__ == "__main__":
+    main()
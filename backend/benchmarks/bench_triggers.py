@@ -0,0 +1,63 @@
+"""
+Per-tick cost of the trigger engine against a linear scan of open trades.
+
+Loads N synthetic positions around the current price and replays a random
+walk of ticks; closing is a no-op so only the trigger lookup is measured.
+
+    python -m benchmarks.bench_triggers --positions 50000 --ticks 2000
+"""
+import argparse
+import random
+import time
+
+from browser_pool import percentile
+from trigger_engine import TriggerEngine
+
+
+def linear_scan(positions, price):
+    return [trade_id for trade_id, (target, stop) in positions.items() if price >= target or price <= stop]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="trigger engine tick latency")
+    parser.add_argument("--positions", type=int, default=50000)
+    parser.add_argument("--ticks", type=int, default=2000)
+    parser.add_argument("--price", type=float, default=116000)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    positions = {}
+    for i in range(args.positions):
+        buy = args.price + rng.uniform(-2000, 2000)
+        positions[f"trade_{i + 1}"] = (buy + rng.uniform(500, 5000), buy - rng.uniform(500, 5000))
+
+    engine = TriggerEngine(lambda trade_id, price, reason: {"trade_id": trade_id})
+    start = time.perf_counter()
+    for trade_id, (target, stop) in positions.items():
+        engine.add(trade_id, target, stop)
+    load_ms = (time.perf_counter() - start) * 1000
+
+    prices, price = [], args.price
+    for _ in range(args.ticks):
+        price += rng.gauss(0, 15)
+        prices.append(price)
+
+    heap_ms, closed = [], 0
+    for price in prices:
+        start = time.perf_counter()
+        closed += len(engine.on_price(price))
+        heap_ms.append((time.perf_counter() - start) * 1000)
+
+    scan_ms = []
+    for price in prices[:200]:
+        start = time.perf_counter()
+        linear_scan(positions, price)
+        scan_ms.append((time.perf_counter() - start) * 1000)
+
+    print(f"positions={args.positions} ticks={args.ticks} closed={closed} load={load_ms:.0f}ms")
+    print(f"heaps:       p50={percentile(heap_ms, 50):.4f}ms p99={percentile(heap_ms, 99):.4f}ms")
+    print(f"linear scan: p50={percentile(scan_ms, 50):.4f}ms p99={percentile(scan_ms, 99):.4f}ms")
+
+
+if __name__ == "__main__":
+    main()
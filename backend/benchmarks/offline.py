@@ -0,0 +1,267 @@
+"""
+Local stand-ins for every upstream on the request path.
+
+- `FixtureServer` serves benchmarks/fixtures (the recorded Shankar page and
+  RSS feeds) over real HTTP on localhost, with Last-Modified/304 support.
+- `FakeBrowserPool` replaces the Playwright pool with pages that GET the
+  local HTML and read the rate cells from it (the HTTP fast path reads the
+  same page directly).
+- `fake_download` returns canned, deterministic yfinance-shaped frames.
+- `FakeGemini` mimics `genai.GenerativeModel` with a configurable latency.
+
+`install(...)` wires all of them into `app`/`technical_analysis` and points
+the trade ledger and bar store at throwaway databases.
+"""
+import functools
+import os
+import re
+import tempfile
+import threading
+import time
+import urllib.request
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+RSS_FIXTURES = {
+    "Money Metals Exchange": "rss/money_metals.xml",
+    "Gold Silver": "rss/goldsilver.xml",
+    "Silver News": "rss/silver_news.xml",
+}
+
+# Latest level and daily volatility of the canned series
+CANNED_QUOTES = {
+    "SI=F": (40.0, 0.018),  # ~1,16,000 INR/kg retail, in line with shankar.html
+    "GC=F": (2350.0, 0.009),
+    "DX-Y.NYB": (104.2, 0.003),
+    "USDINR=X": (83.4, 0.002),
+}
+
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+class FixtureServer:
+    """Serve FIXTURES_DIR on an ephemeral localhost port"""
+
+    def __init__(self, directory=FIXTURES_DIR):
+        handler = functools.partial(_QuietHandler, directory=directory)
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        self.thread = threading.Thread(target=self.httpd.serve_forever, name="fixture-server", daemon=True)
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address
+        return f"http://{host}:{port}/"
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class FakeElement:
+    def __init__(self, text):
+        self.text = text
+
+    def inner_text(self):
+        return self.text
+
+
+class FakePage:
+    """
+    Just enough of a Playwright page for `scrape_shankar_rate`.
+
+    Only understands the rate-cell selector: it returns the text of every
+    `span.bgm.e` in the fetched HTML, in document order.
+    """
+
+    _RATE_CELL = re.compile(r'<span class="bgm e">([^<]*)</span>')
+
+    def __init__(self, fixture_url):
+        self.fixture_url = fixture_url
+        self.url = "about:blank"
+        self.html = ""
+
+    def goto(self, url, wait_until=None):
+        with urllib.request.urlopen(self.fixture_url, timeout=10) as response:
+            self.html = response.read().decode("utf-8")
+        self.url = url
+
+    def reload(self, wait_until=None):
+        self.goto(self.url, wait_until)
+
+    def wait_for_selector(self, selector):
+        if not self._RATE_CELL.search(self.html):
+            raise TimeoutError(f"{selector} not found")
+
+    def query_selector_all(self, selector):
+        return [FakeElement(text) for text in self._RATE_CELL.findall(self.html)]
+
+
+class FakeBrowserPool:
+    """Drop-in for BrowserPool: one FakePage per calling thread"""
+
+    def __init__(self, fixture_url):
+        self.fixture_url = fixture_url
+        self._local = threading.local()
+        self.jobs = 0
+
+    def run(self, fn, timeout=None):
+        page = getattr(self._local, "page", None)
+        if page is None:
+            page = self._local.page = FakePage(self.fixture_url)
+        self.jobs += 1
+        return fn(page)
+
+    def stats(self):
+        return {"size": 0, "fake": True, "jobs": self.jobs}
+
+    def shutdown(self):
+        pass
+
+
+def _period_bars(period):
+    number, unit = int(re.match(r"\d+", period).group()), re.sub(r"\d+", "", period)
+    days = number * {"d": 1, "wk": 7, "mo": 31, "y": 366}[unit]
+    return max(1, days * 5 // 7 + 1)
+
+
+def canned_frame(symbol, index):
+    """Deterministic OHLCV random walk for `symbol`, identical on every call"""
+    level, vol = CANNED_QUOTES.get(symbol, (100.0, 0.01))
+    end = pd.Timestamp.today().normalize()
+    full_index = pd.bdate_range(end=end, periods=800)
+    rng = np.random.default_rng(sum(map(ord, symbol)))
+    walk = np.cumsum(rng.normal(0, vol, len(full_index)))
+    close = level * np.exp(walk - walk[-1])
+    frame = pd.DataFrame({
+        "Open": close * (1 + rng.normal(0, vol / 4, len(close))),
+        "High": close * (1 + np.abs(rng.normal(0, vol / 2, len(close)))),
+        "Low": close * (1 - np.abs(rng.normal(0, vol / 2, len(close)))),
+        "Close": close,
+        "Adj Close": close,
+        "Volume": rng.integers(1_000, 100_000, len(close)).astype(float),
+    }, index=full_index)
+    return frame.reindex(index).dropna(how="all")
+
+
+CANNED_MINUTE_DAYS = 8  # Yahoo keeps ~7 days of 1m bars
+
+
+def canned_minutes(symbol, index):
+    """1m counterpart of canned_frame, identical on every call within a day"""
+    level, vol = CANNED_QUOTES.get(symbol, (100.0, 0.01))
+    end = pd.Timestamp.today().normalize() + pd.Timedelta(days=1)
+    full_index = pd.date_range(end=end - pd.Timedelta(minutes=1), periods=CANNED_MINUTE_DAYS * 1440, freq="min")
+    rng = np.random.default_rng(sum(map(ord, symbol)) + 1)
+    walk = np.cumsum(rng.normal(0, vol / 20, len(full_index)))
+    close = level * np.exp(walk - walk[-1])
+    spread = np.abs(rng.normal(0, vol / 40, len(close)))
+    frame = pd.DataFrame({
+        "Open": np.concatenate(([close[0]], close[:-1])),
+        "High": close * (1 + spread),
+        "Low": close * (1 - spread),
+        "Close": close,
+        "Adj Close": close,
+        "Volume": rng.integers(10, 1_000, len(close)).astype(float),
+    }, index=full_index)
+    return frame.reindex(index).dropna(how="all")
+
+
+def fake_download(tickers, period=None, interval="1d", start=None, latency=0.0, **kwargs):
+    """yf.download stand-in returning a (ticker, field) column frame"""
+    if latency:
+        time.sleep(latency)
+    symbols = [tickers] if isinstance(tickers, str) else list(tickers)
+    if interval == "1m":
+        now = pd.Timestamp.now().floor("min")
+        if start is not None:
+            index = pd.date_range(start=start, end=now, freq="min")
+        else:
+            index = pd.date_range(end=now, periods=min(_period_bars(period or "7d") * 1440,
+                                                        CANNED_MINUTE_DAYS * 1440), freq="min")
+        return pd.concat({symbol: canned_minutes(symbol, index) for symbol in symbols}, axis=1)
+    end = pd.Timestamp.today().normalize()
+    if start is not None:
+        index = pd.bdate_range(start=start, end=end)
+    else:
+        index = pd.bdate_range(end=end, periods=_period_bars(period or "1mo"))
+    return pd.concat({symbol: canned_frame(symbol, index) for symbol in symbols}, axis=1)
+
+
+class _FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeGemini:
+    """`genai.GenerativeModel` stand-in; `latency` seconds per call, spread over chunks when streaming"""
+
+    latency = 0.05
+    chunks = 8
+    calls = 0
+
+    def __init__(self, model_name=None, **kwargs):
+        self.model_name = model_name
+
+    def _text(self, prompt):
+        return (
+            "**RECOMMENDATION:** HOLD\n\n"
+            "**REASONING:** Trend and RSI are neutral; the retail premium is within its usual range.\n\n"
+            f"**RISK FACTORS:** USD/INR volatility. (prompt {len(prompt)} chars)"
+        )
+
+    def generate_content(self, prompt, stream=False, **kwargs):
+        type(self).calls += 1
+        text = self._text(prompt)
+        if not stream:
+            time.sleep(self.latency)
+            return _FakeResponse(text)
+        return self._stream(text)
+
+    def _stream(self, text):
+        size = -(-len(text) // self.chunks)
+        for i in range(0, len(text), size):
+            time.sleep(self.latency / self.chunks)
+            yield _FakeResponse(text[i:i + size])
+
+
+def install(gemini_latency=0.05, yahoo_latency=0.0, data_dir=None):
+    """
+    Point every upstream at the local stand-ins and return (app_module, server).
+
+    Must run before `app` is imported elsewhere so its ledger, bar store, news index and tick ring
+    open inside `data_dir` (a fresh temporary directory by default).
+    """
+    data_dir = data_dir or tempfile.mkdtemp(prefix="bench-")
+    os.environ["TRADES_DB_PATH"] = os.path.join(data_dir, "trades.sqlite3")
+    os.environ["OHLCV_DB_PATH"] = os.path.join(data_dir, "ohlcv.sqlite3")
+    os.environ["NEWS_DB_PATH"] = os.path.join(data_dir, "news.sqlite3")
+    os.environ["AI_JOBS_DB_PATH"] = os.path.join(data_dir, "jobs.sqlite3")
+    os.environ["TICK_RING_PATH"] = os.path.join(data_dir, "ticks.ring")
+    os.environ.pop("AI_CACHE_DIR", None)
+
+    import app
+    import technical_analysis as ta
+
+    server = FixtureServer().start()
+    app.NEWS_API_KEY = None  # no NewsAPI fallback
+    app.SHANKAR_URL = server.base_url + "shankar.html"
+    pool = FakeBrowserPool(app.SHANKAR_URL)
+    app.get_browser_pool = lambda: pool
+    app.NEWS_SOURCES = [
+        {**source, "url": server.base_url + RSS_FIXTURES[source["name"]]} for source in app.NEWS_SOURCES
+    ]
+    ta.yf.download = functools.partial(fake_download, latency=yahoo_latency)
+    FakeGemini.latency = gemini_latency
+    ta.genai.GenerativeModel = FakeGemini
+    return app, server
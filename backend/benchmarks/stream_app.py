@@ -0,0 +1,31 @@
+"""
+Minimal WSGI app for bench_stream: the real EventHub/SSE response fed by a synthetic ticker.
+"""
+import os
+import threading
+import time
+
+from flask import Flask, request
+
+from price_stream import EventHub, sse_response
+
+TICK_SECONDS = float(os.getenv("BENCH_TICK_SECONDS", "1"))
+
+app = Flask(__name__)
+hub = EventHub()
+
+
+def _ticker():
+    price = 110000
+    while True:
+        time.sleep(TICK_SECONDS)
+        price += 10
+        hub.publish("price", {"currVal": price, "sent_at": time.time()})
+
+
+threading.Thread(target=_ticker, daemon=True).start()
+
+
+@app.route("/price-stream")
+def price_stream():
+    return sse_response(hub, request)
@@ -0,0 +1,240 @@
+"""
+Offline latency and allocation suite for the request path.
+
+Every upstream is replaced by the stand-ins in benchmarks.offline, so runs
+are reproducible without network access. Each case is timed once cold
+(caches cleared) and then `--repeat` times warm, and profiled once with
+tracemalloc. A `-X importtime` profile of `import app` in a fresh
+interpreter is recorded as the `import:app` case. Results can be saved as
+a baseline and later runs compared against it; the exit status is 1 when
+a case regressed.
+
+    python -m benchmarks.suite                      # run and compare with the saved baseline
+    python -m benchmarks.suite --save               # record a new baseline
+    python -m benchmarks.suite --only /bars --save  # (re)record one case, keep the rest
+    python -m benchmarks.suite --only /history --repeat 50
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.offline import install
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines", "suite.json")
+HISTORY_TRADES = 2000
+PREMIUM_OBSERVATIONS = 5760  # one day at the 15s minimum refresh interval
+
+
+def measure(fn, repeat, reset=None):
+    """Cold and warm latency (ms) plus peak traced memory and net blocks for one call"""
+    if reset:
+        reset()
+    start = time.perf_counter()
+    fn()
+    cold_ms = (time.perf_counter() - start) * 1000
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+
+    tracemalloc.start()
+    blocks_before = sys.getallocatedblocks()
+    fn()
+    blocks_after = sys.getallocatedblocks()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "cold_ms": round(cold_ms, 3),
+        "p50_ms": round(statistics.median(timings), 3),
+        "p95_ms": round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 3),
+        "peak_kb": round(peak / 1024, 1),
+        "net_blocks": blocks_after - blocks_before,
+    }
+
+
+def profile_import(module="app", repeat=3, top=10):
+    """
+    Wall time of `import <module>` in fresh interpreters plus its slowest imports.
+
+    Returns (result, [(cumulative_ms, name), ...]) from `python -X importtime`.
+    """
+    data_dir = tempfile.mkdtemp(prefix="bench-")
+    env = {
+        **os.environ,
+        "TRADES_DB_PATH": os.path.join(data_dir, "trades.sqlite3"),
+        "NEWS_DB_PATH": os.path.join(data_dir, "news.sqlite3"),
+        "AI_JOBS_DB_PATH": os.path.join(data_dir, "jobs.sqlite3"),
+        "TICK_RING_PATH": os.path.join(data_dir, "ticks.ring"),
+    }
+    backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    totals, slowest = [], []
+    for _ in range(repeat):
+        completed = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            cwd=backend_dir, env=env, capture_output=True, text=True, check=True,
+        )
+        entries = []
+        for line in completed.stderr.splitlines():
+            if not line.startswith("import time:") or "cumulative" in line:
+                continue
+            _, cumulative, name = line[len("import time:"):].split("|")
+            entries.append((int(cumulative) / 1000, name.strip()))
+        totals.append(next(ms for ms, name in entries if name == module))
+        slowest = sorted(entries, reverse=True)[:top]
+
+    result = {
+        "cold_ms": round(totals[0], 3),
+        "p50_ms": round(statistics.median(totals), 3),
+        "p95_ms": round(max(totals), 3),
+        "peak_kb": 0.0,
+        "net_blocks": 0,
+    }
+    return result, slowest
+
+
+def build_cases(app):
+    import technical_analysis as ta
+    import http_client
+
+    client = app.app.test_client()
+
+    def clear_caches():
+        ta.market_data_cache.clear()
+        ta.ai_analysis_cache.memory.clear()
+        http_client._conditional_cache.clear()
+
+    def get(path):
+        def call():
+            response = client.get(path)
+            assert response.status_code == 200, (path, response.status_code, response.get_data(as_text=True))
+        return call
+
+    _, closes = ta.get_historical_prices("30d")
+
+    # A realistic history for the paginated /history route
+    ledger = app.trade_ledger
+    for i in range(HISTORY_TRADES - len(ledger.completed_trades())):
+        trade_id, _ = ledger.open_trade(116000 + i % 50, 500, 300)
+        ledger.close_trade(trade_id, 116000 + (i * 37) % 900 - 300, "target" if i % 3 else "stop_loss")
+
+    # Daily silver and USD/INR history behind /chart-data, whichever cases ran first
+    ta.sync_history([ta.SILVER_SYMBOL, ta.USD_INR_SYMBOL])
+
+    # A day of premium observations behind /premium-history
+    start = time.time() - PREMIUM_OBSERVATIONS * 15
+    for i in range(PREMIUM_OBSERVATIONS):
+        app.premium_series.observe_quote(start + i * 15, 116000 + (i * 37) % 900, 40.0, 83.0, "shankar")
+
+    return {
+        "fn:get_latest_price": (app.get_latest_price, clear_caches),
+        "fn:get_spot_quote": (app.get_spot_quote, clear_caches),
+        "fn:fetch_market_data": (lambda: ta.fetch_market_data(ta.ANALYSIS_DATA_NEEDS), clear_caches),
+        "fn:get_technical_indicators": (lambda: ta.get_technical_indicators(closes, 83.4), None),
+        "fn:ingest_news": (app.ingest_news, clear_caches),
+        "fn:get_silver_news": (app.get_silver_news, clear_caches),
+        "fn:build_market_data": (lambda: ta.build_market_data(116000), clear_caches),
+        "route:/prices": (get("/prices"), clear_caches),
+        "route:/silver-price": (get("/silver-price"), None),
+        "route:/ai-analysis": (get("/ai-analysis"), clear_caches),
+        "route:/news": (get("/news"), clear_caches),
+        "route:/history": (get("/history"), None),
+        "route:/premium-history": (get("/premium-history?window=1d&limit=500"), None),
+        "route:/chart-data": (get("/chart-data?series=spot&range=2y&points=500"), None),
+        "route:/bars": (get("/bars?series=spot&timeframe=15m&limit=300"), None),
+    }
+
+
+def compare(results, baseline, tolerance, min_delta_ms):
+    """Names of cases slower (p50) or hungrier (peak memory) than the baseline allows"""
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        slower = result["p50_ms"] - base["p50_ms"]
+        if result["p50_ms"] > base["p50_ms"] * (1 + tolerance) and slower > min_delta_ms:
+            regressions.append(f"{name}: p50 {base['p50_ms']}ms -> {result['p50_ms']}ms")
+        if result["peak_kb"] > base["peak_kb"] * (1 + tolerance) and result["peak_kb"] - base["peak_kb"] > 64:
+            regressions.append(f"{name}: peak {base['peak_kb']}KB -> {result['peak_kb']}KB")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="offline request-path benchmark suite")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--only", help="substring filter on case names")
+    parser.add_argument("--gemini-latency", type=float, default=0.05, help="seconds per fake Gemini call")
+    parser.add_argument("--yahoo-latency", type=float, default=0.0, help="seconds per fake yf.download")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save", action="store_true", help="write results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative slowdown")
+    parser.add_argument("--min-delta-ms", type=float, default=1.0, help="ignore slowdowns below this")
+    args = parser.parse_args()
+
+    results = {}
+    if not args.only or args.only in "import:app":
+        results["import:app"], slowest = profile_import()
+        print("Slowest imports under `import app` (cumulative ms):")
+        for ms, name in slowest:
+            print(f"  {ms:9.1f}  {name}")
+
+    # Imported after the profile so the subprocesses measure a cold start
+    app, server = install(gemini_latency=args.gemini_latency, yahoo_latency=args.yahoo_latency)
+    try:
+        cases = build_cases(app)
+        print(f"{'case':32} {'cold':>9} {'p50':>9} {'p95':>9} {'peak KB':>9} {'blocks':>7}")
+        for name, result in results.items():
+            print(f"{name:32} {result['cold_ms']:9.2f} {result['p50_ms']:9.2f} {result['p95_ms']:9.2f}")
+        for name, (fn, reset) in cases.items():
+            if args.only and args.only not in name:
+                continue
+            result = results[name] = measure(fn, args.repeat, reset)
+            print(f"{name:32} {result['cold_ms']:9.2f} {result['p50_ms']:9.2f} {result['p95_ms']:9.2f} "
+                  f"{result['peak_kb']:9.1f} {result['net_blocks']:7d}")
+    finally:
+        app.price_feed.stop()
+        app.news_refresher.stop()
+        server.stop()
+
+    if args.save:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        if args.only and os.path.exists(args.baseline):
+            # A filtered run only replaces the cases it measured
+            with open(args.baseline, encoding="utf-8") as f:
+                results = {**json.load(f)["results"], **results}
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "gemini_latency": args.gemini_latency,
+                "yahoo_latency": args.yahoo_latency,
+                "results": results,
+            }, f, indent=2, sort_keys=True)
+        print(f"Saved baseline to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("No baseline yet; run with --save to record one")
+        return 0
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)["results"]
+    regressions = compare(results, baseline, args.tolerance, args.min_delta_ms)
+    for line in regressions:
+        print(f"REGRESSION {line}")
+    print(f"{len(regressions)} regression(s) against {args.baseline}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,202 @@
+"""
+Long-lived headless Chromium pool used by the retail price scraper.
+
+Launching Chromium costs seconds and hundreds of MB per call, so the backend
+keeps a small number of browsers warm and reuses their pages. Playwright's
+sync API is bound to the thread that started it, which is why every browser
+lives on its own worker thread and callers hand work over through a queue.
+"""
+import atexit
+import math
+import os
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+BROWSER_POOL_SIZE = int(os.getenv("BROWSER_POOL_SIZE", "1"))
+BROWSER_MAX_PAGE_AGE = float(os.getenv("BROWSER_MAX_PAGE_AGE", "300"))  # seconds
+BROWSER_JOB_TIMEOUT = float(os.getenv("BROWSER_JOB_TIMEOUT", "45"))  # seconds
+BROWSER_HEALTH_INTERVAL = float(os.getenv("BROWSER_HEALTH_INTERVAL", "30"))  # seconds
+
+_LATENCY_SAMPLES = 500
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers (0 for an empty list)"""
+    if not values:
+        return 0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+class _BrowserWorker(threading.Thread):
+    """Owns one Playwright driver, one Chromium instance and one reusable page"""
+
+    def __init__(self, pool, index):
+        super().__init__(name=f"browser-pool-{index}", daemon=True)
+        self.pool = pool
+        self.playwright = None
+        self.browser = None
+        self.page = None
+        self.page_created = 0
+
+    def run(self):
+        while not self.pool.closed:
+            try:
+                job = self.pool.jobs.get(timeout=BROWSER_HEALTH_INTERVAL)
+            except queue.Empty:
+                # Idle: make sure the browser did not die behind our back
+                if self.browser is not None and not self._healthy():
+                    print(f"{self.name}: browser unhealthy, respawning")
+                    self._teardown()
+                continue
+
+            if job is None:
+                break
+
+            fn, future = job
+            if not future.set_running_or_notify_cancel():
+                continue
+
+            try:
+                page = self._acquire_page()
+                future.set_result(fn(page))
+            except Exception as e:
+                # A dead browser is respawned; a live one just gets a fresh page
+                if self.browser is not None and self._healthy():
+                    self._reset_page()
+                else:
+                    self._teardown()
+                future.set_exception(e)
+
+        self._teardown()
+
+    def _healthy(self):
+        try:
+            return self.browser.is_connected() and not self.page.is_closed()
+        except Exception:
+            return False
+
+    def _acquire_page(self):
+        if self.browser is None or not self._healthy():
+            self._teardown()
+            self._launch()
+        elif time.monotonic() - self.page_created > self.pool.max_page_age:
+            # Recycle old pages so long-lived tabs do not accumulate memory
+            self._reset_page()
+        return self.page
+
+    def _launch(self):
+        from playwright.sync_api import sync_playwright  # heavy; only needed once a scrape runs
+
+        self.playwright = sync_playwright().start()
+        self.browser = self.playwright.chromium.launch(headless=True)
+        self._new_page()
+        with self.pool.lock:
+            self.pool.launches += 1
+
+    def _reset_page(self):
+        try:
+            self.page.close()
+            self._new_page()
+        except Exception:
+            self._teardown()
+
+    def _new_page(self):
+        self.page = self.browser.new_page()
+        self.page_created = time.monotonic()
+
+    def _teardown(self):
+        for closer in (
+            lambda: self.browser and self.browser.close(),
+            lambda: self.playwright and self.playwright.stop(),
+        ):
+            try:
+                closer()
+            except Exception:
+                pass
+        self.playwright = None
+        self.browser = None
+        self.page = None
+
+
+class BrowserPool:
+    """Fixed-size set of warm browsers; `run(fn)` calls `fn(page)` on one of them"""
+
+    def __init__(self, size=BROWSER_POOL_SIZE, max_page_age=BROWSER_MAX_PAGE_AGE):
+        self.size = max(1, size)
+        self.max_page_age = max_page_age
+        self.jobs = queue.Queue()
+        self.lock = threading.Lock()
+        self.workers = []
+        self.closed = False
+        self.launches = 0
+        self.failures = 0
+        self.latencies = deque(maxlen=_LATENCY_SAMPLES)
+
+    def _ensure_started(self):
+        with self.lock:
+            # Respawn any worker thread that exited unexpectedly
+            self.workers = [w for w in self.workers if w.is_alive()]
+            while len(self.workers) < self.size:
+                worker = _BrowserWorker(self, len(self.workers))
+                worker.start()
+                self.workers.append(worker)
+
+    def run(self, fn, timeout=BROWSER_JOB_TIMEOUT):
+        """Run `fn(page)` on a pooled page and return its result"""
+        if self.closed:
+            raise RuntimeError("Browser pool is shut down")
+        self._ensure_started()
+
+        future = Future()
+        start = time.perf_counter()
+        self.jobs.put((fn, future))
+        try:
+            result = future.result(timeout=timeout)
+        except Exception:
+            future.cancel()
+            with self.lock:
+                self.failures += 1
+            raise
+        with self.lock:
+            self.latencies.append((time.perf_counter() - start) * 1000)
+        return result
+
+    def stats(self):
+        """Pool health and scrape latency summary"""
+        with self.lock:
+            samples = list(self.latencies)
+            return {
+                "size": self.size,
+                "alive_workers": sum(1 for w in self.workers if w.is_alive()),
+                "browser_launches": self.launches,
+                "failures": self.failures,
+                "scrapes": len(samples),
+                "p50_ms": round(percentile(samples, 50), 1),
+                "p99_ms": round(percentile(samples, 99), 1),
+            }
+
+    def shutdown(self):
+        self.closed = True
+        for _ in self.workers:
+            self.jobs.put(None)
+        for worker in self.workers:
+            worker.join(timeout=5)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_browser_pool():
+    """Process-wide browser pool, created on first use"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = BrowserPool()
+            atexit.register(_pool.shutdown)
+        return _pool
@@ -0,0 +1,174 @@
+"""
+Downsampled price series for charts.
+
+`lttb` (Largest-Triangle-Three-Buckets) keeps, per bucket, the point that
+spans the largest triangle with its neighbours, which preserves the visual
+shape of a line; `minmax` keeps each bucket's extremes. For every
+(series, range) a pyramid of levels, each holding the min and max of
+every 4-point block of the one below (so no peak or trough is lost), is
+built once per version of the underlying data and cached. A request for
+N points then runs LTTB only over the smallest level with at least N
+points, i.e. at most ~2N points instead of the raw history.
+"""
+import os
+
+from lazy_imports import lazy_import
+from ttl_cache import TTLCache
+
+np = lazy_import("numpy")
+
+CHART_DEFAULT_POINTS = 500
+CHART_MAX_POINTS = int(os.getenv("CHART_MAX_POINTS", "5000"))
+CHART_PYRAMID_MIN = 64  # smallest pyramid level
+CHART_CACHE_TTL = float(os.getenv("CHART_CACHE_TTL", "900"))  # seconds
+CHART_CACHE_SIZE = 32
+
+CHART_RANGES = {"1d": 1, "1w": 7, "1m": 30, "3m": 91, "6m": 182, "1y": 365, "2y": 730, "5y": 1826}  # days
+CHART_METHODS = ("lttb", "minmax")
+
+
+def _bucket_edges(n, threshold):
+    """LTTB bucket boundaries: bucket i is [edges[i], edges[i + 1]), the last point is its own bucket"""
+    every = (n - 2) / (threshold - 2)
+    return np.minimum((np.arange(threshold) * every).astype(np.int64) + 1, n)
+
+
+def lttb(x, y, threshold):
+    """Indices of the `threshold` points LTTB keeps (always the first and last)"""
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=float)
+    x = x - x[0]  # keep the triangle areas well scaled
+    y = np.asarray(y, dtype=float)
+    edges = _bucket_edges(n, threshold)
+
+    # The third vertex is the next bucket's average, independent of earlier picks
+    sum_x = np.concatenate(([0.0], np.cumsum(x)))
+    sum_y = np.concatenate(([0.0], np.cumsum(y)))
+    nxt, nxt_end = edges[1:-1], edges[2:]
+    avg_x = ((sum_x[nxt_end] - sum_x[nxt]) / (nxt_end - nxt)).tolist()
+    avg_y = ((sum_y[nxt_end] - sum_y[nxt]) / (nxt_end - nxt)).tolist()
+    edges = edges.tolist()
+
+    # Small buckets: a plain loop beats numpy's per-call overhead
+    small = n / threshold <= 16
+    xs, ys = (x.tolist(), y.tolist()) if small else (x, y)
+    selected = [0]
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        ax, ay, bx, by = xs[a], ys[a], avg_x[i], avg_y[i]
+        if small:
+            best_area = -1.0
+            for j in range(start, end):
+                area = abs((ax - bx) * (ys[j] - ay) - (ax - xs[j]) * (by - ay))
+                if area > best_area:
+                    a, best_area = j, area
+        else:
+            area = np.abs((ax - bx) * (y[start:end] - ay) - (ax - x[start:end]) * (by - ay))
+            a = start + int(area.argmax())
+        selected.append(a)
+    selected.append(n - 1)
+    return np.asarray(selected, dtype=np.int64)
+
+
+def minmax(x, y, threshold):
+    """Indices of each bucket's lowest and highest point (about `threshold` in total)"""
+    n = len(x)
+    if threshold >= n or threshold < 4:
+        return np.arange(n)
+    y = np.asarray(y, dtype=float)
+    edges = np.linspace(1, n - 1, (threshold - 2) // 2 + 1).astype(np.int64)
+    picks = [0, n - 1]
+    for start, end in zip(edges[:-1].tolist(), edges[1:].tolist()):
+        if end > start:
+            picks.append(start + int(y[start:end].argmin()))
+            picks.append(start + int(y[start:end].argmax()))
+    return np.unique(picks)
+
+
+def halve(x, y):
+    """Min and max of every 4-point block (plus both ends): half the points, every extreme kept"""
+    n = len(x)
+    blocks = n // 4
+    block_y = np.asarray(y)[:blocks * 4].reshape(blocks, 4)
+    low, high = block_y.argmin(axis=1), block_y.argmax(axis=1)
+    base = np.arange(blocks) * 4
+    keep = np.column_stack((base + np.minimum(low, high), base + np.maximum(low, high))).ravel()
+    keep = np.concatenate(([0], keep, np.arange(blocks * 4, n), [n - 1]))
+    keep = keep[np.concatenate(([True], np.diff(keep) > 0))]  # sorted already; drop repeats
+    return x[keep], y[keep]
+
+
+class ChartPyramid:
+    """A series and successively halved min/max levels of it"""
+
+    def __init__(self, x, y, min_points=CHART_PYRAMID_MIN):
+        x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+        self.levels = [(x, y)]
+        while len(x) // 2 >= min_points:
+            x, y = halve(x, y)
+            self.levels.append((x, y))
+
+    @property
+    def source_points(self):
+        return len(self.levels[0][0])
+
+    def sample(self, points, method="lttb"):
+        """(x, y) with at most `points` points, from the smallest level that has enough"""
+        x, y = self.levels[0]
+        for level_x, level_y in reversed(self.levels):
+            if len(level_x) >= points:
+                x, y = level_x, level_y
+                break
+        keep = (minmax if method == "minmax" else lttb)(x, y, points)
+        return x[keep], y[keep]
+
+
+def time_labels(ts, daily):
+    """UTC labels for epoch seconds: "YYYY-MM-DD", or "MM-DD HH:MM" for short ranges"""
+    stamps = np.datetime_as_string(np.asarray(ts, dtype="int64").astype("datetime64[s]"),
+                                   unit="D" if daily else "m").tolist()
+    return stamps if daily else [stamp[5:].replace("T", " ") for stamp in stamps]
+
+
+class ChartData:
+    def __init__(self, sources, ttl=CHART_CACHE_TTL, min_points=CHART_PYRAMID_MIN):
+        """
+        `sources` maps a series name to (version, load): `version(days)`
+        changes whenever the data behind a `days` range does, `load(days)`
+        returns (epoch seconds, values).
+        """
+        self.sources = sources
+        self.ttl = ttl
+        self.min_points = min_points
+        self.pyramids = TTLCache(maxsize=CHART_CACHE_SIZE, name="chart_pyramids")
+
+    def get(self, series, range_name, points=CHART_DEFAULT_POINTS, method="lttb"):
+        if series not in self.sources:
+            raise ValueError(f"Unknown series: {series} (expected one of {', '.join(self.sources)})")
+        if range_name not in CHART_RANGES:
+            raise ValueError(f"Unknown range: {range_name} (expected one of {', '.join(CHART_RANGES)})")
+        if method not in CHART_METHODS:
+            raise ValueError(f"Unknown method: {method} (expected one of {', '.join(CHART_METHODS)})")
+        if not 3 <= points <= CHART_MAX_POINTS:
+            raise ValueError(f"points must be between 3 and {CHART_MAX_POINTS}")
+
+        version, load = self.sources[series]
+        days = CHART_RANGES[range_name]
+        pyramid = self.pyramids.get_or_load(
+            (series, range_name, version(days)), lambda: ChartPyramid(*load(days), self.min_points), self.ttl)
+        x, y = pyramid.sample(points, method)
+
+        return {
+            "series": series,
+            "range": range_name,
+            "method": method,
+            "source_points": pyramid.source_points,
+            "points": len(x),
+            "data": [
+                {"ts": ts, "time": label, "price": round(price, 2)}
+                for ts, label, price in zip(x.astype("int64").tolist(), time_labels(x, days >= 30), y.tolist())
+            ],
+        }
@@ -0,0 +1,15 @@
+"""
+Gunicorn settings, picked up automatically from the working directory.
+
+Workers boot with heavy SDKs unimported (see lazy_imports.py); once a
+worker is up and serving, WARM_UP=1 (the default) loads them on a
+background thread so the first /ai-analysis does not pay for it.
+"""
+import os
+
+
+def post_worker_init(worker):
+    if os.getenv("WARM_UP", "1") == "1":
+        import app
+
+        app.warm_up_worker()
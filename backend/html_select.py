@@ -0,0 +1,94 @@
+"""
+Minimal CSS-selector text extraction on top of the stdlib HTML parser.
+
+Supports what the scrapers need: descendant chains of simple selectors made
+of an optional tag, `#id` and any number of `.class`es, e.g.
+`div#divProduct td.p-h.ph.product-rate span.bgm.e`. One streaming pass,
+no DOM is built.
+"""
+import re
+from html.parser import HTMLParser
+
+# Elements that never have a closing tag
+VOID_ELEMENTS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input",
+    "link", "meta", "param", "source", "track", "wbr",
+}
+
+_SIMPLE_SELECTOR = re.compile(r"^([a-zA-Z][\w-]*)?((?:[#.][\w-]+)*)$")
+
+
+def parse_selector(selector):
+    """'div#a.b span' -> [(tag, id, {classes}), ...]"""
+    parts = []
+    for token in selector.split():
+        match = _SIMPLE_SELECTOR.match(token)
+        if not match:
+            raise ValueError(f"Unsupported selector: {token!r}")
+        tag, rest = match.group(1), match.group(2)
+        element_id, classes = None, set()
+        for prefix, name in re.findall(r"([#.])([\w-]+)", rest):
+            if prefix == "#":
+                element_id = name
+            else:
+                classes.add(name)
+        parts.append((tag.lower() if tag else None, element_id, frozenset(classes)))
+    return parts
+
+
+def _matches(part, element):
+    tag, element_id, classes = part
+    return (
+        (tag is None or element[0] == tag)
+        and (element_id is None or element[1] == element_id)
+        and classes <= element[2]
+    )
+
+
+class _SelectorTextParser(HTMLParser):
+    def __init__(self, parts):
+        super().__init__(convert_charrefs=True)
+        self.parts = parts
+        self.stack = []  # (tag, id, classes, matched_depth)
+        self.capturing = []  # stack indices of matched elements still open
+        self.texts = []
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        element = (tag, attrs.get("id"), frozenset((attrs.get("class") or "").split()))
+
+        # Longest prefix of the selector chain matched by this element's ancestors
+        depth = self.stack[-1][3] if self.stack else 0
+        if depth < len(self.parts) and _matches(self.parts[depth], element):
+            depth += 1
+
+        if tag in VOID_ELEMENTS:
+            return
+        self.stack.append(element + (depth,))
+        if depth == len(self.parts) and not self.capturing:
+            self.capturing.append(len(self.stack) - 1)
+            self.texts.append("")
+
+    def handle_startendtag(self, tag, attrs):
+        pass  # self-closing elements hold no text
+
+    def handle_endtag(self, tag):
+        # Pop to the matching open tag, tolerating unclosed children
+        for index in range(len(self.stack) - 1, -1, -1):
+            if self.stack[index][0] == tag:
+                del self.stack[index:]
+                break
+        while self.capturing and self.capturing[-1] >= len(self.stack):
+            self.capturing.pop()
+
+    def handle_data(self, data):
+        if self.capturing:
+            self.texts[-1] += data
+
+
+def select_text(html, selector):
+    """Text content of every element matching `selector`, in document order"""
+    parser = _SelectorTextParser(parse_selector(selector))
+    parser.feed(html)
+    parser.close()
+    return [" ".join(text.split()) for text in parser.texts]
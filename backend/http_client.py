@@ -0,0 +1,81 @@
+"""
+Shared HTTP client: one keep-alive session pool and conditional GETs.
+
+Every outbound call (RSS feeds, NewsAPI) goes through the same
+`requests.Session` so TCP/TLS connections are reused. `fetch_parsed`
+remembers ETag/Last-Modified per URL and only parses a body when the
+server says it changed.
+"""
+import hashlib
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "16"))
+HTTP_FANOUT_WORKERS = int(os.getenv("HTTP_FANOUT_WORKERS", "8"))
+
+DEFAULT_HEADERS = {'User-Agent': 'Mozilla/5.0 (compatible; RSS Reader)'}
+
+_session = None
+_executor = None
+_lock = threading.Lock()
+
+# url -> {"etag", "last_modified", "digest"}
+_conditional_cache = {}
+
+
+def get_session():
+    """Process-wide keep-alive session"""
+    global _session
+    with _lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            session.headers.update(DEFAULT_HEADERS)
+            _session = session
+        return _session
+
+
+def get_executor():
+    """Thread pool used to fan requests out in parallel"""
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=HTTP_FANOUT_WORKERS, thread_name_prefix="http-fanout")
+        return _executor
+
+
+def fetch_parsed(url, parse, timeout=10):
+    """
+    Conditional GET of `url`, returning `parse(content)`.
+
+    A 304, or a 200 whose body hashes the same as last time, means nothing
+    new: it returns an empty list without calling `parse`.
+    """
+    cached = _conditional_cache.get(url)
+    headers = {}
+    if cached:
+        if cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+
+    response = get_session().get(url, headers=headers, timeout=timeout)
+
+    if response.status_code == 304 and cached:
+        return []
+    response.raise_for_status()
+
+    digest = hashlib.sha1(response.content).hexdigest()
+    value = [] if cached and cached["digest"] == digest else parse(response.content)
+    _conditional_cache[url] = {
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified"),
+        "digest": digest,
+    }
+    return value
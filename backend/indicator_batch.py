@@ -0,0 +1,159 @@
+"""
+Vectorized indicators for many assets and many windows at once.
+
+Every function takes a 2-D float array shaped (assets, time) and returns an
+array shaped (windows, assets, time), with NaN where a window is not yet
+full. Rolling means come from one cumulative sum per input, rolling extremes
+from a strided sliding-window view, and EMAs from block-wise matrix
+products, so there is no Python loop over assets or bars. Inputs are
+expected to be gap-free (forward-fill before calling).
+"""
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+EMA_BLOCK = 256
+
+
+def price_matrix(series_by_name):
+    """Align named close Series on a common index -> (names, index, matrix)"""
+    frame = pd.concat(series_by_name, axis=1).sort_index().ffill().dropna()
+    return list(frame.columns), frame.index, frame.to_numpy(dtype=float).T
+
+
+def _as_matrix(values):
+    values = np.asarray(values, dtype=float)
+    return values[np.newaxis, :] if values.ndim == 1 else values
+
+
+def _rolling_sums(values, windows):
+    """(windows, assets, time) rolling sums from one cumulative sum"""
+    values = _as_matrix(values)
+    assets, length = values.shape
+    csum = np.zeros((assets, length + 1))
+    np.cumsum(values, axis=1, out=csum[:, 1:])
+    out = np.full((len(windows), assets, length), np.nan)
+    for i, window in enumerate(windows):
+        if window <= length:
+            out[i, :, window - 1:] = csum[:, window:] - csum[:, :length - window + 1]
+    return out
+
+
+def sma(values, windows):
+    """Simple moving averages"""
+    return _rolling_sums(values, windows) / np.asarray(windows, dtype=float)[:, None, None]
+
+
+def rolling_std(values, windows, ddof=1):
+    """Rolling standard deviation (pandas' default ddof=1)"""
+    values = _as_matrix(values)
+    # Center each asset first so the sum-of-squares trick stays well conditioned
+    centered = values - values.mean(axis=1, keepdims=True)
+    n = np.asarray(windows, dtype=float)[:, None, None]
+    sums = _rolling_sums(centered, windows)
+    squares = _rolling_sums(centered * centered, windows)
+    variance = (squares - sums * sums / n) / (n - ddof)
+    return np.sqrt(np.clip(variance, 0, None))
+
+
+def rolling_max(values, windows):
+    return _rolling_extreme(values, windows, np.max)
+
+
+def rolling_min(values, windows):
+    return _rolling_extreme(values, windows, np.min)
+
+
+def _rolling_extreme(values, windows, reducer):
+    values = _as_matrix(values)
+    assets, length = values.shape
+    out = np.full((len(windows), assets, length), np.nan)
+    for i, window in enumerate(windows):
+        if window <= length:
+            out[i, :, window - 1:] = reducer(sliding_window_view(values, window, axis=1), axis=-1)
+    return out
+
+
+def ema(values, windows):
+    """
+    Exponential moving averages matching pandas `ewm(span=w, adjust=False)`.
+
+    The recursion is solved a block at a time: within a block every output
+    is a weighted sum of the block's inputs (one matrix product) plus the
+    decayed value carried in from the previous block.
+    """
+    values = _as_matrix(values)
+    assets, length = values.shape
+    out = np.empty((len(windows), assets, length))
+    if length == 0:
+        return out
+
+    lags = np.arange(EMA_BLOCK)
+    lag_matrix = lags[:, None] - lags[None, :]
+    for i, window in enumerate(windows):
+        alpha = 2.0 / (window + 1)
+        decay = 1.0 - alpha
+        weights = np.where(lag_matrix >= 0, alpha * decay ** np.clip(lag_matrix, 0, None), 0.0)
+        carry_decay = decay ** (lags + 1)
+
+        previous = values[:, 0]
+        for start in range(0, length, EMA_BLOCK):
+            block = values[:, start:start + EMA_BLOCK]
+            size = block.shape[1]
+            result = block @ weights[:size, :size].T + previous[:, None] * carry_decay[:size]
+            out[i, :, start:start + size] = result
+            previous = result[:, -1]
+    return out
+
+
+def rsi(values, windows):
+    """RSI from rolling-mean gains and losses (the same definition as get_technical_indicators)"""
+    values = _as_matrix(values)
+    # The first bar counts as a zero change, as pandas' delta.where(..., 0) does
+    delta = np.diff(values, axis=1, prepend=values[:, :1])
+    gains = _rolling_sums(np.clip(delta, 0, None), windows)
+    losses = _rolling_sums(np.clip(-delta, 0, None), windows)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        result = 100 - 100 / (1 + gains / losses)
+    return np.where((losses == 0) & (gains > 0), 100.0, result)
+
+
+def bollinger(values, windows, num_std=2.0):
+    """(middle, upper, lower) bands"""
+    middle = sma(values, windows)
+    width = num_std * rolling_std(values, windows)
+    return middle, middle + width, middle - width
+
+
+def true_range(high, low, close):
+    high, low, close = _as_matrix(high), _as_matrix(low), _as_matrix(close)
+    previous_close = np.concatenate([close[:, :1], close[:, :-1]], axis=1)
+    return np.maximum(high - low, np.maximum(np.abs(high - previous_close), np.abs(low - previous_close)))
+
+
+def atr(high, low, close, windows):
+    """Average true range as a simple rolling mean of the true range"""
+    return sma(true_range(high, low, close), windows)
+
+
+def compute_indicator_batch(close, windows=(5, 20), high=None, low=None, num_std=2.0):
+    """
+    Every supported indicator for every (window, asset, bar) in one call.
+
+    Returns a dict of arrays shaped (len(windows), assets, time). ATR is
+    only included when `high` and `low` are given.
+    """
+    windows = tuple(int(w) for w in windows)
+    middle, upper, lower = bollinger(close, windows, num_std)
+    result = {
+        "sma": middle,
+        "ema": ema(close, windows),
+        "rsi": rsi(close, windows),
+        "bollinger_upper": upper,
+        "bollinger_lower": lower,
+        "rolling_high": rolling_max(close, windows),
+        "rolling_low": rolling_min(close, windows),
+    }
+    if high is not None and low is not None:
+        result["atr"] = atr(high, low, close, windows)
+    return result
@@ -0,0 +1,221 @@
+"""
+Streaming technical indicators with O(1) work per new bar or tick.
+
+`IndicatorEngine` keeps rolling sums for the SMAs and RSI and monotonic
+deques for the rolling high/low, so committing a closed bar or previewing
+a live tick never rescans history. With the default `rsi_mode="sma"` it
+reproduces the pandas `rolling()` numbers `get_technical_indicators`
+has always reported; `rsi_mode="wilder"` switches to Wilder smoothing.
+"""
+import math
+import threading
+from collections import deque
+
+
+class RollingWindow:
+    """Last `size` values with running sum and amortized O(1) max/min"""
+
+    def __init__(self, size):
+        self.size = size
+        self.values = deque()
+        self.total = 0.0
+        self.pushed = 0
+        self._max = deque()  # (index, value), values decreasing
+        self._min = deque()  # (index, value), values increasing
+
+    def __len__(self):
+        return len(self.values)
+
+    @property
+    def full(self):
+        return len(self.values) == self.size
+
+    def push(self, value):
+        index = self.pushed
+        self.pushed += 1
+        self.values.append(value)
+        self.total += value
+        if len(self.values) > self.size:
+            self.total -= self.values.popleft()
+        if self.pushed % (self.size * 1000) == 0:
+            self.total = math.fsum(self.values)  # shed accumulated rounding drift
+
+        while self._max and self._max[-1][1] <= value:
+            self._max.pop()
+        self._max.append((index, value))
+        while self._min and self._min[-1][1] >= value:
+            self._min.pop()
+        self._min.append((index, value))
+
+        oldest = self.pushed - self.size
+        if self._max[0][0] < oldest:
+            self._max.popleft()
+        if self._min[0][0] < oldest:
+            self._min.popleft()
+
+    def mean(self):
+        return self.total / len(self.values) if self.values else math.nan
+
+    def max(self):
+        return self._max[0][1] if self._max else math.nan
+
+    def min(self):
+        return self._min[0][1] if self._min else math.nan
+
+    # --- previews: the window as if `value` were pushed, without mutating it ---
+
+    def peek_sum(self, value):
+        return self.total - (self.values[0] if self.full else 0.0) + value
+
+    def peek_mean(self, value):
+        return self.peek_sum(value) / min(self.size, len(self.values) + 1)
+
+    def _survivor(self, monotonic):
+        """Extreme of the window after the oldest value would drop out"""
+        if not monotonic:
+            return None
+        if not self.full or monotonic[0][0] > self.pushed - self.size:
+            return monotonic[0][1]
+        return monotonic[1][1] if len(monotonic) > 1 else None
+
+    def peek_max(self, value):
+        survivor = self._survivor(self._max)
+        return value if survivor is None else max(survivor, value)
+
+    def peek_min(self, value):
+        survivor = self._survivor(self._min)
+        return value if survivor is None else min(survivor, value)
+
+
+class IndicatorEngine:
+    """Incremental SMA fast/slow, RSI and rolling support/resistance"""
+
+    def __init__(self, fast=5, slow=20, rsi_period=14, range_window=20, rsi_mode="sma"):
+        if rsi_mode not in ("sma", "wilder"):
+            raise ValueError("rsi_mode must be 'sma' or 'wilder'")
+        self.fast = RollingWindow(fast)
+        self.slow = RollingWindow(slow)
+        self.range = RollingWindow(range_window)
+        self.gains = RollingWindow(rsi_period)
+        self.losses = RollingWindow(rsi_period)
+        self.rsi_period = rsi_period
+        self.rsi_mode = rsi_mode
+        self.avg_gain = None  # Wilder state
+        self.avg_loss = None
+        self.last_price = None
+        self.last_ts = None
+        self.bars = 0
+        self.lock = threading.Lock()  # for engines shared between requests
+
+    @classmethod
+    def from_history(cls, closes, **kwargs):
+        """Warm-start from a pandas Series (or any iterable) of closes"""
+        engine = cls(**kwargs)
+        if hasattr(closes, "items"):
+            for ts, price in closes.items():
+                engine.update(float(price), ts)
+        else:
+            for price in closes:
+                engine.update(float(price))
+        return engine
+
+    def update(self, price, ts=None):
+        """Commit a closed bar"""
+        if self.last_price is not None:
+            delta = price - self.last_price
+            gain, loss = max(delta, 0.0), max(-delta, 0.0)
+            self.gains.push(gain)
+            self.losses.push(loss)
+            if self.rsi_mode == "wilder":
+                self.avg_gain, self.avg_loss = self._wilder_step(gain, loss)
+
+        self.fast.push(price)
+        self.slow.push(price)
+        self.range.push(price)
+        self.last_price = price
+        self.last_ts = ts
+        self.bars += 1
+
+    def sync(self, closes):
+        """
+        Commit bars of a time-indexed Series newer than the last committed one.
+
+        The final bar is treated as still forming and is not committed;
+        its close is returned so callers can preview it with `snapshot`.
+        """
+        closed = closes.iloc[:-1]
+        if self.last_ts is not None:
+            closed = closed.iloc[closed.index.searchsorted(self.last_ts, side="right"):]
+        for ts, price in closed.items():
+            self.update(float(price), ts)
+        return float(closes.iloc[-1])
+
+    def _wilder_step(self, gain, loss):
+        n = self.rsi_period
+        if self.avg_gain is None:
+            if len(self.gains) < n:
+                return None, None
+            # Seed with the simple average of the first full window
+            return self.gains.total / n, self.losses.total / n
+        return (self.avg_gain * (n - 1) + gain) / n, (self.avg_loss * (n - 1) + loss) / n
+
+    def _rsi(self, live_price=None):
+        if live_price is None or self.last_price is None:
+            gain_sum, loss_sum, count = self.gains.total, self.losses.total, len(self.gains)
+            avg_gain, avg_loss = self.avg_gain, self.avg_loss
+        else:
+            delta = live_price - self.last_price
+            gain, loss = max(delta, 0.0), max(-delta, 0.0)
+            gain_sum, loss_sum = self.gains.peek_sum(gain), self.losses.peek_sum(loss)
+            count = min(self.rsi_period, len(self.gains) + 1)
+            if self.rsi_mode == "wilder":
+                n = self.rsi_period
+                if self.avg_gain is not None:
+                    avg_gain = (self.avg_gain * (n - 1) + gain) / n
+                    avg_loss = (self.avg_loss * (n - 1) + loss) / n
+                elif count == n:
+                    avg_gain, avg_loss = gain_sum / n, loss_sum / n
+                else:
+                    avg_gain = avg_loss = None
+
+        if self.rsi_mode == "sma":
+            if count < self.rsi_period:
+                return 50.0
+            avg_gain, avg_loss = gain_sum / count, loss_sum / count
+        elif avg_gain is None:
+            return 50.0
+
+        if avg_loss == 0:
+            return 100.0 if avg_gain > 0 else 50.0
+        return 100 - 100 / (1 + avg_gain / avg_loss)
+
+    def snapshot(self, live_price=None):
+        """Raw indicator values, optionally including a not-yet-closed price"""
+        if live_price is None:
+            return {
+                "sma_fast": self.fast.mean(),
+                "sma_slow": self.slow.mean(),
+                "rsi": self._rsi(),
+                "high": self.range.max(),
+                "low": self.range.min(),
+            }
+        return {
+            "sma_fast": self.fast.peek_mean(live_price),
+            "sma_slow": self.slow.peek_mean(live_price),
+            "rsi": self._rsi(live_price),
+            "high": self.range.peek_max(live_price),
+            "low": self.range.peek_min(live_price),
+        }
+
+    def indicators(self, exchange_rate, live_price=None, scale=32.15):
+        """`get_technical_indicators`-shaped dict in INR per kg"""
+        values = self.snapshot(live_price)
+        to_inr = scale * exchange_rate
+        return {
+            "sma_5": round(values["sma_fast"] * to_inr, 2),
+            "sma_20": round(values["sma_slow"] * to_inr, 2),
+            "rsi": round(float(values["rsi"]), 2),
+            "resistance": round(values["high"] * to_inr, 2),
+            "support": round(values["low"] * to_inr, 2),
+            "trend": "Bullish" if values["sma_fast"] > values["sma_slow"] else "Bearish",
+        }
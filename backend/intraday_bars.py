@@ -0,0 +1,218 @@
+"""
+Intraday OHLCV bars at one base resolution with lazily resampled timeframes.
+
+Downloaded 1m bars and live ticks (quotes from the price feed) are folded
+into 1-minute base bars kept in compact `array('d')` columns. A coarser
+timeframe (5m, 15m, 1h, 1d; buckets aligned to UTC) is aggregated from the
+base bars the first time it is asked for and then kept up to date: a tick
+only touches the newest bucket of each view, and merging downloaded bars
+re-aggregates each view from the first bucket the merge changed.
+"""
+import os
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+
+from lazy_imports import lazy_import
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+BASE_SECONDS = 60
+TIMEFRAMES = {"1m": 60, "5m": 300, "15m": 900, "1h": 3600, "1d": 86400}  # bucket seconds
+INTRADAY_MAX_BARS = int(os.getenv("INTRADAY_MAX_BARS", str(14 * 1440)))  # base bars kept per series
+
+FIELDS = ("open", "high", "low", "close", "volume")
+COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+
+
+class _Bars:
+    """OHLCV columns, oldest first"""
+
+    def __init__(self):
+        self.ts = array("d")
+        self.columns = {field: array("d") for field in FIELDS}
+
+    def __len__(self):
+        return len(self.ts)
+
+    def append(self, ts, open_, high, low, close, volume):
+        self.ts.append(ts)
+        for field, value in zip(FIELDS, (open_, high, low, close, volume)):
+            self.columns[field].append(value)
+
+    def extend(self, ts, columns):
+        self.ts.extend(ts)
+        for field in FIELDS:
+            self.columns[field].extend(columns[field])
+
+    def fold(self, price, volume):
+        """Fold a tick into the newest bar"""
+        self.columns["high"][-1] = max(self.columns["high"][-1], price)
+        self.columns["low"][-1] = min(self.columns["low"][-1], price)
+        self.columns["close"][-1] = price
+        self.columns["volume"][-1] += volume
+
+    def tail(self, index):
+        """Copy of the bars from `index` on, as (ts, columns)"""
+        return self.ts[index:], {field: values[index:] for field, values in self.columns.items()}
+
+    def truncate(self, index):
+        del self.ts[index:]
+        for values in self.columns.values():
+            del values[index:]
+
+    def drop_head(self, n):
+        del self.ts[:n]
+        for values in self.columns.values():
+            del values[:n]
+
+
+def resample(ts, columns, seconds):
+    """Aggregate sorted bars into `seconds` buckets: first open, max high, min low, last close, summed volume"""
+    ts = np.frombuffer(ts, dtype=float) if isinstance(ts, array) else np.asarray(ts, dtype=float)
+    if not len(ts):
+        return array("d"), {field: array("d") for field in FIELDS}
+    values = {field: np.asarray(columns[field], dtype=float) for field in FIELDS}
+    buckets = ts - ts % seconds
+    starts = np.flatnonzero(np.concatenate(([True], buckets[1:] != buckets[:-1])))
+    ends = np.append(starts[1:], len(ts)) - 1
+    aggregated = {
+        "open": values["open"][starts],
+        "high": np.maximum.reduceat(values["high"], starts),
+        "low": np.minimum.reduceat(values["low"], starts),
+        "close": values["close"][ends],
+        "volume": np.add.reduceat(values["volume"], starts),
+    }
+    return array("d", buckets[starts].tolist()), {field: array("d", aggregated[field].tolist()) for field in FIELDS}
+
+
+class BarSeries:
+    def __init__(self, max_bars=INTRADAY_MAX_BARS):
+        self.max_bars = max_bars
+        self.base = _Bars()
+        self.views = {}  # timeframe -> _Bars, built on first use
+        self.version = 0  # bumped on every change
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.base)
+
+    def add_tick(self, ts, price, volume=0.0):
+        """Fold one price into its 1-minute bar; ignored if older than the newest bar"""
+        if price is None:
+            return False
+        price = float(price)
+        start = float(ts - ts % BASE_SECONDS)
+        with self.lock:
+            base = self.base
+            if base.ts and start < base.ts[-1]:
+                return False
+            if base.ts and start == base.ts[-1]:
+                base.fold(price, volume)
+                for view in self.views.values():
+                    view.fold(price, volume)
+            else:
+                base.append(start, price, price, price, price, volume)
+                for name, view in self.views.items():
+                    bucket = start - start % TIMEFRAMES[name]
+                    if view.ts and view.ts[-1] == bucket:
+                        view.fold(price, volume)
+                    else:
+                        view.append(bucket, price, price, price, price, volume)
+                self._trim()
+            self.version += 1
+        return True
+
+    def add_bars(self, frame):
+        """
+        Merge downloaded 1m bars (an OHLCV frame), replacing stored bars
+        in the span they cover and keeping newer ones (e.g. later ticks).
+        """
+        if frame is None or frame.empty:
+            return 0
+        frame = frame.reindex(columns=COLUMNS).dropna(subset=["Close"])
+        if frame.empty:
+            return 0
+        index = pd.DatetimeIndex(frame.index)
+        if index.tz is not None:
+            index = index.tz_convert("UTC").tz_localize(None)
+        ts = index.as_unit("s").asi8.astype(float)
+        ts -= ts % BASE_SECONDS
+        close = frame["Close"].to_numpy(dtype=float)
+        incoming = {
+            "open": frame["Open"].fillna(frame["Close"]).to_numpy(dtype=float),
+            "high": frame["High"].fillna(frame["Close"]).to_numpy(dtype=float),
+            "low": frame["Low"].fillna(frame["Close"]).to_numpy(dtype=float),
+            "close": close,
+            "volume": frame["Volume"].fillna(0.0).to_numpy(dtype=float),
+        }
+        # Several rows inside one minute collapse into a single base bar
+        ts, incoming = resample(ts, incoming, BASE_SECONDS)
+
+        with self.lock:
+            base = self.base
+            first, last = ts[0], ts[-1]
+            newer = base.tail(bisect_right(base.ts, last))
+            base.truncate(bisect_left(base.ts, first))
+            base.extend(ts, incoming)
+            base.extend(*newer)
+            for name, view in self.views.items():
+                self._refresh(name, view, first)
+            self._trim()
+            self.version += 1
+        return len(ts)
+
+    def _refresh(self, name, view, changed_from):
+        """Re-aggregate `view` from the bucket holding `changed_from` onwards"""
+        bucket = changed_from - changed_from % TIMEFRAMES[name]
+        view.truncate(bisect_left(view.ts, bucket))
+        view.extend(*resample(*self.base.tail(bisect_left(self.base.ts, bucket)), TIMEFRAMES[name]))
+
+    def _trim(self):
+        excess = len(self.base) - self.max_bars
+        if excess > 0:
+            self.base.drop_head(excess + self.max_bars // 4)
+            self.views.clear()  # the oldest bucket may now be partial; rebuilt on next use
+
+    def _view(self, timeframe):
+        if timeframe not in TIMEFRAMES:
+            raise ValueError(f"Unknown timeframe: {timeframe} (expected one of {', '.join(TIMEFRAMES)})")
+        if timeframe == "1m":
+            return self.base
+        view = self.views.get(timeframe)
+        if view is None:
+            view = self.views[timeframe] = _Bars()
+            view.extend(*resample(self.base.ts, self.base.columns, TIMEFRAMES[timeframe]))
+        return view
+
+    def bars(self, timeframe="1m", since=None, limit=None):
+        """Bars of `timeframe` (after `since`, epoch seconds; newest `limit`) as (ts, columns) copies"""
+        with self.lock:
+            view = self._view(timeframe)
+            start = bisect_right(view.ts, since) if since is not None else 0
+            if limit is not None:
+                start = max(start, len(view) - limit)
+            return view.tail(start)
+
+    def frame(self, timeframe="1m", since=None, limit=None):
+        """Bars of `timeframe` as a frame shaped like a yfinance download (naive UTC index)"""
+        ts, columns = self.bars(timeframe, since, limit)
+        frame = pd.DataFrame({column: np.asarray(columns[field]) for column, field in zip(COLUMNS, FIELDS)})
+        frame.index = pd.to_datetime(np.asarray(ts), unit="s")
+        frame.index.name = "Date"
+        return frame
+
+    def last_timestamp(self):
+        with self.lock:
+            return self.base.ts[-1] if self.base.ts else None
+
+    def status(self):
+        with self.lock:
+            return {
+                "bars": len(self.base),
+                "first_ts": self.base.ts[0] if self.base.ts else None,
+                "last_ts": self.base.ts[-1] if self.base.ts else None,
+                "views": {name: len(view) for name, view in self.views.items()},
+                "version": self.version,
+            }
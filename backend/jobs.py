@@ -0,0 +1,183 @@
+"""
+Bounded background job runner for slow pipelines such as /ai-analysis.
+
+`submit` returns a job id right away and the work runs on a small thread
+pool, so long analyses no longer hold a gunicorn worker for their whole
+duration. Job records live in SQLite (WAL mode) next to the trade ledger,
+so a job submitted to one worker can be polled through any other. Each
+process caps the jobs it has queued; finished jobs are kept for
+AI_JOB_RESULT_TTL seconds so clients can poll for the result. Jobs left
+queued or running by a worker that has since exited are marked failed
+when the next runner starts.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+AI_JOB_WORKERS = int(os.getenv("AI_JOB_WORKERS", "4"))
+AI_JOB_QUEUE_LIMIT = int(os.getenv("AI_JOB_QUEUE_LIMIT", "32"))
+AI_JOB_RESULT_TTL = float(os.getenv("AI_JOB_RESULT_TTL", "600"))  # seconds
+AI_JOBS_DB_PATH = os.getenv(
+    "AI_JOBS_DB_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "jobs.sqlite3")
+)
+
+_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS jobs (
+        job_id TEXT PRIMARY KEY,
+        owner INTEGER NOT NULL,
+        status TEXT NOT NULL,
+        submitted_at REAL NOT NULL,
+        started_at REAL,
+        finished_at REAL,
+        result TEXT,
+        error TEXT
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_jobs_finished ON jobs (finished_at)",
+]
+
+_FIELDS = ("job_id", "status", "submitted_at", "started_at", "finished_at", "result", "error")
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True  # exists, owned by someone else
+    return True
+
+
+class QueueFullError(Exception):
+    """Raised by JobRunner.submit when the backlog limit is reached"""
+
+
+class JobRunner:
+    def __init__(self, workers=AI_JOB_WORKERS, queue_limit=AI_JOB_QUEUE_LIMIT,
+                 result_ttl=AI_JOB_RESULT_TTL, name="jobs", path=AI_JOBS_DB_PATH):
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=name)
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self.result_ttl = result_ttl
+        self.path = path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._local = threading.local()
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        for statement in _SCHEMA:
+            conn.execute(statement)
+        self._fail_orphans()
+        self.lock = threading.Lock()
+        self.queued = 0  # this process's jobs waiting for a pool thread
+        self.running = 0
+        self.counters = {"submitted": 0, "completed": 0, "failed": 0, "rejected": 0}
+        self.wait_ms_total = 0.0
+        self.run_ms_total = 0.0
+
+    def _conn(self):
+        """One connection per thread; sqlite connections are not thread-safe"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+        return conn
+
+    def _fail_orphans(self):
+        """Fail jobs left queued/running by workers that are no longer alive"""
+        conn = self._conn()
+        owners = [row[0] for row in conn.execute(
+            "SELECT DISTINCT owner FROM jobs WHERE status IN ('queued', 'running')")]
+        for owner in owners:
+            if owner != os.getpid() and not _pid_alive(owner):
+                conn.execute(
+                    "UPDATE jobs SET status = 'failed', error = ?, finished_at = ? "
+                    "WHERE owner = ? AND status IN ('queued', 'running')",
+                    ("Worker exited before the job finished", time.time(), owner),
+                )
+
+    def submit(self, fn, *args, **kwargs):
+        """Queue `fn(*args, **kwargs)` and return the new job id"""
+        with self.lock:
+            if self.queued >= self.queue_limit:
+                self.counters["rejected"] += 1
+                raise QueueFullError("Too many analyses queued, try again shortly")
+            self.queued += 1  # reserve the slot; released below if the job never gets queued
+
+        job_id = uuid.uuid4().hex
+        try:
+            conn = self._conn()
+            conn.execute("DELETE FROM jobs WHERE finished_at < ?", (time.time() - self.result_ttl,))
+            conn.execute("INSERT INTO jobs (job_id, owner, status, submitted_at) VALUES (?, ?, 'queued', ?)",
+                         (job_id, os.getpid(), time.time()))
+            self.executor.submit(self._run, job_id, fn, args, kwargs)
+        except Exception:
+            with self.lock:
+                self.queued -= 1
+            raise
+        with self.lock:
+            self.counters["submitted"] += 1
+        return job_id
+
+    def _run(self, job_id, fn, args, kwargs):
+        started_at = time.time()
+        conn = self._conn()
+        conn.execute("UPDATE jobs SET status = 'running', started_at = ? WHERE job_id = ?", (started_at, job_id))
+        submitted_at = conn.execute("SELECT submitted_at FROM jobs WHERE job_id = ?", (job_id,)).fetchone()[0]
+        with self.lock:
+            self.queued -= 1
+            self.running += 1
+            self.wait_ms_total += (started_at - submitted_at) * 1000
+
+        try:
+            result = fn(*args, **kwargs)
+            status, error = "done", None
+            if isinstance(result, dict) and "error" in result:
+                # The pipeline reports its own failures as {"error": ...}
+                status, error = "failed", str(result["error"])
+        except Exception as e:
+            print(f"Job {job_id} failed: {e}")
+            result, status, error = None, "failed", str(e)
+
+        finished_at = time.time()
+        conn.execute(
+            "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ? WHERE job_id = ?",
+            (status, json.dumps(result, default=str) if result is not None else None, error, finished_at, job_id),
+        )
+        with self.lock:
+            self.running -= 1
+            self.counters["completed" if status == "done" else "failed"] += 1
+            self.run_ms_total += (finished_at - started_at) * 1000
+
+    def get(self, job_id):
+        """The job record (from any worker), or None if unknown/expired"""
+        row = self._conn().execute(
+            f"SELECT {', '.join(_FIELDS)} FROM jobs WHERE job_id = ? AND (finished_at IS NULL OR finished_at >= ?)",
+            (job_id, time.time() - self.result_ttl),
+        ).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job["result"] = json.loads(job["result"]) if job["result"] is not None else None
+        return job
+
+    def metrics(self):
+        """Queue depth and throughput of this process's pool"""
+        with self.lock:
+            finished = self.counters["completed"] + self.counters["failed"]
+            started = finished + self.running
+            return {
+                "workers": self.workers,
+                "queue_depth": self.queued,
+                "running": self.running,
+                "queue_limit": self.queue_limit,
+                **self.counters,
+                "avg_wait_ms": round(self.wait_ms_total / started, 1) if started else 0,
+                "avg_run_ms": round(self.run_ms_total / finished, 1) if finished else 0,
+            }
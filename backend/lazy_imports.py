@@ -0,0 +1,67 @@
+"""
+Deferred imports for heavy dependencies.
+
+`lazy_import("pandas")` returns a stand-in that imports the real module on
+first attribute access, so `import app` stays cheap and a worker can serve
+routes that never touch pandas/yfinance/Gemini straight away. `warm_up`
+loads the same modules on a background thread once the worker is up.
+"""
+import importlib
+import threading
+import time
+
+HEAVY_MODULES = ("pandas", "numpy", "yfinance", "google.generativeai", "feedparser", "playwright.sync_api")
+
+
+class LazyModule:
+    """Module proxy; attribute reads and writes go to the module, imported on first use"""
+
+    def __init__(self, name):
+        object.__setattr__(self, "_name", name)
+        object.__setattr__(self, "_module", None)
+
+    def _load(self):
+        module = self._module
+        if module is None:
+            # import_module holds the per-module import lock, so racing threads import once
+            module = importlib.import_module(self._name)
+            object.__setattr__(self, "_module", module)
+        return module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __setattr__(self, attr, value):
+        setattr(self._load(), attr, value)
+
+    def __delattr__(self, attr):
+        delattr(self._load(), attr)
+
+    def __repr__(self):
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<lazy module {self._name!r} ({state})>"
+
+
+def lazy_import(name):
+    return LazyModule(name)
+
+
+def warm_up(modules=HEAVY_MODULES, then=None):
+    """Import `modules` on a daemon thread, then call `then()`; returns the thread"""
+    def run():
+        start = time.perf_counter()
+        for name in modules:
+            try:
+                importlib.import_module(name)
+            except Exception as e:
+                print(f"Warm-up import of {name} failed: {e}")
+        if then is not None:
+            try:
+                then()
+            except Exception as e:
+                print(f"Warm-up hook failed: {e}")
+        print(f"Warm-up finished in {time.perf_counter() - start:.2f}s")
+
+    thread = threading.Thread(target=run, name="warm-up", daemon=True)
+    thread.start()
+    return thread
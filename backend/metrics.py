@@ -0,0 +1,178 @@
+"""
+In-process latency histograms and counters rendered in Prometheus text format.
+
+Pipeline stages are wrapped in `timed("stage", ...)` spans that feed one
+histogram family; `count_fallback("kind")` records each time a degraded
+answer (estimated price, fixed FX rate, cached feed, ...) was served.
+Observing a value is a bisect plus a few additions under a per-metric lock,
+so spans are cheap enough to leave on in production.
+"""
+import bisect
+import functools
+import threading
+import time
+from contextlib import contextmanager
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=()):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    pairs.extend(f'{name}="{_escape(value)}"' for name, value in extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def inc(self, *label_values, amount=1):
+        with self.lock:
+            self.values[label_values] = self.values.get(label_values, 0) + amount
+
+    def get(self, *label_values):
+        return self.values.get(label_values, 0)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self.lock:
+            for label_values, value in sorted(self.values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labels, label_values)} {_format_value(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, help, labels=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        self.series = {}  # label values -> [bucket counts..., +Inf count, sum]
+        self.lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            series = self.series.get(label_values)
+            if series is None:
+                series = self.series[label_values] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    def count(self, *label_values):
+        series = self.series.get(label_values)
+        return sum(series[:-1]) if series else 0
+
+    def total(self, *label_values):
+        """Sum of observed values for one label set"""
+        series = self.series.get(label_values)
+        return series[-1] if series else 0.0
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self.lock:
+            snapshot = sorted((key, list(series)) for key, series in self.series.items())
+        for label_values, series in snapshot:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series[:-1]):
+                cumulative += count
+                labels = _format_labels(self.labels, label_values, [("le", _format_value(bound))])
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labels, label_values)
+            lines.append(f"{self.name}_sum{labels} {series[-1]!r}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self):
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+STAGE_SECONDS = REGISTRY.register(Histogram(
+    "finance_stage_duration_seconds", "Latency of upstream calls and pipeline stages", ("stage", "source")
+))
+STAGE_ERRORS = REGISTRY.register(Counter(
+    "finance_stage_errors_total", "Stage calls that raised", ("stage", "source")
+))
+FALLBACKS = REGISTRY.register(Counter(
+    "finance_fallbacks_total", "Degraded answers served instead of live data", ("kind",)
+))
+SCRAPE_RESULTS = REGISTRY.register(Counter(
+    "finance_scrape_results_total", "Retail price scrape attempts by path and outcome", ("path", "outcome")
+))
+HTTP_SECONDS = REGISTRY.register(Histogram(
+    "finance_http_request_duration_seconds", "Flask route latency until the response is returned",
+    ("route", "method", "status")
+))
+
+
+@contextmanager
+def timed(stage, source=""):
+    """Record the duration of the enclosed block under `stage` (and optional `source`)"""
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        STAGE_ERRORS.inc(stage, source)
+        raise
+    finally:
+        STAGE_SECONDS.observe(time.perf_counter() - start, stage, source)
+
+
+def timed_function(stage):
+    """Decorator form of `timed`"""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with timed(stage):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def count_fallback(kind):
+    FALLBACKS.inc(kind)
+
+
+def init_app(app):
+    """Time every Flask route, labelled by its URL rule rather than the raw path"""
+    from flask import g, request
+
+    @app.before_request
+    def _start_timer():
+        g.metrics_start = time.perf_counter()
+
+    @app.after_request
+    def _observe_request(response):
+        start = g.pop("metrics_start", None)
+        if start is not None:
+            route = request.url_rule.rule if request.url_rule else "unmatched"
+            HTTP_SECONDS.observe(time.perf_counter() - start, route, request.method, str(response.status_code))
+        return response
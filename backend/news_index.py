@@ -0,0 +1,205 @@
+"""
+Rolling, deduplicated index of news articles (SQLite).
+
+Every article seen in any feed is keyed by a hash of its normalised title
+and description, so the same story syndicated across feeds, or re-served
+in the next fetch, is stored and keyword-checked once. Publication times
+are parsed to UTC epoch seconds (RFC 822 from RSS, ISO 8601 from NewsAPI),
+and an index on (relevant, published_ts) answers "newest N relevant
+articles" by walking N index entries, without refetching feeds.
+
+A `NewsRefresher` thread ingests new entries in the background; with
+several workers only the elected feed leader ingests and the others read
+the shared index.
+"""
+import calendar
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+NEWS_DB_PATH = os.getenv(
+    "NEWS_DB_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "news.sqlite3")
+)
+NEWS_INDEX_MAX = int(os.getenv("NEWS_INDEX_MAX", "2000"))  # newest articles kept after pruning
+NEWS_REFRESH_INTERVAL = float(os.getenv("NEWS_REFRESH_INTERVAL", "300"))  # seconds
+
+_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS articles (
+        key TEXT PRIMARY KEY,
+        published_ts REAL NOT NULL,
+        relevant INTEGER NOT NULL,
+        title TEXT NOT NULL,
+        description TEXT NOT NULL,
+        source TEXT NOT NULL,
+        published TEXT NOT NULL,
+        weight REAL NOT NULL
+    ) WITHOUT ROWID
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_articles_newest ON articles (relevant, published_ts DESC)",
+]
+
+_COLUMNS = ["key", "published_ts", "relevant", "title", "description", "source", "published", "weight"]
+
+
+def article_key(title, description):
+    """Content hash that ignores case and whitespace differences"""
+    text = " ".join(title.lower().split()) + "\n" + " ".join(description.lower().split())
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def parse_published(value, parsed=None):
+    """
+    UTC epoch seconds for a feed timestamp, or None if it cannot be read.
+
+    `parsed` is feedparser's `*_parsed` struct_time (already UTC), used when present.
+    """
+    if parsed:
+        return float(calendar.timegm(parsed))
+    if not value:
+        return None
+    try:
+        moment = parsedate_to_datetime(value)  # RFC 822: "Thu, 09 Oct 2025 05:53:20 GMT"
+    except (TypeError, ValueError):
+        try:
+            moment = datetime.fromisoformat(value.strip().replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.timestamp()
+
+
+class NewsIndex:
+    def __init__(self, path=NEWS_DB_PATH, max_articles=NEWS_INDEX_MAX):
+        self.path = path
+        self.max_articles = max_articles
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            for statement in _SCHEMA:
+                self._conn.execute(statement)
+            self._conn.commit()
+
+    def known_keys(self, keys):
+        """Subset of `keys` already in the index"""
+        keys = list(keys)
+        if not keys:
+            return set()
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT key FROM articles WHERE key IN ({','.join('?' * len(keys))})", keys
+            ).fetchall()
+        return {row[0] for row in rows}
+
+    def add(self, articles):
+        """Insert articles (dicts with every column) not seen before; returns how many were new"""
+        rows = [tuple(article[column] for column in _COLUMNS) for article in articles]
+        if not rows:
+            return 0
+        with self._lock:
+            before = self._conn.total_changes
+            self._conn.executemany(
+                f"INSERT OR IGNORE INTO articles ({', '.join(_COLUMNS)}) VALUES ({', '.join('?' * len(_COLUMNS))})",
+                rows,
+            )
+            added = self._conn.total_changes - before
+            self._conn.commit()
+        return added
+
+    def prune(self):
+        """Drop the oldest articles beyond `max_articles`; quiet feeds keep their last stories"""
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM articles WHERE key NOT IN "
+                "(SELECT key FROM articles ORDER BY published_ts DESC LIMIT ?)",
+                (self.max_articles,),
+            )
+            self._conn.commit()
+
+    def latest(self, limit):
+        """Newest relevant articles, newest first, shaped like the feed parsers' output"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT title, description, source, published, weight FROM articles "
+                "WHERE relevant = 1 ORDER BY published_ts DESC LIMIT ?",
+                (limit,),
+            ).fetchall()
+        return [
+            {"title": title, "description": description, "source": source, "published": published, "weight": weight}
+            for title, description, source, published, weight in rows
+        ]
+
+    def count(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+
+
+class NewsRefresher:
+    """
+    Runs `ingest()` every `interval` seconds on a daemon thread while
+    `is_leader()` holds; concurrent callers share one run.
+    """
+
+    def __init__(self, ingest, interval=NEWS_REFRESH_INTERVAL, is_leader=None):
+        self.ingest = ingest
+        self.interval = interval
+        self.is_leader = is_leader or (lambda: True)
+        self._thread = None
+        self._stop = threading.Event()
+        self._run_lock = threading.Lock()
+        self._ran_at = 0.0
+        self.runs = 0
+        self.last_added = None
+        self.last_error = None
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="news-refresher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _loop(self):
+        while not self._stop.is_set():
+            # Checked every pass: a follower takes over when the leader exits
+            if time.monotonic() - self._ran_at >= self.interval and self.is_leader():
+                self.run()
+            self._stop.wait(max(1.0, self.interval - (time.monotonic() - self._ran_at)))
+
+    def run(self):
+        """Ingest now, unless another caller finished a run while we waited"""
+        requested_at = time.monotonic()
+        with self._run_lock:
+            if self._ran_at >= requested_at:
+                return self.last_added
+            try:
+                self.last_added = self.ingest()
+                self.last_error = None
+            except Exception as e:
+                print(f"News ingest failed: {e}")
+                self.last_error = str(e)
+            self._ran_at = time.monotonic()
+            self.runs += 1
+            return self.last_added
+
+    def status(self):
+        return {
+            "running": bool(self._thread and self._thread.is_alive()),
+            "leader": self.is_leader(),
+            "interval": self.interval,
+            "runs": self.runs,
+            "last_added": self.last_added,
+            "last_error": self.last_error,
+            "seconds_since_run": round(time.monotonic() - self._ran_at, 1) if self.runs else None,
+        }
@@ -0,0 +1,109 @@
+"""
+Local on-disk OHLCV store (SQLite) so historical bars are downloaded once.
+
+Bars are keyed by (symbol, interval, ts) where `ts` is the bar's start in
+UTC epoch seconds. Callers append whatever Yahoo returned since the last
+stored bar and read any lookback window back as a pandas frame shaped like
+a yfinance download.
+"""
+import os
+import sqlite3
+import threading
+
+from lazy_imports import lazy_import
+
+pd = lazy_import("pandas")
+
+OHLCV_DB_PATH = os.getenv(
+    "OHLCV_DB_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "ohlcv.sqlite3")
+)
+
+COLUMNS = ["Open", "High", "Low", "Close", "Adj Close", "Volume"]
+_DB_COLUMNS = ["open", "high", "low", "close", "adj_close", "volume"]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS bars (
+    symbol TEXT NOT NULL,
+    interval TEXT NOT NULL,
+    ts INTEGER NOT NULL,
+    open REAL, high REAL, low REAL, close REAL, adj_close REAL, volume REAL,
+    PRIMARY KEY (symbol, interval, ts)
+) WITHOUT ROWID
+"""
+
+
+def _to_epoch(index):
+    index = pd.DatetimeIndex(index)
+    if index.tz is not None:
+        index = index.tz_convert("UTC").tz_localize(None)
+    return index.as_unit("ns").asi8 // 10**9
+
+
+class OHLCVStore:
+    def __init__(self, path=OHLCV_DB_PATH):
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(_SCHEMA)
+            self._conn.commit()
+
+    def last_timestamp(self, symbol, interval="1d"):
+        """Start time of the newest stored bar, or None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT MAX(ts) FROM bars WHERE symbol = ? AND interval = ?", (symbol, interval)
+            ).fetchone()
+        return pd.Timestamp(row[0], unit="s") if row and row[0] is not None else None
+
+    def append(self, symbol, interval, frame):
+        """Insert or overwrite bars from a single-ticker OHLCV frame"""
+        if frame is None or frame.empty:
+            return 0
+        values = frame.reindex(columns=COLUMNS)
+        rows = [
+            (symbol, interval, int(ts), *(None if pd.isna(v) else float(v) for v in bar))
+            for ts, bar in zip(_to_epoch(values.index), values.itertuples(index=False, name=None))
+        ]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO bars (symbol, interval, ts, open, high, low, close, adj_close, volume) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._conn.commit()
+        return len(rows)
+
+    def load(self, symbol, interval="1d", start=None, end=None):
+        """Stored bars for `symbol` in [start, end], oldest first"""
+        query = f"SELECT ts, {', '.join(_DB_COLUMNS)} FROM bars WHERE symbol = ? AND interval = ?"
+        params = [symbol, interval]
+        if start is not None:
+            query += " AND ts >= ?"
+            params.append(int(_to_epoch([start])[0]))
+        if end is not None:
+            query += " AND ts <= ?"
+            params.append(int(_to_epoch([end])[0]))
+        query += " ORDER BY ts"
+
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+
+        frame = pd.DataFrame.from_records(rows, columns=["ts"] + COLUMNS)
+        frame.index = pd.to_datetime(frame.pop("ts"), unit="s")
+        frame.index.name = "Date"
+        return frame
+
+    def load_recent(self, symbol, interval="1d", days=30):
+        """Bars within `days` calendar days of the newest stored bar (inclusive)"""
+        last = self.last_timestamp(symbol, interval)
+        if last is None:
+            return self.load(symbol, interval)
+        return self.load(symbol, interval, start=last.normalize() - pd.Timedelta(days=days - 1))
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,165 @@
+"""
+Retail-vs-spot premium time series with rolling statistics.
+
+Every quote's premium is appended to compact `array('d')` columns. For each
+trailing time window (1h, 1d, 7d) a running sum, sum of squares and sorted
+copy of the window are updated as observations enter and expire, so the
+mean, standard deviation, z-score and percentile rank of each new point
+are computed once, on arrival, and stored next to it. Reading the history
+is then a slice of precomputed columns.
+"""
+import math
+import os
+import threading
+from array import array
+from bisect import bisect_left, bisect_right, insort
+
+PREMIUM_WINDOWS = {"1h": 3600, "1d": 86400, "7d": 7 * 86400}  # seconds
+PREMIUM_HISTORY_MAX = int(os.getenv("PREMIUM_HISTORY_MAX", "50000"))  # observations kept
+# Window whose z-score and percentile feed the AI analysis
+PREMIUM_SIGNAL_WINDOW = os.getenv("PREMIUM_SIGNAL_WINDOW", "1d")
+PREMIUM_HISTORY_PAGE = 500
+# Only scraped retail quotes are recorded: the fallbacks (a fixed-premium
+# estimate, a hard-coded default) would drag the statistics toward constants
+PREMIUM_SOURCES = ("shankar",)
+
+STAT_COLUMNS = ("mean", "std", "zscore", "percentile")
+
+
+class _RollingWindow:
+    """Running moments and a sorted copy of the observations in the trailing `seconds`"""
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.start = 0  # index of the oldest observation still inside the window
+        self.total = 0.0
+        self.total_sq = 0.0
+        self.sorted = []
+        self.columns = {name: array("d") for name in STAT_COLUMNS}
+
+    def _drop(self, value):
+        self.total -= value
+        self.total_sq -= value * value
+        del self.sorted[bisect_left(self.sorted, value)]
+
+    def push(self, timestamps, values):
+        index = len(values) - 1
+        value = values[index]
+        self.total += value
+        self.total_sq += value * value
+        insort(self.sorted, value)
+
+        cutoff = timestamps[index] - self.seconds
+        while timestamps[self.start] <= cutoff:
+            self._drop(values[self.start])
+            self.start += 1
+
+        count = index - self.start + 1
+        mean = self.total / count
+        std = math.sqrt(max(0.0, self.total_sq / count - mean * mean))
+        self.columns["mean"].append(mean)
+        self.columns["std"].append(std)
+        self.columns["zscore"].append((value - mean) / std if std > 1e-9 else 0.0)
+        self.columns["percentile"].append(bisect_right(self.sorted, value) / count * 100)
+
+    def trim(self, n, values):
+        """Forget the oldest `n` stored observations"""
+        while self.start < n:
+            self._drop(values[self.start])
+            self.start += 1
+        self.start -= n
+        for column in self.columns.values():
+            del column[:n]
+        # Re-sum from the window itself so add/remove rounding cannot accumulate
+        self.total = math.fsum(self.sorted)
+        self.total_sq = math.fsum(value * value for value in self.sorted)
+
+
+class PremiumSeries:
+    def __init__(self, windows=PREMIUM_WINDOWS, max_points=PREMIUM_HISTORY_MAX):
+        self.max_points = max_points
+        self.ts = array("d")
+        self.premium = array("d")
+        self.premium_percent = array("d")
+        self.windows = {name: _RollingWindow(seconds) for name, seconds in windows.items()}
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.ts)
+
+    def observe(self, ts, premium, premium_percent):
+        """Append one observation; ignored unless newer than the last one"""
+        with self.lock:
+            if self.ts and ts <= self.ts[-1]:
+                return False
+            self.ts.append(ts)
+            self.premium.append(premium)
+            self.premium_percent.append(premium_percent)
+            for window in self.windows.values():
+                window.push(self.ts, self.premium_percent)
+            if len(self.ts) > self.max_points:
+                self._trim(max(1, self.max_points // 4))
+        return True
+
+    def observe_quote(self, ts, retail_price, spot_usd, exchange_rate, source):
+        """Record the premium implied by a scraped retail quote and the spot in USD/oz"""
+        if source not in PREMIUM_SOURCES or not retail_price or not spot_usd or not exchange_rate:
+            return False
+        spot_inr = spot_usd * 32.15 * exchange_rate
+        premium = retail_price - spot_inr
+        return self.observe(ts, premium, premium / spot_inr * 100)
+
+    def _trim(self, n):
+        for window in self.windows.values():
+            window.trim(n, self.premium_percent)
+        del self.ts[:n]
+        del self.premium[:n]
+        del self.premium_percent[:n]
+
+    def _window(self, name):
+        if name not in self.windows:
+            raise ValueError(f"Unknown window: {name} (expected one of {', '.join(self.windows)})")
+        return self.windows[name]
+
+    def latest(self, name):
+        """Stats of the newest observation over one window, or None before the first"""
+        window = self._window(name)
+        with self.lock:
+            if not self.ts:
+                return None
+            return {
+                "ts": self.ts[-1],
+                "premium": round(self.premium[-1], 2),
+                "premium_percent": round(self.premium_percent[-1], 4),
+                "observations": len(self.ts) - window.start,
+                **{column: round(values[-1], 4) for column, values in window.columns.items()},
+            }
+
+    def history(self, name, since=None, limit=PREMIUM_HISTORY_PAGE):
+        """Newest `limit` observations (after `since`, epoch seconds) with the window's stats, as columns"""
+        if limit < 1:
+            raise ValueError("limit must be positive")
+        window = self._window(name)
+        with self.lock:
+            start = bisect_right(self.ts, since) if since is not None else 0
+            start = max(start, len(self.ts) - min(limit, self.max_points))
+            return {
+                "window": name,
+                "points": len(self.ts) - start,
+                "ts": self.ts[start:].tolist(),
+                "premium": [round(value, 2) for value in self.premium[start:]],
+                "premium_percent": [round(value, 4) for value in self.premium_percent[start:]],
+                **{column: [round(value, 4) for value in values[start:]] for column, values in window.columns.items()},
+            }
+
+    def signal(self, name=PREMIUM_SIGNAL_WINDOW):
+        """Premium context for the AI analysis: where today's premium sits in its recent range"""
+        latest = self.latest(name)
+        if latest is None:
+            return {}
+        return {
+            "premium_zscore": round(latest["zscore"], 2),
+            "premium_percentile": round(latest["percentile"], 1),
+            "premium_mean_percent": round(latest["mean"], 2),
+            "premium_window": name,
+        }
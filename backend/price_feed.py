@@ -0,0 +1,234 @@
+"""
+Background price ingestion with an in-memory latest-quote snapshot.
+
+A single daemon thread refreshes the retail quote and the COMEX/USDINR spot
+on an adaptive schedule, so routes read the last snapshot from memory
+instead of scraping on every request. The refresh interval shrinks when the
+price is moving and during Indian market hours, and backs off when it is
+quiet or the market is closed.
+
+With a shared `TickRing`, only the worker holding the ring's leader lock
+talks to upstream; it appends every quote to the ring and the other
+workers follow by polling it, so upstream load does not grow with the
+number of gunicorn workers.
+"""
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+PRICE_REFRESH_MIN = float(os.getenv("PRICE_REFRESH_MIN", "15"))  # seconds
+PRICE_REFRESH_MAX = float(os.getenv("PRICE_REFRESH_MAX", "120"))  # seconds, market hours
+PRICE_REFRESH_OFF_HOURS = float(os.getenv("PRICE_REFRESH_OFF_HOURS", "900"))  # seconds
+PRICE_MAX_STALENESS = float(os.getenv("PRICE_MAX_STALENESS", "600"))  # seconds
+PRICE_VOLATILE_MOVE = float(os.getenv("PRICE_VOLATILE_MOVE", "0.1"))  # percent per refresh
+TICK_POLL_INTERVAL = float(os.getenv("TICK_POLL_INTERVAL", "1"))  # seconds, followers reading the ring
+TICK_FIRST_WAIT = float(os.getenv("TICK_FIRST_WAIT", "30"))  # seconds a follower waits for the first tick
+
+IST = timezone(timedelta(hours=5, minutes=30))
+
+# MCX bullion trades 09:00-23:30 IST on weekdays
+MARKET_OPEN = (9, 0)
+MARKET_CLOSE = (23, 30)
+
+
+def is_indian_market_hours(now=None):
+    """True while MCX bullion is trading (weekdays 09:00-23:30 IST)"""
+    now = (now or datetime.now(IST)).astimezone(IST)
+    if now.weekday() >= 5:
+        return False
+    return MARKET_OPEN <= (now.hour, now.minute) < MARKET_CLOSE
+
+
+def tick_snapshot(tick):
+    """Price feed snapshot from a tick ring record"""
+    return {
+        "retail_price": tick["retail_price"],
+        "retail_source": tick["retail_source"],
+        "spot_usd": tick["spot_usd"],
+        "exchange_rate": tick["exchange_rate"],
+        "as_of": datetime.fromtimestamp(tick["ts"], timezone.utc).isoformat(),
+        "tick": tick["index"],
+    }
+
+
+class PriceFeed:
+    """Keeps the latest retail + spot quote fresh in the background"""
+
+    def __init__(self, fetch_retail, fetch_spot,
+                 min_interval=PRICE_REFRESH_MIN, max_interval=PRICE_REFRESH_MAX,
+                 off_hours_interval=PRICE_REFRESH_OFF_HOURS,
+                 max_staleness=PRICE_MAX_STALENESS, ring=None,
+                 poll_interval=TICK_POLL_INTERVAL, first_tick_wait=TICK_FIRST_WAIT):
+        self.fetch_retail = fetch_retail
+        self.fetch_spot = fetch_spot
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.off_hours_interval = off_hours_interval
+        self.max_staleness = max_staleness
+        self.ring = ring
+        self.poll_interval = poll_interval
+        self.first_tick_wait = first_tick_wait
+
+        self.interval = min_interval
+        self._snapshot = None
+        self._fetched_at = 0.0  # monotonic time of the last successful refresh
+        self._last_error = None
+        self._refresh_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._listeners = []
+        self._cursor = None  # next tick ring index to read (followers)
+
+    def subscribe(self, callback, leader_only=False):
+        """
+        Call `callback(snapshot)` for every new quote.
+
+        `leader_only` callbacks run only in the process that fetched the quote.
+        """
+        self._listeners.append((callback, leader_only))
+
+    def is_leader(self):
+        """True when this process fetches upstream (always, without a shared ring)"""
+        return self.ring is None or self.ring.lead()
+
+    def start(self):
+        """Start the ingestion thread (idempotent)"""
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name="price-feed", daemon=True)
+                self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            if self.is_leader():
+                self.refresh()
+                self._stop.wait(self.interval)
+            else:
+                self.poll_ring()
+                self._stop.wait(self.poll_interval)
+
+    def refresh(self):
+        """Fetch a new quote now; concurrent callers share one upstream fetch"""
+        if not self.is_leader():
+            return self.poll_ring()
+
+        requested_at = time.monotonic()
+        with self._refresh_lock:
+            if self._fetched_at >= requested_at:
+                return self._snapshot  # someone refreshed while we waited
+
+            try:
+                retail = self.fetch_retail()
+                spot = self.fetch_spot()
+            except Exception as e:
+                print(f"Price feed refresh failed: {e}")
+                self._last_error = str(e)
+                return self._snapshot
+
+            previous = self._snapshot
+            now = datetime.now(timezone.utc)
+            snapshot = {
+                "retail_price": retail.get("currVal"),
+                "retail_source": retail.get("source"),
+                "spot_usd": spot.get("spot_usd"),
+                "exchange_rate": spot.get("exchange_rate"),
+                "as_of": now.isoformat(),
+            }
+            self._snapshot = snapshot
+            self._fetched_at = time.monotonic()
+            self._last_error = None
+            self.interval = self._next_interval(previous, snapshot)
+            if self.ring is not None:
+                self._publish_tick(snapshot, now.timestamp())
+
+        self._notify(snapshot, leader=True)
+        return snapshot
+
+    def _publish_tick(self, snapshot, ts):
+        retail, spot_usd, exchange_rate = snapshot["retail_price"], snapshot["spot_usd"], snapshot["exchange_rate"]
+        premium = None
+        if retail is not None and spot_usd and exchange_rate:
+            premium = round(retail - spot_usd * 32.15 * exchange_rate, 2)
+        try:
+            snapshot["tick"] = self.ring.append(retail, spot_usd, exchange_rate, premium,
+                                                snapshot["retail_source"], ts=ts)
+        except Exception as e:
+            print(f"Tick ring append failed: {e}")
+
+    def poll_ring(self):
+        """Follower: adopt the ticks the leader published since the last poll"""
+        with self._refresh_lock:
+            if self._cursor is None:
+                self._cursor = max(0, self.ring.count() - 1)  # join at the latest tick
+            ticks, self._cursor = self.ring.since(self._cursor)
+            if not ticks:
+                return self._snapshot
+            snapshots = [tick_snapshot(tick) for tick in ticks]
+            self._snapshot = snapshots[-1]
+            # Age counts from when the leader fetched the quote, not from this poll
+            self._fetched_at = time.monotonic() - max(0.0, time.time() - ticks[-1]["ts"])
+            self._last_error = None
+
+        for snapshot in snapshots:
+            self._notify(snapshot, leader=False)
+        return snapshots[-1]
+
+    def _notify(self, snapshot, leader):
+        for callback, leader_only in list(self._listeners):
+            if leader_only and not leader:
+                continue
+            try:
+                callback(dict(snapshot))
+            except Exception as e:
+                print(f"Price feed listener failed: {e}")
+
+    def _next_interval(self, previous, current):
+        ceiling = self.max_interval if is_indian_market_hours() else self.off_hours_interval
+        if not previous or not previous.get("retail_price") or not current.get("retail_price"):
+            return self.min_interval
+
+        move = abs(current["retail_price"] - previous["retail_price"]) / previous["retail_price"] * 100
+        if move >= PRICE_VOLATILE_MOVE:
+            return self.min_interval
+        # Quiet market: back off geometrically up to the ceiling
+        return min(ceiling, max(self.min_interval, self.interval * 1.5))
+
+    def snapshot(self):
+        """Latest quote with `as_of`, `age_seconds` and `stale` metadata"""
+        self.start()
+        if self._snapshot is None or time.monotonic() - self._fetched_at > self.max_staleness:
+            self.refresh()
+
+        if self._snapshot is None and self.ring is not None:
+            # Follower before the leader's first tick (or a leader that just took over)
+            deadline = time.monotonic() + self.first_tick_wait
+            while self._snapshot is None and not self.ring.leader.held and time.monotonic() < deadline:
+                time.sleep(0.1)
+                self.refresh()
+
+        if self._snapshot is None:
+            return None
+
+        age = time.monotonic() - self._fetched_at
+        return {
+            **self._snapshot,
+            "age_seconds": round(age, 1),
+            "stale": age > self.max_staleness or self._last_error is not None,
+        }
+
+    def status(self):
+        """Scheduler state for diagnostics"""
+        return {
+            "running": self._thread is not None and self._thread.is_alive(),
+            "interval_seconds": round(self.interval, 1),
+            "market_hours": is_indian_market_hours(),
+            "last_error": self._last_error,
+            "role": "leader" if self.ring is None or self.ring.leader.held else "follower",
+            **({"tick_ring": self.ring.status()} if self.ring is not None else {}),
+        }
@@ -0,0 +1,164 @@
+"""
+Hedged, deadline-bounded resolution of a value from ordered sources.
+
+The first source starts immediately. If it has not produced a valid answer
+within PRICE_HEDGE_AFTER seconds (or fails sooner), the next source starts
+alongside it, and so on; the first valid answer wins. Anything still
+running at PRICE_DEADLINE is abandoned and the default is served. Each
+source sits behind a circuit breaker, so a source that keeps failing is
+skipped until its cooldown has passed.
+"""
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+PRICE_HEDGE_AFTER = float(os.getenv("PRICE_HEDGE_AFTER", "6"))  # seconds
+PRICE_DEADLINE = float(os.getenv("PRICE_DEADLINE", "20"))  # seconds
+PRICE_BREAKER_FAILURES = int(os.getenv("PRICE_BREAKER_FAILURES", "3"))
+PRICE_BREAKER_COOLDOWN = float(os.getenv("PRICE_BREAKER_COOLDOWN", "120"))  # seconds
+
+
+class CircuitBreaker:
+    """closed -> open after `failure_threshold` consecutive failures -> one half-open trial after `cooldown`"""
+
+    def __init__(self, failure_threshold=PRICE_BREAKER_FAILURES, cooldown=PRICE_BREAKER_COOLDOWN):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = None
+        self.lock = threading.Lock()
+
+    def allow(self):
+        with self.lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and time.monotonic() - self.opened_at >= self.cooldown:
+                self.state = "half_open"  # let exactly one trial through
+                return True
+            return False
+
+    def record_success(self):
+        with self.lock:
+            self.state = "closed"
+            self.failures = 0
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                self.state = "open"
+                self.opened_at = time.monotonic()
+
+    def status(self):
+        with self.lock:
+            status = {"state": self.state, "consecutive_failures": self.failures}
+            if self.state == "open":
+                status["retry_in_seconds"] = round(max(0.0, self.cooldown - (time.monotonic() - self.opened_at)), 1)
+            return status
+
+
+class _Source:
+    def __init__(self, name, fetch, breaker):
+        self.name = name
+        self.fetch = fetch
+        self.breaker = breaker
+        self.wins = 0
+        self.failures = 0
+        self.timeouts = 0
+        self.skipped = 0
+
+
+class PriceResolver:
+    def __init__(self, sources, default, default_source="default", validate=None,
+                 hedge_after=PRICE_HEDGE_AFTER, deadline=PRICE_DEADLINE, breaker_factory=CircuitBreaker):
+        """`sources` is an ordered list of (name, fetch) where `fetch()` returns a value or raises"""
+        self.sources = [_Source(name, fetch, breaker_factory()) for name, fetch in sources]
+        self.default = default
+        self.default_source = default_source
+        self.validate = validate or (lambda value: value is not None)
+        self.hedge_after = hedge_after
+        self.deadline = deadline
+        # Abandoned calls keep their thread until they return, so leave headroom
+        self.executor = ThreadPoolExecutor(max_workers=4 * len(self.sources), thread_name_prefix="price-resolver")
+        self.defaults_served = 0
+        self.lock = threading.Lock()
+
+    def _run(self, source, call):
+        try:
+            value = source.fetch()
+            if not self.validate(value):
+                raise ValueError(f"invalid value {value!r}")
+        except Exception as e:
+            print(f"Price source {source.name} failed: {e}")
+            with self.lock:
+                settled, call["settled"] = call["settled"], True
+                if not settled:
+                    source.failures += 1
+                    source.breaker.record_failure()
+            raise
+        with self.lock:
+            settled, call["settled"] = call["settled"], True
+        if not settled:
+            source.breaker.record_success()
+        return value
+
+    def resolve(self):
+        """(value, source_name) from the first valid answer, or the default on failure/deadline"""
+        started = time.monotonic()
+        deadline = started + self.deadline
+        queue = list(self.sources)
+        pending = {}  # future -> (source, call)
+        next_launch = started
+
+        while True:
+            now = time.monotonic()
+            # Start the next source when nothing is running or the hedge delay has passed
+            if queue and (not pending or now >= next_launch):
+                source = queue.pop(0)
+                if not source.breaker.allow():
+                    source.skipped += 1
+                    continue
+                call = {"settled": False}
+                pending[self.executor.submit(self._run, source, call)] = (source, call)
+                next_launch = now + self.hedge_after
+                continue
+            if not pending or now >= deadline:
+                break
+
+            wake = min(deadline, next_launch) if queue else deadline
+            done, _ = wait(pending, timeout=max(0.0, wake - now), return_when=FIRST_COMPLETED)
+            for future in done:
+                source, _ = pending.pop(future)
+                if future.exception() is None:
+                    source.wins += 1
+                    return future.result(), source.name
+                next_launch = time.monotonic()  # a failure hedges immediately
+
+        # Whatever is still running missed the deadline; count it now, ignore it later
+        for source, call in pending.values():
+            with self.lock:
+                settled, call["settled"] = call["settled"], True
+            if not settled:
+                source.timeouts += 1
+                source.breaker.record_failure()
+        self.defaults_served += 1
+        return self.default, self.default_source
+
+    def status(self):
+        return {
+            "hedge_after": self.hedge_after,
+            "deadline": self.deadline,
+            "defaults_served": self.defaults_served,
+            "sources": {
+                source.name: {
+                    **source.breaker.status(),
+                    "wins": source.wins,
+                    "failures": source.failures,
+                    "timeouts": source.timeouts,
+                    "skipped": source.skipped,
+                }
+                for source in self.sources
+            },
+        }
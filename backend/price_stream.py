@@ -0,0 +1,238 @@
+"""
+Server-Sent Events fan-out for price ticks, premium updates and trade events.
+
+The price feed publishes into one `EventHub` per worker; every dashboard
+connected to that worker reads from the same bounded history, so one
+upstream fetch serves all subscribers. Trade events reach each hub through
+the shared ledger (`TradeEventRelay`). An event id is the hub's position in
+both shared sources, "<tick ring ticks>-<ledger trade event id>", which is
+the same on every worker, so a reconnecting EventSource resumes from its
+`Last-Event-ID` whichever worker it lands on.
+"""
+import json
+import os
+import threading
+from collections import deque
+
+from flask import Response, stream_with_context
+
+SSE_HEARTBEAT_SECONDS = float(os.getenv("SSE_HEARTBEAT_SECONDS", "15"))
+SSE_REPLAY_EVENTS = int(os.getenv("SSE_REPLAY_EVENTS", "256"))
+SSE_RETRY_MS = int(os.getenv("SSE_RETRY_MS", "3000"))
+
+
+TICKS, TRADES = 0, 1  # event sources, indexes into a hub position
+TRADE_EVENT_POLL_INTERVAL = float(os.getenv("TRADE_EVENT_POLL_INTERVAL", "1"))  # seconds
+
+
+class EventHub:
+    """Bounded event history plus a condition variable subscribers wait on"""
+
+    def __init__(self, replay=SSE_REPLAY_EVENTS):
+        self.history = deque()
+        self.replay = replay
+        self.seq = 0  # local publish order, what subscribers wait on
+        self.position = [0, 0]  # ticks covered, last trade event id
+        self.floor = [None, None]  # per source: newest position no longer in history
+        self.subscribers = 0
+        self.latest = {}  # most recent event per type, for new subscribers
+        self._latest_keys = {}
+        self._cond = threading.Condition()
+
+    def mark_trades(self, event_id):
+        """Trade events up to `event_id` happened before this hub started"""
+        with self._cond:
+            self.position[TRADES] = max(self.position[TRADES], event_id)
+            if self.floor[TRADES] is None:
+                self.floor[TRADES] = event_id
+
+    def publish(self, event_type, data, tick=None, trade=None):
+        """
+        Append an event and wake every waiting subscriber. `tick` is the
+        ring index of the tick it came from, `trade` the ledger id of a trade
+        event; with neither the hub counts ticks itself.
+        """
+        with self._cond:
+            if trade is not None:
+                source, value = TRADES, trade
+            else:
+                source, value = TICKS, tick + 1 if tick is not None else self.position[TICKS] + 1
+            if self.floor[source] is None:
+                self.floor[source] = value - 1
+            self.position[source] = max(self.position[source], value)
+            self.seq += 1
+            event = (self.seq, tuple(self.position), source, event_type, data)
+            self.history.append(event)
+            if len(self.history) > self.replay:
+                dropped = self.history.popleft()
+                self.floor[dropped[2]] = dropped[1][dropped[2]]
+            self.latest[event_type] = event
+            self._cond.notify_all()
+            return format_event_id(event[1])
+
+    def publish_if_changed(self, event_type, data, key=None, tick=None):
+        """Publish only when `key` (default: the payload) differs from the last one"""
+        key = data if key is None else key
+        with self._cond:
+            if event_type in self._latest_keys and self._latest_keys[event_type] == key:
+                return None
+            self._latest_keys[event_type] = key
+        return self.publish(event_type, data, tick=tick)
+
+    def events_after(self, seq, timeout):
+        """Block until there are events published after local `seq` (or timeout)"""
+        with self._cond:
+            self._cond.wait_for(lambda: self.seq > seq, timeout=timeout)
+            if self.seq <= seq:
+                return []
+            if seq < self.history[0][0] - 1:
+                # Client fell out of the replay window: resync with current state
+                return sorted(self.latest.values())
+            return [e for e in self.history if e[0] > seq]
+
+    def _covers(self, source, value):
+        floor = self.floor[source]
+        if floor is None:
+            return value == self.position[source]
+        return floor <= value <= self.position[source]
+
+    def _replay(self, position):
+        """Events a client at `position` has missed, or the latest state if it cannot resume here"""
+        if position is not None and self._covers(TICKS, position[TICKS]) and self._covers(TRADES, position[TRADES]):
+            return [e for e in self.history if e[1][e[2]] > position[e[2]]]
+        return sorted(self.latest.values())
+
+    def stream(self, last_event_id=None, heartbeat=SSE_HEARTBEAT_SECONDS):
+        """Generator of SSE frames, resuming after `last_event_id` (a position) if given"""
+        with self._cond:
+            self.subscribers += 1
+        try:
+            yield f"retry: {SSE_RETRY_MS}\n\n"
+            with self._cond:
+                # Positions from another worker resume here too; ones outside
+                # this hub's history (or ahead of it) get the current state
+                initial = self._replay(last_event_id)
+                cursor = self.seq
+            for event in initial:
+                yield _frame(event)
+
+            while True:
+                events = self.events_after(cursor, heartbeat)
+                if not events:
+                    yield ": heartbeat\n\n"
+                    continue
+                for event in events:
+                    yield _frame(event)
+                cursor = max(cursor, events[-1][0])
+        finally:
+            with self._cond:
+                self.subscribers -= 1
+
+    def stats(self):
+        with self._cond:
+            return {"subscribers": self.subscribers, "last_event_id": format_event_id(self.position)}
+
+
+class TradeEventRelay:
+    """
+    Publishes the ledger's trade events into this worker's hub. Buys, sells
+    and trigger auto-closes may run on any worker, so each worker polls the
+    shared ledger for new rows the way followers poll the tick ring.
+    """
+
+    def __init__(self, hub, ledger, interval=TRADE_EVENT_POLL_INTERVAL):
+        self.hub = hub
+        self.ledger = ledger
+        self.interval = interval
+        self.cursor = ledger.last_event_id()
+        hub.mark_trades(self.cursor)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Start the poll thread (idempotent)"""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name="trade-events", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.poll()
+            except Exception as e:
+                print(f"Trade event relay failed: {e}")
+            self._stop.wait(self.interval)
+
+    def poll(self):
+        """Publish trade events recorded since the last poll"""
+        with self._lock:
+            for event_id, data in self.ledger.events_after(self.cursor):
+                self.hub.publish("trade", data, trade=event_id)
+                self.cursor = event_id
+
+    def stop(self):
+        self._stop.set()
+
+
+def format_event(event_id, event_type, data):
+    """Serialize one event in text/event-stream framing"""
+    return f"id: {event_id}\nevent: {event_type}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+
+def _frame(event):
+    return format_event(format_event_id(event[1]), event[3], event[4])
+
+
+def format_event_id(position):
+    """SSE id for a hub position, e.g. "1200-37" (ticks covered, last trade event id)"""
+    return f"{position[TICKS]}-{position[TRADES]}"
+
+
+def parse_event_id(raw):
+    """Hub position for an SSE id, or None if it is malformed"""
+    ticks, _, trades = str(raw or "").partition("-")
+    if not (ticks.isdigit() and trades.isdigit()):
+        return None
+    return int(ticks), int(trades)
+
+
+def parse_last_event_id(request):
+    """Read the resume point from the header or the `lastEventId` query param"""
+    return parse_event_id(request.headers.get("Last-Event-ID") or request.args.get("lastEventId"))
+
+
+def sse_response(hub, request):
+    """Flask streaming response for a hub subscription"""
+    return Response(
+        stream_with_context(hub.stream(parse_last_event_id(request))),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def publish_snapshot(hub, snapshot):
+    """Turn a price feed snapshot into `price` and `premium` events"""
+    if not snapshot or snapshot.get("retail_price") is None:
+        return
+
+    spot_usd = snapshot.get("spot_usd")
+    exchange_rate = snapshot.get("exchange_rate")
+    hub.publish_if_changed("price", {
+        "currVal": snapshot["retail_price"],
+        "source": snapshot.get("retail_source"),
+        "spot_usd": spot_usd,
+        "exchange_rate": exchange_rate,
+        "as_of": snapshot.get("as_of"),
+    }, key=(snapshot["retail_price"], spot_usd, exchange_rate), tick=snapshot.get("tick"))
+
+    if spot_usd and exchange_rate:
+        spot_inr = spot_usd * 32.15 * exchange_rate
+        premium_diff = snapshot["retail_price"] - spot_inr
+        hub.publish_if_changed("premium", {
+            "spot_price": round(spot_inr, 2),
+            "premium_diff": round(premium_diff, 2),
+            "premium_percent": round(premium_diff / spot_inr * 100, 2),
+        }, tick=snapshot.get("tick"))
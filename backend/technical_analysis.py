@@ -1,47 +1,258 @@
-import yfinance as yf
-import pandas as pd
-import google.generativeai as genai
 import os
+import threading
+import time
 from dotenv import load_dotenv
 
+from lazy_imports import lazy_import
+
+from ttl_cache import TTLCache
+from ohlcv_store import OHLCVStore
+from intraday_bars import BarSeries
+from indicators import IndicatorEngine
+from ai_cache import AnalysisCache, analysis_fingerprint
+from metrics import count_fallback, timed
+
+# Heavy SDKs load on first use, not when the worker boots
+yf = lazy_import("yfinance")
+pd = lazy_import("pandas")
+genai = lazy_import("google.generativeai")
+
 load_dotenv()
 
-# Configure Gemini API
+# Gemini API (configured on first use)
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-genai.configure(api_key=GEMINI_API_KEY)
+GEMINI_MODEL = "gemini-1.5-flash"
+_gemini_configured = False
+_gemini_lock = threading.Lock()
+
+SILVER_SYMBOL = "SI=F"
+GOLD_SYMBOL = "GC=F"
+USD_INDEX_SYMBOL = "DX-Y.NYB"
+USD_INR_SYMBOL = "USDINR=X"
+
+MARKET_QUOTE_TTL = float(os.getenv("MARKET_QUOTE_TTL", "60"))  # seconds
+MARKET_BARS_TTL = float(os.getenv("MARKET_BARS_TTL", str(3 * 3600)))  # seconds
+MARKET_CACHE_SIZE = int(os.getenv("MARKET_CACHE_SIZE", "128"))
+
+market_data_cache = TTLCache(maxsize=MARKET_CACHE_SIZE, name="market_data")
+
+# Daily bars for these symbols are kept on disk and only topped up
+OHLCV_SYMBOLS = {SILVER_SYMBOL, GOLD_SYMBOL, USD_INDEX_SYMBOL, USD_INR_SYMBOL}
+OHLCV_BACKFILL_PERIOD = os.getenv("OHLCV_BACKFILL_PERIOD", "2y")
+_ohlcv_store = None
+
+# 1m bars are stored too and resampled in memory to any intraday timeframe
+INTRADAY_INTERVAL = "1m"
+INTRADAY_BACKFILL_PERIOD = os.getenv("INTRADAY_BACKFILL_PERIOD", "7d")  # Yahoo only serves ~7 days of 1m bars
+INTRADAY_SYNC_INTERVAL = float(os.getenv("INTRADAY_SYNC_INTERVAL", "60"))  # seconds
+INTRADAY_LOAD_DAYS = 14  # stored 1m history loaded into memory
+INTRADAY_WARMUP_BARS = 500  # bars replayed into a fresh intraday indicator engine
+_intraday_series = {}  # symbol -> BarSeries
+_intraday_synced = {}  # symbol -> (monotonic time of last sync, newest stored bar loaded)
+_intraday_flights = {}  # symbol -> lock held by the caller syncing it
+_intraday_lock = threading.Lock()  # guards the dicts above, never held across I/O
+RETAIL_SERIES = "retail"  # fed only by price-feed ticks (INR/kg), never downloaded
+
+ai_analysis_cache = AnalysisCache()
+
+INDICATOR_WARMUP_DAYS = int(os.getenv("INDICATOR_WARMUP_DAYS", "90"))
+_indicator_engines = {}
+_indicator_warmups = {}  # key -> Event set once the caller that created the engine has warmed it
+_indicator_engines_lock = threading.Lock()  # guards the dicts above, never held across I/O
+
+# Everything one /ai-analysis request needs, fetched in a single download
+ANALYSIS_DATA_NEEDS = {
+    USD_INR_SYMBOL: "1d",
+    SILVER_SYMBOL: "30d",
+    USD_INDEX_SYMBOL: "5d",
+    GOLD_SYMBOL: "5d",
+}
+
+
+_PERIOD_UNITS = {"d": 1, "wk": 7, "mo": 30, "y": 365}
+
+
+def _period_days(period):
+    """Calendar days covered by a yfinance period string ("30d", "6mo", "2y")"""
+    for unit, days in _PERIOD_UNITS.items():
+        if period.endswith(unit) and period[:-len(unit)].isdigit():
+            return int(period[:-len(unit)]) * days
+    raise ValueError(f"Unsupported period: {period}")
+
+
+def _ticker_frame(data, symbol):
+    """Pull one ticker's OHLCV columns out of a (possibly multi-ticker) download"""
+    if not isinstance(data.columns, pd.MultiIndex):
+        return data
+    if symbol in data.columns.get_level_values(0):
+        return data[symbol]
+    return data.xs(symbol, axis=1, level=1)
+
+
+def _tail_period(frame, period):
+    """Rows within `period` calendar days of the latest bar, as a positional slice"""
+    if frame.empty:
+        return frame
+    cutoff = frame.index[-1] - pd.Timedelta(days=_period_days(period) - 1)
+    cutoff = cutoff.normalize()
+    return frame.iloc[frame.index.searchsorted(cutoff):]
+
+
+def _market_ttl(symbol, period):
+    """FX and latest-quote windows expire fast; multi-day daily bars live for hours"""
+    if symbol == USD_INR_SYMBOL or _period_days(period) <= 1:
+        return MARKET_QUOTE_TTL
+    return MARKET_BARS_TTL
+
+
+def get_ohlcv_store():
+    """Process-wide on-disk bar store, opened on first use"""
+    global _ohlcv_store
+    if _ohlcv_store is None:
+        _ohlcv_store = OHLCVStore()
+    return _ohlcv_store
 
-def get_usd_to_inr_rate():
+
+def _intraday_horizon():
+    """Oldest bar start Yahoo still serves 1m bars from (naive UTC)"""
+    now = pd.Timestamp.now(tz="UTC").tz_localize(None)
+    return now.normalize() - pd.Timedelta(days=_period_days(INTRADAY_BACKFILL_PERIOD) - 1)
+
+
+def sync_history(symbols, interval="1d"):
+    """
+    Append bars newer than the last stored one for each symbol.
+
+    Symbols that share the same last stored date are fetched together; the
+    last stored bar is re-downloaded since it may still have been forming.
+    Symbols with no history are backfilled with OHLCV_BACKFILL_PERIOD
+    (INTRADAY_BACKFILL_PERIOD for 1m bars, also used once stored 1m bars
+    are older than Yahoo keeps them).
+    """
+    store = get_ohlcv_store()
+    groups = {}
+    for symbol in symbols:
+        last = store.last_timestamp(symbol, interval)
+        if last is not None and interval != "1d" and last < _intraday_horizon():
+            last = None  # older than Yahoo's 1m lookback: resuming from it would fail every time
+        groups.setdefault(last.date() if last is not None else None, []).append(symbol)
+
+    for start, group in groups.items():
+        try:
+            with timed("yf_download", "history_sync"):
+                if start is None:
+                    backfill = OHLCV_BACKFILL_PERIOD if interval == "1d" else INTRADAY_BACKFILL_PERIOD
+                    data = yf.download(group, period=backfill, interval=interval,
+                                       auto_adjust=False, group_by="ticker", progress=False)
+                else:
+                    data = yf.download(group, start=start.isoformat(), interval=interval,
+                                       auto_adjust=False, group_by="ticker", progress=False)
+            for symbol in group:
+                try:
+                    store.append(symbol, interval, _ticker_frame(data, symbol).dropna(how="all"))
+                except KeyError:
+                    continue
+        except Exception as e:
+            # Stored history is still served if Yahoo is unavailable
+            print(f"Error syncing history for {group}: {e}")
+
+
+def _download_batch(needs, interval):
+    frames = {}
+
+    stored = [s for s in needs if interval == "1d" and s in OHLCV_SYMBOLS]
+    if stored:
+        sync_history(stored, interval)
+        store = get_ohlcv_store()
+        for symbol in stored:
+            frames[symbol] = store.load_recent(symbol, interval, _period_days(needs[symbol]))
+
+    needs = {s: p for s, p in needs.items() if s not in frames}
+    if not needs:
+        return frames
+
+    symbols = sorted(needs)
+    longest = max(needs.values(), key=_period_days)
+    with timed("yf_download", "batch"):
+        data = yf.download(symbols, period=longest, interval=interval, auto_adjust=False,
+                           group_by="ticker", progress=False)
+
+    for symbol in symbols:
+        try:
+            frame = _ticker_frame(data, symbol).dropna(how="all")
+        except KeyError:
+            frame = pd.DataFrame()
+        frames[symbol] = _tail_period(frame, needs[symbol])
+    return frames
+
+
+def fetch_market_data(needs, interval="1d"):
+    """
+    Download every symbol in `needs` ({symbol: period}) in one batched call.
+
+    Returns {symbol: OHLCV frame} where each frame covers that symbol's own
+    period. Symbols Yahoo returned nothing for map to an empty frame.
+    Frames are cached per (symbol, period, interval) and shared between
+    requests, so callers must not modify them in place.
+    """
+    bundle = {}
+    missing = {}
+    for symbol, period in needs.items():
+        frame = market_data_cache.get((symbol, period, interval))
+        if frame is None:
+            missing[symbol] = period
+        else:
+            bundle[symbol] = frame
+
+    if missing:
+        # Concurrent requests for the same missing set share one download
+        batch_key = (interval,) + tuple(sorted(missing.items()))
+        frames = market_data_cache.load_once(batch_key, lambda: _download_batch(missing, interval))
+        for symbol, frame in frames.items():
+            if not frame.empty:
+                market_data_cache.set((symbol, missing[symbol], interval), frame,
+                                      _market_ttl(symbol, missing[symbol]))
+        bundle.update(frames)
+    return bundle
+
+
+def _download_single(symbol, period, bundle=None):
+    """One symbol's frame from a prefetched bundle, or its own download"""
+    if bundle is not None and symbol in bundle:
+        return bundle[symbol]
+    return fetch_market_data({symbol: period})[symbol]
+
+
+def get_usd_to_inr_rate(bundle=None):
     """Get current USD to INR exchange rate"""
     try:
         # Using Yahoo Finance for USD/INR rate
-        usd_inr = yf.download("USDINR=X", period="1d", interval="1d", auto_adjust=False)
+        usd_inr = _download_single(USD_INR_SYMBOL, "1d", bundle)
         if not usd_inr.empty:
-            if isinstance(usd_inr.columns, pd.MultiIndex):
-                usd_inr.columns = usd_inr.columns.droplevel(1)
-            
             if "Close" in usd_inr.columns:
                 return float(usd_inr["Close"].iloc[-1])
         
         # Fallback to a fixed rate if API fails
+        count_fallback("fx_rate_default")
         return 83.0  # Approximate rate as fallback
     except Exception as e:
         print(f"Error getting USD/INR rate: {e}")
+        count_fallback("fx_rate_default")
         return 83.0  # Fallback rate
 
 def convert_usd_to_inr(usd_price, exchange_rate):
     """Convert USD price to INR"""
     return usd_price * exchange_rate
 
-def get_market_indicators():
+def get_market_indicators(bundle=None):
     """Get additional market indicators affecting silver"""
     try:
+        if bundle is None:
+            bundle = fetch_market_data({USD_INDEX_SYMBOL: "5d", GOLD_SYMBOL: "5d"})
+
         # Get USD Index (affects precious metals)
-        dxy = yf.download("DX-Y.NYB", period="5d", interval="1d", auto_adjust=False)
+        dxy = bundle[USD_INDEX_SYMBOL]
         if not dxy.empty:
-            # Handle multi-index columns
-            if isinstance(dxy.columns, pd.MultiIndex):
-                dxy.columns = dxy.columns.droplevel(1)  # Remove ticker level, keep OHLCV
-            
             if "Close" in dxy.columns and len(dxy["Close"]) >= 2:
                 usd_change = ((dxy["Close"].iloc[-1] - dxy["Close"].iloc[0]) / dxy["Close"].iloc[0]) * 100
             else:
@@ -50,12 +261,8 @@ def get_market_indicators():
             usd_change = 0
         
         # Get Gold prices (correlation indicator)
-        gold = yf.download("GC=F", period="5d", interval="1d", auto_adjust=False)
+        gold = bundle[GOLD_SYMBOL]
         if not gold.empty:
-            # Handle multi-index columns
-            if isinstance(gold.columns, pd.MultiIndex):
-                gold.columns = gold.columns.droplevel(1)  # Remove ticker level, keep OHLCV
-            
             if "Close" in gold.columns and len(gold["Close"]) >= 2:
                 gold_change = ((gold["Close"].iloc[-1] - gold["Close"].iloc[0]) / gold["Close"].iloc[0]) * 100
             else:
@@ -71,35 +278,130 @@ def get_market_indicators():
         print(f"Error getting market indicators: {e}")
         return {"usd_index_change": 0, "gold_change": 0}
 
-def get_technical_indicators(close_prices, exchange_rate):
-    """Calculate technical indicators and convert to INR per kg"""
+def _intraday_due(symbol, refresh):
+    """(first use, sync due) for `symbol`; caller holds _intraday_lock"""
+    synced_at, _ = _intraday_synced.get(symbol, (None, None))
+    due = refresh and (synced_at is None or time.monotonic() - synced_at >= INTRADAY_SYNC_INTERVAL)
+    return symbol not in _intraday_synced, due
+
+
+def get_intraday_series(symbol, refresh=True):
+    """
+    Process-wide 1m bars for `symbol`, loaded from the bar store on first use.
+
+    With `refresh`, new 1m bars are downloaded at most every
+    INTRADAY_SYNC_INTERVAL seconds and merged in; between syncs the series
+    is kept current by ticks (see BarSeries.add_tick). One caller per symbol
+    downloads while the others carry on with the bars already merged.
+    """
+    with _intraday_lock:
+        series = _intraday_series.get(symbol)
+        if series is None:
+            series = _intraday_series[symbol] = BarSeries()
+        if symbol not in OHLCV_SYMBOLS:
+            return series  # tick-fed only
+        first_use, due = _intraday_due(symbol, refresh)
+        flight = _intraday_flights.setdefault(symbol, threading.Lock())
+
+    # Only the first use waits for another caller's load; later ones never block
+    if not (first_use or due) or not flight.acquire(blocking=first_use):
+        return series
+    try:
+        with _intraday_lock:
+            first_use, due = _intraday_due(symbol, refresh)  # may have been done while we waited
+            synced_at, loaded = _intraday_synced.get(symbol, (None, None))
+        if not (first_use or due):
+            return series
+        if due:
+            sync_history([symbol], INTRADAY_INTERVAL)
+            synced_at = time.monotonic()
+        try:
+            store = get_ohlcv_store()
+            # The newest loaded bar may have still been forming, so it is reloaded
+            bars = (store.load(symbol, INTRADAY_INTERVAL, start=loaded) if loaded is not None
+                    else store.load_recent(symbol, INTRADAY_INTERVAL, days=INTRADAY_LOAD_DAYS))
+            series.add_bars(bars)
+            if not bars.empty:
+                loaded = bars.index[-1]
+        except Exception as e:
+            print(f"Error loading intraday bars for {symbol}: {e}")
+        with _intraday_lock:
+            _intraday_synced[symbol] = (synced_at, loaded)
+    finally:
+        flight.release()
+    return series
+
+
+def get_intraday_bars(symbol, timeframe="5m", since=None, limit=None, refresh=True):
+    """`symbol`'s bars resampled to `timeframe` (1m, 5m, 15m, 1h, 1d) without another download"""
+    return get_intraday_series(symbol, refresh).frame(timeframe, since=since, limit=limit)
+
+
+def get_indicator_engine(symbol, timeframe=None):
+    """
+    Long-lived indicator engine for `symbol`, warm-started from stored daily
+    bars, or from its intraday bars resampled to `timeframe` when one is given.
+    """
+    key = symbol if timeframe is None else (symbol, timeframe)
+    with _indicator_engines_lock:
+        engine = _indicator_engines.get(key)
+        claimed = engine is None
+        if claimed:
+            engine = _indicator_engines[key] = IndicatorEngine()
+            _indicator_warmups[key] = threading.Event()
+        warmup = _indicator_warmups.get(key)
+
+    # Claimed under the lock, warmed outside it: a store load (and its Yahoo
+    # sync) for one engine never holds up callers of the others
+    if not claimed:
+        if warmup is not None:
+            warmup.wait()
+        return engine
     try:
-        # ✅ Multiply by 32.15 for per-kg calculations
-        adjusted_prices = close_prices * 32.15  
-
-        sma_5 = adjusted_prices.rolling(window=5).mean().iloc[-1] if len(adjusted_prices) >= 5 else adjusted_prices.mean()
-        sma_20 = adjusted_prices.rolling(window=min(20, len(adjusted_prices))).mean().iloc[-1]
-
-        if len(adjusted_prices) >= 14:
-            delta = adjusted_prices.diff()
-            gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-            loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-            rs = gain / loss
-            rsi = 100 - (100 / (1 + rs)).iloc[-1] if not rs.empty else 50
+        if timeframe is None:
+            history = get_ohlcv_store().load_recent(symbol, days=INDICATOR_WARMUP_DAYS)
         else:
-            rsi = 50
+            history = get_intraday_bars(symbol, timeframe, limit=INTRADAY_WARMUP_BARS, refresh=False)
+        closes = history["Close"].dropna()
+        if len(closes) > 1:
+            engine.sync(closes)
+    except Exception as e:
+        print(f"Error warming up indicators for {symbol}: {e}")
+    finally:
+        with _indicator_engines_lock:
+            del _indicator_warmups[key]
+        warmup.set()
+    return engine
 
-        high_20 = adjusted_prices.rolling(window=min(20, len(adjusted_prices))).max().iloc[-1]
-        low_20 = adjusted_prices.rolling(window=min(20, len(adjusted_prices))).min().iloc[-1]
 
-        return {
-            "sma_5": round(convert_usd_to_inr(float(sma_5), exchange_rate), 2),
-            "sma_20": round(convert_usd_to_inr(float(sma_20), exchange_rate), 2),
-            "rsi": round(float(rsi), 2),
-            "resistance": round(convert_usd_to_inr(float(high_20), exchange_rate), 2),
-            "support": round(convert_usd_to_inr(float(low_20), exchange_rate), 2),
-            "trend": "Bullish" if sma_5 > sma_20 else "Bearish"
-        }
+def get_timeframe_indicators(symbol, timeframe, exchange_rate):
+    """
+    Indicators on `symbol`'s intraday bars at `timeframe`, in INR per kg.
+
+    RETAIL_SERIES bars are already INR/kg quotes, so they are not converted.
+    """
+    engine = get_indicator_engine(symbol, timeframe)
+    # Only bars after the last one the engine committed (the forming bar onwards)
+    since = engine.last_ts.timestamp() if engine.last_ts is not None else None
+    closes = get_intraday_bars(symbol, timeframe, since=since, limit=INTRADAY_WARMUP_BARS, refresh=False)["Close"]
+    if symbol == RETAIL_SERIES:
+        return get_technical_indicators(closes, 1.0, engine=engine, scale=1.0)
+    return get_technical_indicators(closes, exchange_rate, engine=engine)
+
+
+def get_technical_indicators(close_prices, exchange_rate, engine=None, scale=32.15):
+    """
+    Calculate technical indicators and convert to INR per kg.
+
+    Pass a long-lived `engine` (see get_indicator_engine) to only process
+    bars it has not seen yet; the latest bar is treated as still forming.
+    """
+    try:
+        if engine is None:
+            engine = IndicatorEngine()
+        with engine.lock:
+            live_price = engine.sync(close_prices)
+            return engine.indicators(exchange_rate, live_price=live_price, scale=scale)
     except Exception as e:
         print(f"Error calculating technical indicators: {e}")
         return {
@@ -111,21 +413,26 @@ def get_technical_indicators(close_prices, exchange_rate):
             "trend": "Neutral"
         }
 
-def get_historical_prices(period="7d"):
-    """Fetch historical silver prices from Yahoo Finance"""
-    symbol = "SI=F"
-    data = yf.download(symbol, period=period, interval="1d", auto_adjust=False)
-
-    # ✅ Handle multi-index columns properly
-    if isinstance(data.columns, pd.MultiIndex):
-        data.columns = data.columns.droplevel(1)  # Remove ticker level, keep OHLCV
+def get_stored_inr_closes(days):
+    """Daily silver close in INR/kg over the last `days` of stored bars (backfilled once if empty)"""
+    store = get_ohlcv_store()
+    if store.last_timestamp(SILVER_SYMBOL) is None:
+        sync_history([SILVER_SYMBOL, USD_INR_SYMBOL])
+    silver = store.load_recent(SILVER_SYMBOL, days=days)["Close"]
+    fx = store.load_recent(USD_INR_SYMBOL, days=days)["Close"]
+    # Align each silver bar with that day's (or the last known) USD/INR close
+    fx = fx.reindex(silver.index.union(fx.index)).ffill().reindex(silver.index).bfill()
+    return (silver * fx * 32.15).dropna()
 
-    print(f"\n🔹 Cleaned Data for {symbol}:\n", data.head())
+def get_historical_prices(period="7d", bundle=None):
+    """Get historical silver bars and their close series from the local bar store"""
+    symbol = SILVER_SYMBOL
+    data = _download_single(symbol, period, bundle)
 
     if "Close" in data.columns:
-        prices = data["Close"].dropna().to_dict()
+        prices = data["Close"].dropna()
     else:
-        prices = {}
+        prices = pd.Series(dtype=float)
     return data, prices
 
 def calculate_price_stats(close_prices, exchange_rate):
@@ -185,21 +492,21 @@ def calculate_premium_analysis(retail_price, spot_price_usd, exchange_rate):
             "premium_percent": 0
         }
 
-def generate_ai_analysis(market_data, news_articles, exchange_rate):
-    """Generate AI-powered market analysis using Gemini"""
-    try:
-        # Prepare news texts
-        news_texts = [f"[{article['source']}] {article['title']} - {article['description'][:150]}..." 
-                     for article in news_articles if article.get('title')]
+def build_ai_prompt(market_data, news_articles, exchange_rate):
+    """Build the Gemini prompt for a market snapshot and news list"""
+    # Prepare news texts
+    news_texts = [f"[{article['source']}] {article['title']} - {article['description'][:150]}..." 
+                 for article in news_articles if article.get('title')]
 
-        # Enhanced AI Prompt
-        prompt = f"""
+    # Enhanced AI Prompt
+    prompt = f"""
         You are an expert silver market analyst with 15+ years of experience in precious metals trading.
 
         📊 **CURRENT MARKET DATA:**
         • Current Price: ₹{market_data.get('current_price', 'N/A')}
         • Spot Price: ₹{market_data.get('spot_price', 'N/A')}
         • Premium: ₹{market_data.get('premium_diff', 'N/A')} ({market_data.get('premium_percent', 'N/A')}%)
+        • Premium Z-Score ({market_data.get('premium_window', 'N/A')}): {market_data.get('premium_zscore', 'N/A')} (percentile {market_data.get('premium_percentile', 'N/A')}, mean {market_data.get('premium_mean_percent', 'N/A')}%)
         • 7-Day Change: {market_data.get('price_change_7d', 'N/A')}%
         • 30-Day Change: {market_data.get('price_change_30d', 'N/A')}%
         • 7-Day Range: ₹{market_data.get('low_7d_inr', 'N/A')} - ₹{market_data.get('high_7d_inr', 'N/A')}
@@ -242,64 +549,133 @@ def generate_ai_analysis(market_data, news_articles, exchange_rate):
         IMPORTANT: All price targets and levels must be quoted in Indian Rupees (₹) only, not USD.
         Focus on actionable insights considering both technical analysis and premium dynamics.
         """
+    return prompt
+
+
+def get_gemini_model():
+    """Gemini model client; the SDK is imported and configured on the first call"""
+    global _gemini_configured
+    if not _gemini_configured:
+        with _gemini_lock:
+            if not _gemini_configured:
+                genai.configure(api_key=GEMINI_API_KEY)
+                _gemini_configured = True
+    return genai.GenerativeModel(GEMINI_MODEL)
 
-        model = genai.GenerativeModel("gemini-1.5-flash")
-        response = model.generate_content(prompt)
+
+def get_cached_ai_analysis(market_data, news_articles, exchange_rate):
+    """
+    AI analysis reused while market data and news are effectively unchanged.
+
+    Returns (text, cached, age_seconds). Failures are returned as text but
+    never cached, so the next request retries Gemini.
+    """
+    key = analysis_fingerprint(market_data, news_articles, GEMINI_MODEL)
+
+    def generate():
+        prompt = build_ai_prompt(market_data, news_articles, exchange_rate)
+        with timed("gemini"):
+            response = get_gemini_model().generate_content(prompt)
         return response.text
-        
+
+    try:
+        return ai_analysis_cache.get_or_generate(key, generate)
     except Exception as e:
         print(f"Error generating AI analysis: {e}")
-        return f"AI analysis temporarily unavailable: {str(e)}"
+        count_fallback("ai_unavailable")
+        return f"AI analysis temporarily unavailable: {str(e)}", False, 0
 
-def get_complete_market_analysis(retail_price, news_articles):
+def build_market_data(retail_price, premium_stats=None):
+    """
+    Market snapshot fed to the AI: prices, stats, indicators and premium.
+
+    `premium_stats` is the rolling premium context (z-score, percentile) from premium_series.
+    """
+    # ✅ One batched Yahoo download for every symbol this analysis needs
+    bundle = fetch_market_data(ANALYSIS_DATA_NEEDS)
+
+    # Get exchange rate
+    exchange_rate = get_usd_to_inr_rate(bundle)
+    
+    # Get historical data
+    data, close_prices = get_historical_prices(period="30d", bundle=bundle)
+    
+    if data.empty:
+        return {"error": "No historical data available"}
+    
+    if close_prices.empty:
+        return {"error": "No price data available"}
+    
+    # Calculate price statistics
+    price_stats = calculate_price_stats(close_prices, exchange_rate)
+    
+    # Get technical indicators
+    technical_indicators = get_technical_indicators(
+        close_prices, exchange_rate, engine=get_indicator_engine(SILVER_SYMBOL))
+    
+    # Get market indicators
+    market_indicators = get_market_indicators(bundle)
+    
+    # Calculate premium analysis
+    current_spot_price = close_prices.iloc[-1]
+    premium_analysis = calculate_premium_analysis(retail_price, current_spot_price, exchange_rate)
+    
+    # Combine all market data
+    return {
+        "current_price": retail_price,
+        "exchange_rate": exchange_rate,
+        "technical_indicators": technical_indicators,
+        "market_correlations": market_indicators,
+        **price_stats,
+        **premium_analysis,
+        **(premium_stats or {})
+    }
+
+def get_complete_market_analysis(retail_price, news_articles, premium_stats=None):
     """Get complete technical and fundamental analysis"""
     try:
-        # Get exchange rate
-        exchange_rate = get_usd_to_inr_rate()
+        market_data = build_market_data(retail_price, premium_stats)
+        if "error" in market_data:
+            return market_data
+        exchange_rate = market_data["exchange_rate"]
         
-        # Get historical data
-        data, historical_prices = get_historical_prices(period="30d")
-        
-        if data.empty:
-            return {"error": "No historical data available"}
-        
-        close_prices = data["Close"].dropna()
-        
-        if close_prices.empty:
-            return {"error": "No price data available"}
-        
-        # Calculate price statistics
-        price_stats = calculate_price_stats(close_prices, exchange_rate)
-        
-        # Get technical indicators
-        technical_indicators = get_technical_indicators(close_prices, exchange_rate)
-        
-        # Get market indicators
-        market_indicators = get_market_indicators()
-        
-        # Calculate premium analysis
-        current_spot_price = close_prices.iloc[-1]
-        premium_analysis = calculate_premium_analysis(retail_price, current_spot_price, exchange_rate)
-        
-        # Combine all market data
-        market_data = {
-            "current_price": retail_price,
-            "exchange_rate": exchange_rate,
-            "technical_indicators": technical_indicators,
-            "market_correlations": market_indicators,
-            **price_stats,
-            **premium_analysis
-        }
-        
-        # Generate AI analysis
-        ai_recommendation = generate_ai_analysis(market_data, news_articles, exchange_rate)
+        # Generate AI analysis (reused while inputs are effectively unchanged)
+        ai_recommendation, ai_cached, ai_cache_age = get_cached_ai_analysis(
+            market_data, news_articles, exchange_rate)
         
         return {
             "ai_recommendation": ai_recommendation,
+            "ai_cached": ai_cached,
+            "ai_cache_age_seconds": ai_cache_age,
             "market_data": market_data,
             "news_count": len(news_articles)
         }
         
     except Exception as e:
         print(f"Error in complete market analysis: {e}")
-        return {"error": str(e)}
\ No newline at end of file
+        return {"error": str(e)}
+
+def stream_ai_analysis(market_data, news_articles):
+    """
+    Yield the AI analysis text as Gemini produces it.
+
+    A cached analysis is yielded in one piece; a fresh one is streamed chunk
+    by chunk and cached once complete.
+    """
+    exchange_rate = market_data["exchange_rate"]
+    key = analysis_fingerprint(market_data, news_articles, GEMINI_MODEL)
+    cached = ai_analysis_cache.peek(key)
+    if cached is not None:
+        yield cached
+        return
+
+    prompt = build_ai_prompt(market_data, news_articles, exchange_rate)
+    parts = []
+    with timed("gemini", "stream"):
+        response = get_gemini_model().generate_content(prompt, stream=True)
+        for chunk in response:
+            text = getattr(chunk, "text", "")
+            if text:
+                parts.append(text)
+                yield text
+    ai_analysis_cache.put(key, "".join(parts))
@@ -0,0 +1,97 @@
+"""
+Tests for the Gemini analysis cache in ai_cache.py
+"""
+import json
+import threading
+import time
+
+import pytest
+
+from ai_cache import AnalysisCache, analysis_fingerprint
+
+MARKET = {
+    "current_price": 110120,
+    "exchange_rate": 83.21,
+    "premium_percent": 7.1,
+    "technical_indicators": {"rsi": 54.2, "sma_5": 101200.5, "trend": "Bullish"},
+}
+NEWS = [{"title": "Silver climbs", "description": "..."}, {"title": "Gold steady"}]
+
+
+def test_fingerprint_ignores_small_moves_but_not_real_changes():
+    base = analysis_fingerprint(MARKET, NEWS, "gemini-1.5-flash")
+    nudged = {**MARKET, "current_price": 110180, "exchange_rate": 83.23}
+    assert analysis_fingerprint(nudged, list(reversed(NEWS)), "gemini-1.5-flash") == base
+
+    assert analysis_fingerprint({**MARKET, "current_price": 112000}, NEWS, "gemini-1.5-flash") != base
+    assert analysis_fingerprint(MARKET, NEWS + [{"title": "New"}], "gemini-1.5-flash") != base
+    assert analysis_fingerprint(MARKET, NEWS, "other-model") != base
+
+
+def test_fingerprint_buckets_premium_zscore():
+    market = {**MARKET, "premium_zscore": 1.1, "premium_percentile": 81.0}
+    base = analysis_fingerprint(market, NEWS, "gemini-1.5-flash")
+    assert analysis_fingerprint({**market, "premium_zscore": 1.2}, NEWS, "gemini-1.5-flash") == base
+    assert analysis_fingerprint({**market, "premium_zscore": 2.1}, NEWS, "gemini-1.5-flash") != base
+
+
+def test_cache_hits_and_disk_tier(tmp_path):
+    calls = []
+
+    def generate():
+        calls.append(1)
+        return "**Recommendation:** Hold"
+
+    cache = AnalysisCache(ttl=60, directory=str(tmp_path))
+    assert cache.get_or_generate("k", generate)[:2] == ("**Recommendation:** Hold", False)
+    assert cache.get_or_generate("k", generate)[1] is True
+
+    # A fresh process (new memory tier) still reuses the disk entry
+    restarted = AnalysisCache(ttl=60, directory=str(tmp_path))
+    assert restarted.get_or_generate("k", generate)[1] is True
+    assert calls == [1]
+
+
+def test_disk_entries_keep_their_remaining_ttl(tmp_path):
+    cache = AnalysisCache(ttl=60, directory=str(tmp_path))
+    with open(tmp_path / "k.json", "w", encoding="utf-8") as f:
+        json.dump({"text": "old", "created_at": time.time() - 59.95}, f)
+    assert cache.peek("k") == "old"
+    time.sleep(0.1)
+    assert cache.memory.get_entry("k") is None  # expired with the disk entry, not 60s later
+    assert cache.get_or_generate("k", lambda: "new")[:2] == ("new", False)
+
+
+def test_callers_sharing_a_generation_are_not_cached():
+    cache = AnalysisCache(ttl=60)
+    started, release = threading.Event(), threading.Event()
+
+    def generate():
+        started.set()
+        release.wait(5)
+        return "fresh"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_generate("k", generate)))
+               for _ in range(3)]
+    threads[0].start()
+    started.wait(5)
+    for thread in threads[1:]:
+        thread.start()
+    time.sleep(0.05)
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert [cached for _, cached, _ in results] == [False, False, False]
+    assert cache.get_or_generate("k", generate)[1] is True
+
+
+def test_failures_are_not_cached():
+    cache = AnalysisCache(ttl=60)
+
+    def broken():
+        raise RuntimeError("quota")
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_generate("k", broken)
+    assert cache.get_or_generate("k", lambda: "ok")[:2] == ("ok", False)
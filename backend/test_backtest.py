@@ -0,0 +1,97 @@
+"""
+Tests for the vectorized backtest in backtest.py
+"""
+import numpy as np
+import pandas as pd
+
+from backtest import DEFAULT_PARAMS, REASONS, entry_signals, find_exits, run_backtest, summarize, sweep
+from trade_ledger import TradeLedger
+
+
+def random_bars(days=400, seed=3):
+    rng = np.random.default_rng(seed)
+    close = 90000 + np.cumsum(rng.normal(0, 600, days))
+    opens = close + rng.normal(0, 200, days)
+    high = np.maximum(opens, close) + rng.uniform(0, 500, days)
+    low = np.minimum(opens, close) - rng.uniform(0, 500, days)
+    index = pd.date_range("2023-01-02", periods=days, freq="B")
+    return pd.DataFrame({"Open": opens, "High": high, "Low": low, "Close": close}, index=index)
+
+
+def reference_backtest(bars, params):
+    """Bar-by-bar loop the vectorized version must agree with"""
+    opens, high, low, close = (bars[c].to_numpy() for c in ("Open", "High", "Low", "Close"))
+    signals = set(entry_signals(close, params).tolist())
+    trades, i = [], 0
+    while i < len(close):
+        if i not in signals:
+            i += 1
+            continue
+        buy = close[i]
+        target, stop = buy + params["booked_profit"], buy - params["min_loss"]
+        for j in range(i + 1, min(i + params["max_hold"], len(close) - 1) + 1):
+            if low[j] <= stop:
+                trades.append((buy, min(stop, opens[j]), "stop_loss"))
+                break
+            if high[j] >= target:
+                trades.append((buy, max(target, opens[j]), "target"))
+                break
+            if j == i + params["max_hold"]:
+                trades.append((buy, close[j], "max_hold"))
+                break
+        else:
+            break  # still open when the data ends
+        i = j + 1
+    return trades
+
+
+def test_exit_rules():
+    arrays = {
+        "open":  np.array([100, 100, 100, 100, 100, 80.0]),
+        "high":  np.array([100, 105, 111, 100, 100, 80.0]),
+        "low":   np.array([100, 95, 99, 89, 100, 80.0]),
+        "close": np.array([100, 100, 100, 100, 100, 80.0]),
+    }
+    entries = np.array([0, 1, 2, 4])
+    exit_bar, price, reason = find_exits(arrays, entries, 10, 10, 3)
+    assert exit_bar.tolist() == [2, 2, 3, 5]
+    assert [REASONS[r] for r in reason] == ["target", "target", "stop_loss", "stop_loss"]
+    assert price.tolist() == [110, 110, 90, 80]  # the last one gapped through its stop
+
+    _, _, reason = find_exits(arrays, np.array([3]), 100, 100, 5)
+    assert reason.tolist() == [-1]  # unresolved when the data runs out
+
+
+def test_matches_bar_by_bar_reference():
+    bars = random_bars()
+    for params in (DEFAULT_PARAMS, {**DEFAULT_PARAMS, "booked_profit": 2000, "min_loss": 1500, "max_hold": 10}):
+        result = run_backtest(bars, params)
+        expected = reference_backtest(bars, params)
+        assert len(result["completed_trades"]) == len(expected) > 0
+        for trade, (buy, sell, reason) in zip(result["completed_trades"], expected):
+            assert trade["reason"] == reason
+            assert trade["buy_price"] == round(buy, 2) and trade["sell_price"] == round(sell, 2)
+
+
+def test_summary_matches_ledger_stats(tmp_path):
+    result = run_backtest(random_bars(), {"booked_profit": 1500, "min_loss": 1000})
+    ledger = TradeLedger(str(tmp_path / "trades.sqlite3"))
+    for trade in result["completed_trades"]:
+        trade_id, _ = ledger.open_trade(trade["buy_price"], trade["target_profit"], trade["stop_loss"])
+        ledger.close_trade(trade_id, trade["sell_price"], trade["reason"])
+
+    stats = ledger.stats()
+    assert set(stats) <= set(result)
+    assert {key: result[key] for key in stats} == stats
+    pnl = [t["pnl"] for t in result["completed_trades"]]
+    assert summarize(pnl, [t["reason"] for t in result["completed_trades"]]) == stats
+
+
+def test_sweep_is_the_same_in_a_process_pool():
+    grid = {"booked_profit": [500, 1500], "min_loss": [300, 1000], "fast": [5, 10]}
+    serial = sweep(random_bars(), grid, workers=1)
+    pooled = sweep(random_bars(), grid, workers=2)
+    assert len(serial) == 8
+    assert [row["total_pnl"] for row in serial] == sorted((row["total_pnl"] for row in serial), reverse=True)
+    assert {(tuple(sorted(r["params"].items())), r["total_pnl"]) for r in serial} == \
+        {(tuple(sorted(r["params"].items())), r["total_pnl"]) for r in pooled}
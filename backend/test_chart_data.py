@@ -0,0 +1,112 @@
+"""
+Tests for LTTB / min-max downsampling and the cached chart pyramids in chart_data.py
+"""
+from datetime import datetime, timezone
+
+import numpy as np
+import pytest
+
+from chart_data import ChartData, ChartPyramid, lttb, minmax, time_labels
+
+
+def random_walk(n, seed=5):
+    rng = np.random.default_rng(seed)
+    x = 1_700_000_000 + np.arange(n) * 86400.0
+    return x, 116000 + np.cumsum(rng.normal(0, 400, n))
+
+
+def reference_lttb(x, y, threshold):
+    """Straightforward per-point LTTB used to check the vectorized version"""
+    n = len(x)
+    every = (n - 2) / (threshold - 2)
+    selected, a = [0], 0
+    for i in range(threshold - 2):
+        start, end = int(i * every) + 1, int((i + 1) * every) + 1
+        next_end = min(int((i + 2) * every) + 1, n)
+        avg_x = sum(x[end:next_end]) / (next_end - end)
+        avg_y = sum(y[end:next_end]) / (next_end - end)
+        best, best_area = start, -1.0
+        for j in range(start, end):
+            area = abs((x[a] - avg_x) * (y[j] - y[a]) - (x[a] - x[j]) * (avg_y - y[a]))
+            if area > best_area:
+                best, best_area = j, area
+        selected.append(best)
+        a = best
+    return selected + [n - 1]
+
+
+def test_lttb_matches_reference_and_keeps_extremes():
+    x, y = random_walk(2000)
+    keep = lttb(x, y, 100)
+    assert keep.tolist() == reference_lttb((x - x[0]).tolist(), y.tolist(), 100)
+    assert len(keep) == 100 and keep[0] == 0 and keep[-1] == 1999
+    assert np.all(np.diff(keep) > 0)
+
+    spike = y.copy()
+    spike[1234] += 50_000
+    assert 1234 in lttb(x, spike, 100)
+
+
+def test_short_series_are_returned_whole():
+    x, y = random_walk(50)
+    assert lttb(x, y, 500).tolist() == list(range(50))
+    assert minmax(x, y, 500).tolist() == list(range(50))
+
+
+def test_minmax_keeps_every_bucket_extreme():
+    x, y = random_walk(1000)
+    keep = minmax(x, y, 100)
+    assert len(keep) <= 100
+    assert int(y.argmax()) in keep and int(y.argmin()) in keep
+
+
+def test_pyramid_levels_halve_and_respect_budget():
+    x, y = random_walk(4000)
+    pyramid = ChartPyramid(x, y, min_points=64)
+    sizes = [len(level_x) for level_x, _ in pyramid.levels]
+    assert sizes[0] == 4000 and 64 <= sizes[-1] < 128
+    for bigger, smaller in zip(sizes, sizes[1:]):
+        assert bigger // 2 <= smaller <= bigger // 2 + 4  # plus the ends and a short tail
+    for level_x, level_y in pyramid.levels:
+        assert level_y.max() == y.max() and level_y.min() == y.min()
+        assert level_x[0] == x[0] and level_x[-1] == x[-1]
+    sampled_x, sampled_y = pyramid.sample(300)
+    assert len(sampled_x) == 300
+    assert sampled_x[0] == x[0] and sampled_x[-1] == x[-1]
+
+
+def test_chart_data_caches_per_data_version():
+    x, y = random_walk(3000)
+    state = {"version": 1, "loads": 0}
+
+    def load(days):
+        state["loads"] += 1
+        return x[-days:], y[-days:]
+
+    charts = ChartData({"spot": (lambda days: state["version"] if days < 30 else 0, load)})
+    first = charts.get("spot", "5y", points=200)
+    assert first["points"] == 200 and first["source_points"] == 1826
+    assert set(first["data"][0]) == {"ts", "time", "price"}
+    charts.get("spot", "5y", points=500)
+    assert state["loads"] == 1
+
+    charts.get("spot", "1w", points=200)
+    state["version"] = 2
+    charts.get("spot", "5y", points=200)
+    assert state["loads"] == 2  # the long range does not depend on this version
+    charts.get("spot", "1w", points=200)
+    assert state["loads"] == 3
+
+    with pytest.raises(ValueError):
+        charts.get("spot", "10y")
+    with pytest.raises(ValueError):
+        charts.get("spot", "1y", points=1)
+    with pytest.raises(ValueError):
+        charts.get("gold", "1y")
+
+
+def test_time_labels_match_strftime():
+    ts = np.array([1_700_000_000, 1_718_000_123.9, 1_735_689_599])
+    for daily, time_format in ((True, "%Y-%m-%d"), (False, "%m-%d %H:%M")):
+        assert time_labels(ts, daily) == [
+            datetime.fromtimestamp(int(t), timezone.utc).strftime(time_format) for t in ts]
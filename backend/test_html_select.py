@@ -0,0 +1,41 @@
+"""
+Tests for the stdlib selector-based text extraction in html_select.py
+"""
+import os
+
+import pytest
+
+from html_select import parse_selector, select_text
+
+RATE_SELECTOR = "div#divProduct td.p-h.ph.product-rate div.mn-rate-cover span.bgm.e"
+FIXTURE = os.path.join(os.path.dirname(__file__), "benchmarks", "fixtures", "shankar.html")
+
+
+def test_reads_rate_cells_from_recorded_page():
+    with open(FIXTURE, encoding="utf-8") as f:
+        html = f.read()
+    assert select_text(html, RATE_SELECTOR) == ["--", "--", "1,15,980", "1,16,240", "1,16,050", "1,16,320"]
+
+
+def test_requires_every_ancestor_and_class():
+    html = """
+    <div id="divProduct"><table><tr>
+      <td class="p-h ph product-rate"><div class="mn-rate-cover"><span class="bgm">no</span></div></td>
+      <td class="p-h product-rate"><div class="mn-rate-cover"><span class="bgm e">no</span></div></td>
+      <td class="ph p-h product-rate x"><div class="mn-rate-cover"><span class="e bgm">&#8377; 1,20,000
+      </span></div></td>
+    </tr></table></div>
+    <div><span class="bgm e">outside</span></div>
+    """
+    assert select_text(html, RATE_SELECTOR) == ["₹ 1,20,000"]
+
+
+def test_tolerates_unclosed_and_void_elements():
+    html = '<div id="a"><p>one<br><img src="x"><span class="v">1<b>2</b></span><p>two<span class="v">3</div>'
+    assert select_text(html, "div#a span.v") == ["12", "3"]
+
+
+def test_rejects_unsupported_selectors():
+    with pytest.raises(ValueError):
+        parse_selector("div > span")
+    assert parse_selector("DIV#x.a.b") == [("div", "x", frozenset({"a", "b"}))]
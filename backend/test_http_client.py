@@ -0,0 +1,44 @@
+"""
+Tests for conditional GETs in http_client.py against a local HTTP server
+"""
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+from http_client import fetch_parsed
+
+BODY = b"<rss>feed</rss>"
+ETAG = '"v1"'
+
+
+class FeedHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.headers.get("If-None-Match") == ETAG:
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("ETag", ETAG)
+        self.send_header("Content-Length", str(len(BODY)))
+        self.end_headers()
+        self.wfile.write(BODY)
+
+    def log_message(self, *args):
+        pass
+
+
+def test_unchanged_feed_is_not_reparsed():
+    server = HTTPServer(("127.0.0.1", 0), FeedHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/feed"
+    parses = []
+
+    def parse(content):
+        parses.append(content)
+        return ["article"]
+
+    try:
+        assert fetch_parsed(url, parse) == ["article"]
+        assert fetch_parsed(url, parse) == []  # 304: nothing new to ingest
+        assert parses == [BODY]
+    finally:
+        server.shutdown()
@@ -0,0 +1,52 @@
+"""
+indicator_batch results must match pandas rolling/ewm computed one series at a time
+"""
+import numpy as np
+import pandas as pd
+
+from indicator_batch import atr, compute_indicator_batch, price_matrix
+
+WINDOWS = (5, 14, 20)
+
+
+def random_matrix(assets=4, length=600, seed=0):
+    rng = np.random.default_rng(seed)
+    return 30 + np.cumsum(rng.normal(0, 0.3, (assets, length)), axis=1)
+
+
+def test_matches_pandas_per_series():
+    close = random_matrix()
+    batch = compute_indicator_batch(close, WINDOWS)
+    for a in range(close.shape[0]):
+        series = pd.Series(close[a])
+        delta = series.diff()
+        for w_index, w in enumerate(WINDOWS):
+            np.testing.assert_allclose(batch["sma"][w_index, a], series.rolling(w).mean(), rtol=1e-9)
+            np.testing.assert_allclose(batch["ema"][w_index, a], series.ewm(span=w, adjust=False).mean(), rtol=1e-9)
+            np.testing.assert_allclose(batch["rolling_high"][w_index, a], series.rolling(w).max())
+            np.testing.assert_allclose(batch["rolling_low"][w_index, a], series.rolling(w).min())
+            std = series.rolling(w).std()
+            np.testing.assert_allclose(batch["bollinger_upper"][w_index, a],
+                                       series.rolling(w).mean() + 2 * std, rtol=1e-9)
+            gain = delta.where(delta > 0, 0).rolling(w).mean()
+            loss = (-delta.where(delta < 0, 0)).rolling(w).mean()
+            np.testing.assert_allclose(batch["rsi"][w_index, a], 100 - 100 / (1 + gain / loss), rtol=1e-7)
+
+
+def test_atr():
+    close = random_matrix(assets=2, length=50)
+    high, low = close + 0.5, close - 0.5
+    result = atr(high, low, close, (14,))
+    frame = pd.DataFrame({"h": high[1], "l": low[1], "c": close[1]})
+    prev = frame["c"].shift().fillna(frame["c"])
+    tr = pd.concat([frame["h"] - frame["l"], (frame["h"] - prev).abs(), (frame["l"] - prev).abs()], axis=1).max(axis=1)
+    np.testing.assert_allclose(result[0, 1], tr.rolling(14).mean(), rtol=1e-9)
+
+
+def test_price_matrix_aligns_assets():
+    silver = pd.Series([30.0, 31.0, 32.0], index=pd.to_datetime(["2024-01-01", "2024-01-02", "2024-01-03"]))
+    gold = pd.Series([2000.0, 2010.0], index=pd.to_datetime(["2024-01-01", "2024-01-03"]))
+    names, index, matrix = price_matrix({"SI=F": silver, "GC=F": gold})
+    assert names == ["SI=F", "GC=F"]
+    assert matrix.shape == (2, 3)
+    assert matrix[1, 1] == 2000.0  # forward-filled gap
@@ -0,0 +1,93 @@
+"""
+The streaming IndicatorEngine must match the pandas rolling() calculations
+get_technical_indicators used before it (kept below as the reference).
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from indicators import IndicatorEngine, RollingWindow
+from technical_analysis import get_technical_indicators
+
+EXCHANGE_RATE = 83.2
+
+
+def reference_indicators(close_prices, exchange_rate):
+    adjusted_prices = close_prices * 32.15
+    sma_5 = adjusted_prices.rolling(window=5).mean().iloc[-1] if len(adjusted_prices) >= 5 else adjusted_prices.mean()
+    sma_20 = adjusted_prices.rolling(window=min(20, len(adjusted_prices))).mean().iloc[-1]
+    # The original checked >= 14 and returned NaN for exactly 14 bars; the engine reports 50 there
+    if len(adjusted_prices) >= 15:
+        delta = adjusted_prices.diff()
+        gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
+        loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
+        rsi = 100 - (100 / (1 + gain / loss)).iloc[-1]
+    else:
+        rsi = 50
+    high_20 = adjusted_prices.rolling(window=min(20, len(adjusted_prices))).max().iloc[-1]
+    low_20 = adjusted_prices.rolling(window=min(20, len(adjusted_prices))).min().iloc[-1]
+    return {
+        "sma_5": round(float(sma_5) * exchange_rate, 2),
+        "sma_20": round(float(sma_20) * exchange_rate, 2),
+        "rsi": round(float(rsi), 2),
+        "resistance": round(float(high_20) * exchange_rate, 2),
+        "support": round(float(low_20) * exchange_rate, 2),
+        "trend": "Bullish" if sma_5 > sma_20 else "Bearish",
+    }
+
+
+def random_closes(n, seed):
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range("2024-01-01", periods=n)
+    return pd.Series(30 + np.cumsum(rng.normal(0, 0.4, n)), index=index, name="Close")
+
+
+def assert_close(actual, expected):
+    assert actual["trend"] == expected["trend"]
+    for key in ("sma_5", "sma_20", "rsi", "resistance", "support"):
+        assert actual[key] == pytest.approx(expected[key], abs=0.011), key
+
+
+@pytest.mark.parametrize("n", [3, 5, 15, 21, 30, 120])
+def test_matches_pandas_reference(n):
+    closes = random_closes(n, seed=n)
+    assert_close(get_technical_indicators(closes, EXCHANGE_RATE), reference_indicators(closes, EXCHANGE_RATE))
+
+
+def test_incremental_updates_match_full_recompute():
+    closes = random_closes(200, seed=7)
+    engine = IndicatorEngine()
+    for end in range(30, 201, 17):
+        window = closes.iloc[end - 30:end]  # a moving 30-bar request window
+        assert_close(get_technical_indicators(window, EXCHANGE_RATE, engine=engine),
+                     reference_indicators(window, EXCHANGE_RATE))
+    assert engine.bars == 199  # every bar committed once, the forming bar never
+
+
+def test_rolling_window_peek_matches_push():
+    rng = np.random.default_rng(1)
+    window = RollingWindow(5)
+    for value in rng.normal(size=50):
+        expected = RollingWindow(5)
+        for v in list(window.values) + [value]:
+            expected.push(v)
+        assert window.peek_max(value) == expected.max()
+        assert window.peek_min(value) == expected.min()
+        assert window.peek_mean(value) == pytest.approx(expected.mean())
+        window.push(value)
+
+
+def test_wilder_rsi():
+    closes = random_closes(60, seed=3)
+    delta = closes.diff().dropna()
+    gain = delta.clip(lower=0).to_numpy()
+    loss = (-delta).clip(lower=0).to_numpy()
+    avg_gain, avg_loss = gain[:14].mean(), loss[:14].mean()
+    for g, l in zip(gain[14:], loss[14:]):
+        avg_gain = (avg_gain * 13 + g) / 14
+        avg_loss = (avg_loss * 13 + l) / 14
+    engine = IndicatorEngine.from_history(closes, rsi_mode="wilder")
+    assert engine.snapshot()["rsi"] == pytest.approx(100 - 100 / (1 + avg_gain / avg_loss))
+
+    warm = IndicatorEngine.from_history(closes.iloc[:-1], rsi_mode="wilder")
+    assert warm.snapshot(live_price=closes.iloc[-1])["rsi"] == pytest.approx(engine.snapshot()["rsi"])
@@ -0,0 +1,103 @@
+"""
+Tests for the 1m base bars and resampled timeframe views in intraday_bars.py
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from intraday_bars import TIMEFRAMES, BarSeries
+
+START = 1_718_000_000 - 1_718_000_000 % 86400  # a UTC midnight
+
+
+def minute_frame(n, start=START, seed=7):
+    rng = np.random.default_rng(seed)
+    close = 30 + np.cumsum(rng.normal(0, 0.02, n))
+    index = pd.to_datetime(start + np.arange(n) * 60, unit="s")
+    return pd.DataFrame({
+        "Open": close + rng.normal(0, 0.01, n),
+        "High": close + 0.05,
+        "Low": close - 0.05,
+        "Close": close,
+        "Volume": rng.integers(1, 100, n).astype(float),
+    }, index=index)
+
+
+def pandas_resample(frame, timeframe):
+    rule = {"1m": "1min", "5m": "5min", "15m": "15min", "1h": "1h", "1d": "1D"}[timeframe]
+    return frame.resample(rule).agg(
+        {"Open": "first", "High": "max", "Low": "min", "Close": "last", "Volume": "sum"}).dropna()
+
+
+def assert_same_bars(got, expected):
+    assert got.index.equals(expected.index)
+    for column in ("Open", "High", "Low", "Close", "Volume"):
+        np.testing.assert_allclose(got[column].to_numpy(), expected[column].to_numpy())
+
+
+@pytest.mark.parametrize("timeframe", list(TIMEFRAMES))
+def test_views_match_pandas_resample(timeframe):
+    frame = minute_frame(3000)
+    series = BarSeries()
+    series.add_bars(frame)
+    assert_same_bars(series.frame(timeframe), pandas_resample(frame, timeframe))
+
+
+def test_ticks_update_only_the_newest_bucket():
+    frame = minute_frame(200)
+    series = BarSeries()
+    series.add_bars(frame)
+    for timeframe in TIMEFRAMES:
+        series.frame(timeframe)  # materialize every view before the ticks arrive
+    before = series.frame("15m")
+
+    last = START + 199 * 60
+    ticks = [(last + 10, 31.0), (last + 40, 29.0), (last + 70, 30.5), (last + 400, 30.7), (last - 600, 99.0)]
+    accepted = [series.add_tick(ts, price, volume=2.0) for ts, price in ticks]
+    assert accepted == [True, True, True, True, False]  # the late tick is dropped
+
+    expected = frame.copy()
+    expected.loc[expected.index[-1], ["High", "Low", "Close"]] = [31.0, 29.0, 29.0]
+    expected.loc[expected.index[-1], "Volume"] += 4.0
+    for ts, price in ((last + 60, 30.5), (last + 360, 30.7)):
+        expected.loc[pd.Timestamp(ts, unit="s")] = [price, price, price, price, 2.0]
+    for timeframe in TIMEFRAMES:
+        assert_same_bars(series.frame(timeframe), pandas_resample(expected, timeframe))
+
+    # Closed 15m buckets were left alone
+    after = series.frame("15m")
+    assert_same_bars(after.iloc[:len(before) - 1], before.iloc[:-1])
+
+
+def test_merge_replaces_covered_span_and_keeps_newer_ticks():
+    frame = minute_frame(120)
+    series = BarSeries()
+    series.add_bars(frame.iloc[:100])
+    series.frame("5m")
+    tick_ts = START + 130 * 60
+    series.add_tick(tick_ts, 42.0)
+
+    # A later download revises the last stored minutes and adds new ones
+    series.add_bars(frame.iloc[95:])
+    expected = pd.concat([frame, pd.DataFrame(
+        {"Open": [42.0], "High": [42.0], "Low": [42.0], "Close": [42.0], "Volume": [0.0]},
+        index=pd.to_datetime([tick_ts], unit="s"))])
+    assert_same_bars(series.frame("1m"), expected)
+    assert_same_bars(series.frame("5m"), pandas_resample(expected, "5m"))
+
+
+def test_trim_bounds_memory_and_limits_pages():
+    series = BarSeries(max_bars=1000)
+    series.add_bars(minute_frame(1500))
+    assert len(series) <= 1000
+    series.frame("1h")
+    for i in range(600):
+        series.add_tick(START + (1500 + i) * 60, 30.0)
+    assert len(series) <= 1000
+    assert series.frame("1m").index[-1] == pd.Timestamp(START + 2099 * 60, unit="s")
+    assert len(series.frame("5m", limit=10)) == 10
+
+    since = START + 2000 * 60
+    assert series.frame("1m", since=since).index[0] == pd.Timestamp(since + 60, unit="s")
+    with pytest.raises(ValueError):
+        series.frame("4h")
@@ -0,0 +1,80 @@
+"""
+Tests for the bounded JobRunner in jobs.py
+"""
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+from jobs import JobRunner, QueueFullError
+
+
+def wait_for(runner, job_id, status, timeout=2):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = runner.get(job_id)
+        if job["status"] == status:
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"job never reached {status}")
+
+
+def test_job_result_and_failure(tmp_path):
+    runner = JobRunner(workers=2, path=str(tmp_path / "jobs.sqlite3"))
+    ok = runner.submit(lambda: {"ai_recommendation": "Hold"})
+    bad = runner.submit(lambda: 1 / 0)
+    reported = runner.submit(lambda: {"error": "No historical data available"})
+    assert wait_for(runner, ok, "done")["result"] == {"ai_recommendation": "Hold"}
+    assert "division" in wait_for(runner, bad, "failed")["error"]
+    assert wait_for(runner, reported, "failed")["error"] == "No historical data available"
+    assert runner.metrics()["completed"] == 1
+    assert runner.get("missing") is None
+
+
+def test_jobs_are_visible_from_other_workers(tmp_path):
+    path = str(tmp_path / "jobs.sqlite3")
+    gate = threading.Event()
+    submitter, poller = JobRunner(workers=1, path=path), JobRunner(workers=1, path=path)
+    job_id = submitter.submit(lambda: gate.wait() and {"ai_recommendation": "Buy"})
+    assert poller.get(job_id)["status"] in ("queued", "running")
+    gate.set()
+    assert wait_for(poller, job_id, "done")["result"] == {"ai_recommendation": "Buy"}
+
+
+def test_queue_limit_rejects_and_reports_depth(tmp_path):
+    gate = threading.Event()
+    runner = JobRunner(workers=1, queue_limit=2, path=str(tmp_path / "jobs.sqlite3"))
+    running = runner.submit(gate.wait)
+    wait_for(runner, running, "running")
+    runner.submit(gate.wait)
+    runner.submit(gate.wait)
+
+    assert runner.metrics()["queue_depth"] == 2
+    with pytest.raises(QueueFullError):
+        runner.submit(gate.wait)
+    assert runner.metrics()["rejected"] == 1
+    gate.set()
+
+
+def test_jobs_of_exited_workers_are_failed_on_startup(tmp_path):
+    path = str(tmp_path / "jobs.sqlite3")
+    JobRunner(workers=1, path=path)
+    dead = subprocess.run([sys.executable, "-c", "import os; print(os.getpid())"],
+                          capture_output=True, text=True).stdout.strip()
+    with sqlite3.connect(path) as conn:
+        conn.execute("INSERT INTO jobs (job_id, owner, status, submitted_at) VALUES ('orphan', ?, 'running', ?)",
+                     (int(dead), time.time()))
+
+    job = JobRunner(workers=1, path=path).get("orphan")
+    assert job["status"] == "failed" and "exited" in job["error"]
+
+
+def test_failed_insert_releases_the_queue_slot(tmp_path):
+    runner = JobRunner(workers=1, queue_limit=1, path=str(tmp_path / "jobs.sqlite3"))
+    runner._conn().execute("DROP TABLE jobs")
+    with pytest.raises(sqlite3.OperationalError):
+        runner.submit(lambda: None)
+    assert runner.metrics()["queue_depth"] == 0
@@ -0,0 +1,45 @@
+"""
+Tests for deferred heavy imports (lazy_imports.py and the app's cold start)
+"""
+import json
+import subprocess
+import sys
+import textwrap
+
+from lazy_imports import LazyModule, warm_up
+
+
+def test_lazy_module_imports_on_first_use():
+    module = LazyModule("colorsys")
+    assert "not loaded" in repr(module)
+    assert module.rgb_to_hsv(1, 0, 0) == (0, 1, 1)
+    assert "not loaded" not in repr(module)
+
+    module.demo_attribute = 1
+    import colorsys
+    assert colorsys.demo_attribute == 1
+    del module.demo_attribute
+
+
+def test_warm_up_imports_in_background():
+    called = []
+    warm_up(["json"], then=lambda: called.append(True)).join(timeout=10)
+    assert called == [True]
+
+
+def test_app_serves_history_without_heavy_imports(tmp_path):
+    script = textwrap.dedent(f"""
+        import json, os, sys
+        os.environ["TRADES_DB_PATH"] = {str(tmp_path / "trades.sqlite3")!r}
+        os.environ["NEWS_DB_PATH"] = {str(tmp_path / "news.sqlite3")!r}
+        os.environ["AI_JOBS_DB_PATH"] = {str(tmp_path / "jobs.sqlite3")!r}
+        os.environ["TICK_RING_PATH"] = {str(tmp_path / "ticks.ring")!r}
+        import app
+        status = app.app.test_client().get("/history").status_code
+        heavy = ["pandas", "yfinance", "google.generativeai", "playwright.sync_api", "feedparser"]
+        print(json.dumps({{"status": status, "loaded": [m for m in heavy if m in sys.modules]}}))
+    """)
+    result = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, timeout=120)
+    assert result.returncode == 0, result.stderr
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+    assert report == {"status": 200, "loaded": []}
@@ -0,0 +1,169 @@
+"""
+Offline tests for the batched, cached and stored market-data layer in technical_analysis.py
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+import technical_analysis as ta
+from ohlcv_store import OHLCVStore
+
+
+def make_frame(symbols, index):
+    columns = pd.MultiIndex.from_product([symbols, ["Open", "High", "Low", "Close", "Adj Close", "Volume"]])
+    values = np.arange(len(index) * len(columns), dtype=float).reshape(len(index), len(columns)) + 1
+    return pd.DataFrame(values, index=index, columns=columns)
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    """Record yf.download calls; serve business days up to 2024-06-28"""
+    recorded = []
+
+    def fake_download(symbols, period=None, interval="1d", start=None, **kwargs):
+        symbols = list(symbols)
+        recorded.append((tuple(symbols), period or f"start={start}", interval))
+        index = pd.bdate_range(start="2024-04-01", end="2024-06-28")
+        if start is not None:
+            index = index[index >= pd.Timestamp(start)]
+        return make_frame(symbols, index)
+
+    monkeypatch.setattr(ta.yf, "download", fake_download)
+    monkeypatch.setattr(ta, "_ohlcv_store", OHLCVStore(":memory:"))
+    ta.market_data_cache.clear()
+    return recorded
+
+
+def test_complete_analysis_inputs_come_from_one_download(calls):
+    bundle = ta.fetch_market_data(ta.ANALYSIS_DATA_NEEDS)
+    assert len(calls) == 1
+    assert set(calls[0][0]) == set(ta.ANALYSIS_DATA_NEEDS)
+
+    # Each consumer only sees its own window
+    assert len(bundle[ta.USD_INR_SYMBOL]) == 1
+    assert bundle[ta.GOLD_SYMBOL].index[0] >= pd.Timestamp("2024-06-24")
+    assert bundle[ta.SILVER_SYMBOL].index[0] >= pd.Timestamp("2024-05-30")
+
+    rate = ta.get_usd_to_inr_rate(bundle)
+    assert rate == float(bundle[ta.USD_INR_SYMBOL]["Close"].iloc[-1])
+    indicators = ta.get_market_indicators(bundle)
+    assert set(indicators) == {"usd_index_change", "gold_change"}
+    assert len(calls) == 1
+
+
+def test_repeat_requests_are_served_from_cache(calls):
+    ta.fetch_market_data(ta.ANALYSIS_DATA_NEEDS)
+    ta.fetch_market_data(ta.ANALYSIS_DATA_NEEDS)
+    ta.fetch_market_data({ta.SILVER_SYMBOL: "30d"})
+    assert len(calls) == 1
+
+    # Symbols outside the bar store are downloaded directly
+    ta.fetch_market_data({"PL=F": "5d"})
+    assert calls[-1][0] == ("PL=F",)
+
+
+def test_history_is_backfilled_once_then_topped_up(calls):
+    ta.sync_history([ta.SILVER_SYMBOL])
+    assert calls[-1][1] == ta.OHLCV_BACKFILL_PERIOD
+
+    ta.sync_history([ta.SILVER_SYMBOL])
+    assert calls[-1][1] == "start=2024-06-28"
+
+    # Any lookback is served from disk; Yahoo only sees the incremental request
+    data, closes = ta.get_historical_prices(period="2mo")
+    assert calls[-1][1] == "start=2024-06-28"
+    assert closes.index[-1] == pd.Timestamp("2024-06-28")
+    assert len(closes) > 40
+
+
+def test_intraday_bars_sync_once_and_resample_without_downloads(calls, monkeypatch):
+    monkeypatch.setattr(ta, "_intraday_series", {})
+    monkeypatch.setattr(ta, "_intraday_synced", {})
+    monkeypatch.setattr(ta, "_indicator_engines", {})
+
+    hourly = ta.get_intraday_bars(ta.SILVER_SYMBOL, "1h")
+    assert calls[-1] == ((ta.SILVER_SYMBOL,), ta.INTRADAY_BACKFILL_PERIOD, "1m")
+    daily = ta.get_intraday_bars(ta.SILVER_SYMBOL, "1d")
+    indicators = ta.get_timeframe_indicators(ta.SILVER_SYMBOL, "15m", 83.0)
+    assert len(calls) == 1  # every timeframe comes from the same stored 1m bars
+    assert len(hourly) == len(daily) > 0
+    assert set(indicators) == {"sma_5", "sma_20", "rsi", "resistance", "support", "trend"}
+
+    # Retail bars are fed by ticks only and never downloaded
+    retail = ta.get_intraday_series(ta.RETAIL_SERIES)
+    retail.add_tick(1_718_000_000, 116000)
+    assert len(ta.get_intraday_bars(ta.RETAIL_SERIES, "5m")) == 1
+    assert len(calls) == 1
+
+
+def test_stale_intraday_history_is_backfilled_not_resumed(calls):
+    store = ta.get_ohlcv_store()
+    store.append(ta.SILVER_SYMBOL, "1m", make_frame([ta.SILVER_SYMBOL], pd.DatetimeIndex(["2024-01-02 10:00"]))[ta.SILVER_SYMBOL])
+    ta.sync_history([ta.SILVER_SYMBOL], "1m")
+    assert calls[-1][1] == ta.INTRADAY_BACKFILL_PERIOD
+
+
+def test_intraday_download_does_not_block_other_callers(calls, monkeypatch):
+    import threading
+    monkeypatch.setattr(ta, "_intraday_series", {})
+    monkeypatch.setattr(ta, "_intraday_synced", {})
+    monkeypatch.setattr(ta, "_intraday_flights", {})
+    series = ta.get_intraday_series(ta.SILVER_SYMBOL, refresh=False)
+
+    started, release = threading.Event(), threading.Event()
+
+    def slow_sync(symbols, interval="1d"):
+        started.set()
+        release.wait(5)
+
+    monkeypatch.setattr(ta, "sync_history", slow_sync)
+    syncing = threading.Thread(target=ta.get_intraday_series, args=(ta.SILVER_SYMBOL,))
+    syncing.start()
+    assert started.wait(5)
+
+    # While one caller downloads, ticks, readers and other refreshers carry on
+    assert ta.get_intraday_series(ta.SILVER_SYMBOL, refresh=False) is series
+    assert ta.get_intraday_series(ta.SILVER_SYMBOL) is series
+    assert series.add_tick(1_718_000_000, 30.0)
+    assert ta._intraday_lock.acquire(timeout=1)  # the module lock is free during the download
+    ta._intraday_lock.release()
+    release.set()
+    syncing.join(5)
+    assert ta._intraday_synced[ta.SILVER_SYMBOL][0] is not None
+
+
+def test_indicator_warmup_does_not_block_other_engines(calls, monkeypatch):
+    import threading
+    monkeypatch.setattr(ta, "_indicator_engines", {})
+    monkeypatch.setattr(ta, "_indicator_warmups", {})
+    started, release = threading.Event(), threading.Event()
+    store = ta.get_ohlcv_store()
+    load_recent = store.load_recent
+
+    def slow_load_recent(symbol, *args, **kwargs):
+        if symbol == ta.SILVER_SYMBOL:
+            started.set()
+            release.wait(5)
+        return load_recent(symbol, *args, **kwargs)
+
+    monkeypatch.setattr(store, "load_recent", slow_load_recent)
+    engines = []
+    warming = threading.Thread(target=lambda: engines.append(ta.get_indicator_engine(ta.SILVER_SYMBOL)))
+    warming.start()
+    assert started.wait(5)
+
+    # Another symbol's engine is created while the first one warms up
+    assert ta.get_indicator_engine(ta.GOLD_SYMBOL) is not None
+    assert ta._indicator_engines_lock.acquire(timeout=1)
+    ta._indicator_engines_lock.release()
+
+    # A second caller for the same engine waits for the warm-up instead of getting it cold
+    waiting = threading.Thread(target=lambda: engines.append(ta.get_indicator_engine(ta.SILVER_SYMBOL)))
+    waiting.start()
+    waiting.join(0.1)
+    assert waiting.is_alive()
+    release.set()
+    warming.join(5)
+    waiting.join(5)
+    assert engines[0] is engines[1]
+    assert ta._indicator_warmups == {}
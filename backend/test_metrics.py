@@ -0,0 +1,57 @@
+"""
+Tests for the histograms, counters and Prometheus rendering in metrics.py
+"""
+import pytest
+from flask import Flask
+
+import metrics
+from metrics import Counter, Histogram, Registry
+
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = Histogram("demo_seconds", "Demo latency", ("stage",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 3.0):
+        histogram.observe(value, "rss")
+
+    lines = histogram.render()
+    assert lines[:2] == ["# HELP demo_seconds Demo latency", "# TYPE demo_seconds histogram"]
+    assert 'demo_seconds_bucket{stage="rss",le="0.1"} 1' in lines
+    assert 'demo_seconds_bucket{stage="rss",le="1.0"} 3' in lines
+    assert 'demo_seconds_bucket{stage="rss",le="+Inf"} 4' in lines
+    assert 'demo_seconds_sum{stage="rss"} 4.05' in lines
+    assert 'demo_seconds_count{stage="rss"} 4' in lines
+
+
+def test_counter_escapes_label_values():
+    registry = Registry()
+    counter = registry.register(Counter("demo_total", "Demo", ("source",)))
+    counter.inc('Silver "News"')
+    counter.inc('Silver "News"', amount=2)
+    assert 'demo_total{source="Silver \\"News\\""} 3' in registry.render()
+
+
+def test_timed_records_errors_and_durations():
+    before = metrics.STAGE_SECONDS.count("unit_test", "")
+    with metrics.timed("unit_test"):
+        pass
+    with pytest.raises(ValueError):
+        with metrics.timed("unit_test"):
+            raise ValueError("boom")
+    assert metrics.STAGE_SECONDS.count("unit_test", "") == before + 2
+    assert metrics.STAGE_ERRORS.get("unit_test", "") == 1
+
+
+def test_routes_are_labelled_by_rule():
+    app = Flask(__name__)
+    metrics.init_app(app)
+
+    @app.route("/jobs/<job_id>")
+    def job(job_id):
+        return job_id
+
+    client = app.test_client()
+    client.get("/jobs/a")
+    client.get("/jobs/b")
+    client.get("/missing")
+    assert metrics.HTTP_SECONDS.count("/jobs/<job_id>", "GET", "200") >= 2
+    assert metrics.HTTP_SECONDS.count("unmatched", "GET", "404") >= 1
@@ -0,0 +1,108 @@
+"""
+Tests for the rolling news index: timestamp parsing, dedupe, ordering and refreshes
+"""
+import threading
+import time
+
+from news_index import NewsIndex, NewsRefresher, article_key, parse_published
+
+
+def make_article(title, published, relevant=1, source="Gold Silver", description="Silver moved."):
+    return {
+        "key": article_key(title, description),
+        "published_ts": parse_published(published),
+        "relevant": relevant,
+        "title": title,
+        "description": description,
+        "source": source,
+        "published": published,
+        "weight": 0.3,
+    }
+
+
+def test_parse_published_handles_rfc822_offsets_and_iso():
+    utc = parse_published("Thu, 09 Oct 2025 05:53:20 GMT")
+    assert parse_published("Thu, 09 Oct 2025 11:23:20 +0530") == utc
+    assert parse_published("2025-10-09T05:53:20Z") == utc
+    assert parse_published("2025-10-09T05:53:20") == utc  # naive ISO is taken as UTC
+    assert parse_published("yesterday") is None
+    assert parse_published("") is None
+    assert parse_published("ignored", parsed=time.gmtime(utc)) == utc
+
+
+def test_key_ignores_case_and_whitespace():
+    assert article_key("Silver  rallies", "Up 2%") == article_key("silver rallies", "up  2%")
+    assert article_key("Silver rallies", "Up 2%") != article_key("Silver rallies", "Up 3%")
+
+
+def test_latest_is_time_sorted_not_string_sorted(tmp_path):
+    index = NewsIndex(str(tmp_path / "news.sqlite3"))
+    index.add([
+        # Lexicographically "Wed" > "Tue" > "Thu", chronologically the reverse
+        make_article("Oldest", "Wed, 08 Oct 2025 10:00:00 GMT"),
+        make_article("Middle", "Thu, 09 Oct 2025 01:00:00 +0000"),
+        make_article("Newest", "2025-10-10T09:00:00Z"),
+        make_article("Irrelevant", "2025-10-11T09:00:00Z", relevant=0),
+    ])
+    assert [a["title"] for a in index.latest(8)] == ["Newest", "Middle", "Oldest"]
+    assert [a["title"] for a in index.latest(2)] == ["Newest", "Middle"]
+    assert set(index.latest(1)[0]) == {"title", "description", "source", "published", "weight"}
+
+
+def test_duplicates_are_stored_once(tmp_path):
+    index = NewsIndex(str(tmp_path / "news.sqlite3"))
+    first = make_article("Silver rallies", "Thu, 09 Oct 2025 05:53:20 GMT")
+    syndicated = {**make_article("SILVER  rallies", "Thu, 09 Oct 2025 06:00:00 GMT"), "source": "Silver News"}
+    assert index.add([first]) == 1
+    assert index.add([syndicated, first]) == 0
+    assert index.count() == 1
+    assert index.known_keys([first["key"], "unknown"]) == {first["key"]}
+
+
+def test_prune_keeps_newest(tmp_path):
+    index = NewsIndex(str(tmp_path / "news.sqlite3"), max_articles=2)
+    index.add([
+        make_article("A", "2025-10-10T09:00:00Z"),
+        make_article("B", "2025-10-10T10:00:00Z"),
+        make_article("C", "2025-10-10T11:00:00Z"),
+    ])
+    index.prune()
+    assert [a["title"] for a in index.latest(8)] == ["C", "B"]
+
+
+def test_refresher_shares_concurrent_runs():
+    calls = []
+    gate = threading.Event()
+
+    def ingest():
+        calls.append(1)
+        gate.wait(1)
+        return 3
+
+    refresher = NewsRefresher(ingest, interval=60)
+    threads = [threading.Thread(target=refresher.run) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.05)
+    gate.set()
+    for thread in threads:
+        thread.join()
+    assert len(calls) == 1
+    assert refresher.status()["last_added"] == 3
+
+
+def test_refresher_only_ingests_on_the_leader():
+    calls = []
+    leader = threading.Event()
+    refresher = NewsRefresher(lambda: calls.append(1) or 0, interval=0.01, is_leader=leader.is_set)
+    refresher.start()
+    try:
+        time.sleep(0.1)
+        assert calls == []
+        leader.set()  # e.g. the old leader exited
+        deadline = time.monotonic() + 3
+        while not calls and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert calls
+    finally:
+        refresher.stop()
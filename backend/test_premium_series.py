@@ -0,0 +1,94 @@
+"""
+Tests for the rolling premium statistics in premium_series.py
+"""
+import math
+import random
+
+import pytest
+
+from premium_series import PremiumSeries
+
+
+def brute_force(ts, values, seconds):
+    """Reference stats for every point over the trailing window (ts - seconds, ts]"""
+    rows = []
+    for i, (t, value) in enumerate(zip(ts, values)):
+        window = [v for u, v in zip(ts[:i + 1], values[:i + 1]) if u > t - seconds]
+        mean = sum(window) / len(window)
+        std = math.sqrt(sum((v - mean) ** 2 for v in window) / len(window))
+        rows.append({
+            "mean": mean,
+            "std": std,
+            "zscore": (value - mean) / std if std > 1e-9 else 0.0,
+            "percentile": sum(v <= value for v in window) / len(window) * 100,
+        })
+    return rows
+
+
+def random_series(n, seed=3):
+    rng = random.Random(seed)
+    ts, values, t = [], [], 1_700_000_000.0
+    for _ in range(n):
+        t += rng.choice([15, 30, 60, 120, 900])
+        ts.append(t)
+        values.append(round(rng.gauss(7.5, 0.8), 2))  # premium %, with ties
+    return ts, values
+
+
+@pytest.mark.parametrize("max_points", [10_000, 150])
+def test_incremental_stats_match_brute_force(max_points):
+    ts, values = random_series(600)
+    series = PremiumSeries(windows={"1h": 3600, "4h": 4 * 3600}, max_points=max_points)
+    for t, value in zip(ts, values):
+        series.observe(t, value * 1000, value)
+
+    for name, seconds in (("1h", 3600), ("4h", 4 * 3600)):
+        expected = brute_force(ts, values, seconds)
+        history = series.history(name, limit=10_000)
+        kept = history["points"]
+        assert kept == min(600, len(series))
+        assert history["ts"] == ts[-kept:]
+        for column in ("mean", "std", "zscore", "percentile"):
+            for got, row in zip(history[column], expected[-kept:]):
+                assert got == pytest.approx(row[column], abs=1e-3)
+
+
+def test_observe_quote_computes_premium_and_ignores_stale_points():
+    series = PremiumSeries()
+    assert series.observe_quote(1000.0, 116000, 40.0, 83.0, "shankar")
+    assert not series.observe_quote(999.0, 117000, 40.0, 83.0, "shankar")
+    assert not series.observe_quote(1001.0, 116000, None, 83.0, "shankar")
+    latest = series.latest("1d")
+    spot_inr = 40.0 * 32.15 * 83.0
+    assert latest["premium"] == round(116000 - spot_inr, 2)
+    assert latest["premium_percent"] == round((116000 - spot_inr) / spot_inr * 100, 4)
+    assert latest["zscore"] == 0.0 and latest["observations"] == 1
+
+
+def test_history_filters_and_signal():
+    series = PremiumSeries(windows={"1h": 3600})
+    for i, value in enumerate([5.0, 5.0, 5.0, 8.0]):
+        series.observe(1000.0 + i * 60, value * 1000, value)
+
+    page = series.history("1h", since=1060.0, limit=10)
+    assert page["ts"] == [1120.0, 1180.0]
+    assert series.history("1h", limit=1)["premium_percent"] == [8.0]
+    assert series.signal("1h") == {
+        "premium_zscore": round((8.0 - 5.75) / math.sqrt((3 * 0.75 ** 2 + 2.25 ** 2) / 4), 2),
+        "premium_percentile": 100.0,
+        "premium_mean_percent": 5.75,
+        "premium_window": "1h",
+    }
+    assert PremiumSeries().signal() == {}
+    with pytest.raises(ValueError):
+        series.history("2y")
+
+
+def test_fallback_quotes_are_not_recorded():
+    series = PremiumSeries(windows={"1h": 3600})
+    assert series.observe_quote(1000.0, 110000, 40.0, 83.0, "shankar")
+    assert not series.observe_quote(1060.0, 116000, 40.0, 83.0, "default")
+    assert not series.observe_quote(1120.0, 115000, 40.0, 83.0, "spot_estimate")
+    assert not series.observe_quote(1180.0, 115000, 40.0, 83.0, None)
+    assert len(series) == 1
+    assert series.signal("1h")["premium_zscore"] == 0.0
@@ -0,0 +1,79 @@
+"""
+Tests for price_feed.py using stub fetchers (no scraping, no Yahoo)
+"""
+import threading
+import time
+from datetime import datetime
+
+from price_feed import PriceFeed, is_indian_market_hours, IST
+
+
+def make_feed(prices, **kwargs):
+    calls = {"retail": 0}
+
+    def fetch_retail():
+        calls["retail"] += 1
+        return {"currVal": prices[min(calls["retail"], len(prices)) - 1]}
+
+    def fetch_spot():
+        return {"spot_usd": 30.0, "exchange_rate": 83.0}
+
+    feed = PriceFeed(fetch_retail, fetch_spot, **kwargs)
+    feed.start = lambda: None  # drive refreshes by hand
+    return feed, calls
+
+
+def test_snapshot_is_served_from_memory():
+    feed, calls = make_feed([110000])
+    first = feed.snapshot()
+    second = feed.snapshot()
+    assert first["retail_price"] == 110000
+    assert second["stale"] is False
+    assert "as_of" in second
+    assert calls["retail"] == 1
+
+
+def test_max_staleness_forces_refresh():
+    feed, calls = make_feed([110000, 111000], max_staleness=0.01)
+    feed.snapshot()
+    time.sleep(0.02)
+    assert feed.snapshot()["retail_price"] == 111000
+    assert calls["retail"] == 2
+
+
+def test_concurrent_refreshes_share_one_fetch():
+    feed, calls = make_feed([110000])
+    gate = threading.Event()
+    original = feed.fetch_retail
+
+    def slow_retail():
+        gate.wait(1)
+        return original()
+
+    feed.fetch_retail = slow_retail
+    threads = [threading.Thread(target=feed.refresh) for _ in range(5)]
+    for t in threads:
+        t.start()
+    time.sleep(0.05)
+    gate.set()
+    for t in threads:
+        t.join()
+    assert calls["retail"] == 1
+
+
+def test_interval_backs_off_when_quiet_and_resets_on_moves():
+    feed, _ = make_feed([110000, 110000, 110000, 112000],
+                        min_interval=10, max_interval=100, off_hours_interval=100)
+    feed.refresh()
+    feed.refresh()
+    assert feed.interval == 15
+    feed.refresh()
+    assert feed.interval == 22.5
+    feed.refresh()
+    assert feed.interval == 10
+
+
+def test_market_hours():
+    assert is_indian_market_hours(datetime(2024, 1, 3, 12, 0, tzinfo=IST))
+    assert not is_indian_market_hours(datetime(2024, 1, 3, 23, 45, tzinfo=IST))
+    assert not is_indian_market_hours(datetime(2024, 1, 6, 12, 0, tzinfo=IST))
@@ -0,0 +1,97 @@
+"""
+Tests for hedged price resolution and the per-source circuit breakers
+"""
+import threading
+import time
+
+from price_resolver import CircuitBreaker, PriceResolver
+
+
+def make_resolver(sources, **kwargs):
+    kwargs.setdefault("hedge_after", 0.05)
+    kwargs.setdefault("deadline", 1.0)
+    return PriceResolver(sources, default=116000, **kwargs)
+
+
+def test_primary_wins_when_fast():
+    hedge_calls = []
+    resolver = make_resolver([("shankar", lambda: 117000), ("spot_estimate", lambda: hedge_calls.append(1) or 115000)])
+    assert resolver.resolve() == (117000, "shankar")
+    assert hedge_calls == []
+
+
+def test_slow_primary_is_hedged_and_first_valid_answer_wins():
+    release = threading.Event()
+
+    def slow():
+        release.wait(2)
+        return 117000
+
+    resolver = make_resolver([("shankar", slow), ("spot_estimate", lambda: 115000)])
+    start = time.monotonic()
+    assert resolver.resolve() == (115000, "spot_estimate")
+    assert time.monotonic() - start < 0.5
+    release.set()
+
+
+def test_failure_starts_next_source_without_waiting_for_the_hedge_delay():
+    def broken():
+        raise RuntimeError("site down")
+
+    resolver = make_resolver([("shankar", broken), ("spot_estimate", lambda: 115000)], hedge_after=5)
+    start = time.monotonic()
+    assert resolver.resolve() == (115000, "spot_estimate")
+    assert time.monotonic() - start < 0.5
+    assert resolver.status()["sources"]["shankar"]["failures"] == 1
+
+
+def test_invalid_values_count_as_failures_and_deadline_serves_default():
+    release = threading.Event()
+
+    def hung():
+        release.wait(2)
+        return 117000
+
+    resolver = make_resolver(
+        [("shankar", hung), ("spot_estimate", lambda: None)],
+        deadline=0.2,
+        validate=lambda price: isinstance(price, int),
+    )
+    assert resolver.resolve() == (116000, "default")
+    release.set()
+    status = resolver.status()
+    assert status["defaults_served"] == 1
+    assert status["sources"]["shankar"]["timeouts"] == 1
+    assert status["sources"]["spot_estimate"]["failures"] == 1
+
+
+def test_open_breaker_skips_source_until_cooldown():
+    calls = []
+
+    def broken():
+        calls.append(1)
+        raise RuntimeError("site down")
+
+    resolver = make_resolver(
+        [("shankar", broken), ("spot_estimate", lambda: 115000)],
+        breaker_factory=lambda: CircuitBreaker(failure_threshold=2, cooldown=0.1),
+    )
+    for _ in range(3):
+        assert resolver.resolve() == (115000, "spot_estimate")
+    assert len(calls) == 2
+    shankar = resolver.status()["sources"]["shankar"]
+    assert shankar["state"] == "open" and shankar["skipped"] == 1
+
+    time.sleep(0.15)
+    assert resolver.resolve() == (115000, "spot_estimate")  # half-open trial fails -> open again
+    assert len(calls) == 3
+    assert resolver.status()["sources"]["shankar"]["state"] == "open"
+
+
+def test_half_open_success_closes_breaker():
+    breaker = CircuitBreaker(failure_threshold=1, cooldown=0)
+    breaker.record_failure()
+    assert breaker.allow()  # cooldown elapsed: trial call
+    assert not breaker.allow()  # only one trial at a time
+    breaker.record_success()
+    assert breaker.status() == {"state": "closed", "consecutive_failures": 0}
@@ -0,0 +1,91 @@
+"""
+Tests for the SSE EventHub in price_stream.py
+"""
+from price_stream import EventHub, TradeEventRelay, parse_event_id, publish_snapshot
+from trade_ledger import TradeLedger
+
+
+def test_resume_from_last_event_id():
+    hub = EventHub()
+    hub.publish("price", {"currVal": 1})
+    hub.publish("price", {"currVal": 2})
+    hub.publish("price", {"currVal": 3})
+
+    frames = hub.stream(last_event_id=parse_event_id("1-0"), heartbeat=0.01)
+    assert next(frames).startswith("retry:")
+    assert next(frames).startswith("id: 2-0\n")
+    assert next(frames).startswith("id: 3-0\n")
+    assert next(frames) == ": heartbeat\n\n"
+
+
+def test_new_subscriber_gets_latest_state_only():
+    hub = EventHub()
+    hub.publish("price", {"currVal": 1})
+    hub.publish("price", {"currVal": 2})
+
+    frames = hub.stream(heartbeat=0.01)
+    next(frames)
+    assert '"currVal":2' in next(frames)
+    assert next(frames) == ": heartbeat\n\n"
+
+
+def test_unchanged_snapshot_is_not_republished():
+    hub = EventHub()
+    snapshot = {"retail_price": 110000, "spot_usd": 30.0, "exchange_rate": 83.0, "as_of": "t1"}
+    publish_snapshot(hub, snapshot)
+    publish_snapshot(hub, {**snapshot, "as_of": "t2"})
+    assert [e[3] for e in hub.history] == ["price", "premium"]
+
+    publish_snapshot(hub, {**snapshot, "retail_price": 111000})
+    assert [e[3] for e in hub.history] == ["price", "premium", "price", "premium"]
+
+
+def test_resume_on_another_worker():
+    # Two workers see the same ticks and trade events, interleaved differently
+    first, second = EventHub(), EventHub()
+    for hub in (first, second):
+        hub.mark_trades(4)
+    first.publish("price", {"currVal": 1}, tick=10)
+    first.publish("trade", {"action": "buy"}, trade=5)
+    last_seen = first.publish("price", {"currVal": 2}, tick=11)
+    first.publish("trade", {"action": "sell"}, trade=6)
+
+    second.publish("price", {"currVal": 1}, tick=10)
+    second.publish("price", {"currVal": 2}, tick=11)
+    second.publish("trade", {"action": "buy"}, trade=5)
+    second.publish("trade", {"action": "sell"}, trade=6)
+    second.publish("price", {"currVal": 3}, tick=12)
+
+    assert last_seen == "12-5"
+    frames = second.stream(last_event_id=parse_event_id(last_seen), heartbeat=0.01)
+    next(frames)
+    assert next(frames).startswith('id: 12-6\nevent: trade\ndata: {"action":"sell"}')
+    assert next(frames).startswith('id: 13-6\nevent: price')
+    assert next(frames) == ": heartbeat\n\n"
+
+    # A position this worker has no history for gets the current state instead
+    frames = second.stream(last_event_id=(3, 1), heartbeat=0.01)
+    next(frames)
+    assert [next(frames).split("\n")[1] for _ in range(2)] == ["event: trade", "event: price"]
+
+
+def test_trade_events_reach_every_worker(tmp_path):
+    ledger = TradeLedger(str(tmp_path / "trades.sqlite3"))
+    ledger.open_trade(110000, 500, 300)
+    hubs = [EventHub(), EventHub()]
+    relays = [TradeEventRelay(hub, ledger) for hub in hubs]
+
+    trade_id, _ = ledger.open_trade(111000, 500, 300)
+    ledger.close_trade(trade_id, 111600, reason="target_hit")  # e.g. the leader's trigger engine
+    for relay in relays:
+        relay.poll()
+        relay.poll()
+    for hub in hubs:
+        assert [(e[1], e[4]["action"]) for e in hub.history] == [((0, 2), "buy"), ((0, 3), "sell")]
+        assert hub.history[-1][4]["trade_id"] == trade_id and hub.history[-1][4]["reason"] == "target_hit"
+
+
+def test_malformed_event_ids_are_ignored():
+    assert parse_event_id("12-5") == (12, 5)
+    for raw in (None, "", "17", "a-1", "1-2-3"):
+        assert parse_event_id(raw) is None
@@ -0,0 +1,100 @@
+"""
+Tests for the shared-memory tick ring, leader election and follower price feeds
+"""
+import multiprocessing
+
+from price_feed import PriceFeed
+from tick_ring import HEADER_SIZE, SLOT_SIZE, TickRing
+
+
+def test_append_and_read_back(tmp_path):
+    ring = TickRing(str(tmp_path / "ticks.ring"), capacity=8)
+    assert ring.latest() is None
+    ring.append(116000, 40.0, 83.5, 2680.0, "shankar", ts=1000.0)
+    ring.append(116100, None, None, None, "spot_estimate", ts=1001.0)
+
+    first, second = ring.recent(2)
+    assert first == {
+        "index": 0, "ts": 1000.0, "retail_price": 116000, "retail_source": "shankar",
+        "spot_usd": 40.0, "exchange_rate": 83.5, "premium": 2680.0,
+    }
+    assert second["spot_usd"] is None and second["premium"] is None
+    assert ring.latest()["retail_price"] == 116100
+    assert ring.since(1) == ([second], 2)
+
+
+def test_wraps_around_and_keeps_the_newest(tmp_path):
+    ring = TickRing(str(tmp_path / "ticks.ring"), capacity=4)
+    for i in range(10):
+        ring.append(116000 + i, 40.0, 83.0, 0.0)
+    ticks, cursor = ring.since(0)
+    assert [tick["index"] for tick in ticks] == [6, 7, 8, 9]
+    assert cursor == 10
+    assert ring.since(cursor) == ([], 10)
+
+
+def test_reader_skips_a_slot_being_written(tmp_path):
+    ring = TickRing(str(tmp_path / "ticks.ring"), capacity=4)
+    ring.append(116000, 40.0, 83.0, 0.0)
+    ring._map[HEADER_SIZE] |= 1  # writer "inside" slot 0
+    assert ring.since(0) == ([], 1)
+
+
+def test_leader_lock_is_exclusive_until_released(tmp_path):
+    path = str(tmp_path / "ticks.ring")
+    worker_a, worker_b = TickRing(path, capacity=4), TickRing(path, capacity=4)
+    assert worker_a.lead()
+    assert not worker_b.lead()
+    worker_a.close()
+    assert worker_b.lead()
+
+
+def _write_ticks(path, n):
+    ring = TickRing(path, capacity=16)
+    for i in range(1, n + 1):
+        ring.append(i, i, i, i)
+
+
+def test_concurrent_reads_never_see_torn_ticks(tmp_path):
+    path = str(tmp_path / "ticks.ring")
+    ring = TickRing(path, capacity=16)
+    writer = multiprocessing.get_context("fork").Process(target=_write_ticks, args=(path, 20000))
+    writer.start()
+    seen = 0
+    while writer.is_alive() or seen == 0:
+        for tick in ring.recent(16):
+            # Every field of a tick was written with the same value
+            assert tick["retail_price"] == tick["spot_usd"] == tick["exchange_rate"] == tick["premium"]
+            seen += 1
+    writer.join()
+    assert ring.count() == 20000
+    assert seen > 0
+
+
+def test_follower_reads_the_leaders_quotes_without_fetching(tmp_path):
+    path = str(tmp_path / "ticks.ring")
+    fetched = {"leader": 0, "follower": 0}
+    seen = {"leader": [], "follower": []}
+
+    def make_feed(name):
+        def fetch_retail():
+            fetched[name] += 1
+            return {"currVal": 116000, "source": "shankar"}
+
+        feed = PriceFeed(fetch_retail, lambda: {"spot_usd": 40.0, "exchange_rate": 83.0},
+                         ring=TickRing(path, capacity=8), first_tick_wait=0)
+        feed.start = lambda: None  # drive refreshes by hand
+        feed.subscribe(lambda snapshot: seen[name].append(snapshot["retail_price"]), leader_only=True)
+        return feed
+
+    leader, follower = make_feed("leader"), make_feed("follower")
+    assert leader.is_leader() and not follower.is_leader()
+    leader.refresh()
+
+    snapshot = follower.snapshot()
+    assert snapshot["retail_price"] == 116000
+    assert snapshot["retail_source"] == "shankar"
+    assert snapshot["stale"] is False
+    assert fetched == {"leader": 1, "follower": 0}
+    assert seen == {"leader": [116000], "follower": []}
+    assert follower.status()["role"] == "follower"
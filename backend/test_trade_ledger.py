@@ -0,0 +1,113 @@
+"""
+Tests for the SQLite trade ledger in trade_ledger.py
+"""
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+import pytest
+
+from trade_ledger import TradeLedger, parse_trade_id
+
+
+def test_buy_sell_roundtrip_survives_reopen(tmp_path):
+    path = str(tmp_path / "trades.sqlite3")
+    ledger = TradeLedger(path)
+    trade_id, trade = ledger.open_trade(110000, 500, 300)
+    assert ledger.active_trades() == {trade_id: trade}
+
+    closed = ledger.close_trade(trade_id, 110500, "target")
+    assert closed["pnl"] == 500
+    assert closed["target_profit"] == 500 and closed["stop_loss"] == 300
+
+    reopened = TradeLedger(path)
+    assert reopened.active_trades() == {}
+    assert reopened.completed_trades() == [closed]
+    assert reopened.total_pnl() == 500
+
+
+def test_trade_ids_never_collide_and_close_only_once(tmp_path):
+    ledger = TradeLedger(str(tmp_path / "trades.sqlite3"))
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        ids = list(pool.map(lambda _: ledger.open_trade(100, 10, 5)[0], range(50)))
+    assert len(set(ids)) == 50
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(lambda _: ledger.close_trade(ids[0], 120), range(8)))
+    assert sum(r is not None for r in results) == 1
+    assert ledger.close_trade("trade_x", 120) is None
+
+
+def test_aggregates_track_every_sell(tmp_path):
+    ledger = TradeLedger(str(tmp_path / "trades.sqlite3"))
+    for sell, reason in [(150, "target"), (80, "stop_loss"), (60, "stop_loss"), (130, "manual")]:
+        trade_id, _ = ledger.open_trade(100, 50, 20)
+        ledger.close_trade(trade_id, sell, reason)
+
+    stats = ledger.stats()
+    assert stats["total_pnl"] == 20
+    assert (stats["total_trades"], stats["winning_trades"], stats["losing_trades"]) == (4, 2, 2)
+    assert stats["average_win"] == 40 and stats["average_loss"] == -30
+    assert stats["max_drawdown"] == 60  # +50 peak, then -20 and -40
+    assert stats["by_reason"]["stop_loss"] == {
+        "trades": 2, "winning_trades": 0, "losing_trades": 2, "total_pnl": -60,
+    }
+
+
+def test_aggregates_are_rebuilt_from_existing_history(tmp_path):
+    path = str(tmp_path / "trades.sqlite3")
+    ledger = TradeLedger(path)
+    for sell in (120, 90):
+        trade_id, _ = ledger.open_trade(100, 50, 20)
+        ledger.close_trade(trade_id, sell)
+    expected = ledger.stats()
+
+    ledger._conn().execute("DELETE FROM equity_stats")
+    assert TradeLedger(path).stats() == expected
+
+
+def test_history_pages_with_cursor_and_time_range(tmp_path):
+    ledger = TradeLedger(str(tmp_path / "trades.sqlite3"))
+    ids = []
+    for _ in range(5):
+        trade_id, _ = ledger.open_trade(100, 50, 20)
+        ledger.close_trade(trade_id, 110)
+        ids.append(trade_id)
+
+    page, cursor = ledger.completed_page(limit=2)
+    assert [t["trade_id"] for t in page] == ids[:-3:-1]
+    page, cursor = ledger.completed_page(limit=2, cursor=cursor)
+    assert [t["trade_id"] for t in page] == ids[2:0:-1]
+    page, cursor = ledger.completed_page(limit=2, cursor=cursor)
+    assert [t["trade_id"] for t in page] == ids[:1] and cursor is None
+
+    assert ledger.completed_page(since="2999-01-01") == ([], None)
+    assert len(ledger.completed_page(until="2999-01-01")[0]) == 5
+    with pytest.raises(ValueError):
+        ledger.completed_page(cursor="bogus")
+    with pytest.raises(ValueError):
+        ledger.completed_page(since="yesterday")
+
+
+def test_history_follows_sell_time_and_breaks_ties_by_id(tmp_path):
+    ledger = TradeLedger(str(tmp_path / "trades.sqlite3"))
+    ids = [ledger.open_trade(100, 50, 20)[0] for _ in range(4)]
+    for trade_id in ids:
+        ledger.close_trade(trade_id, 110)
+    sold = {ids[0]: "2024-06-03T10:00:00", ids[1]: "2024-06-01T10:00:00",
+            ids[2]: "2024-06-02T10:00:00", ids[3]: "2024-06-02T10:00:00"}
+    for trade_id, sell_time in sold.items():
+        ledger._conn().execute("UPDATE trades SET sell_time = ? WHERE id = ?",
+                               (sell_time, parse_trade_id(trade_id)))
+
+    pages, cursor = [], None
+    while True:
+        page, cursor = ledger.completed_page(limit=1, cursor=cursor)
+        pages += [t["trade_id"] for t in page]
+        if cursor is None:
+            break
+    assert pages == [ids[0], ids[3], ids[2], ids[1]]
+
+    # Dates, naive and offset-aware datetimes all compare with stored local times
+    assert [t["trade_id"] for t in ledger.completed_page(since="2024-06-02")[0]] == [ids[0], ids[3], ids[2]]
+    local = datetime(2024, 6, 2, 10).astimezone()
+    assert len(ledger.completed_page(until=local.astimezone(timezone.utc).isoformat())[0]) == 1
@@ -0,0 +1,79 @@
+"""
+Tests for the take-profit / stop-loss trigger engine in trigger_engine.py
+"""
+from trade_ledger import TradeLedger
+from trigger_engine import TriggerEngine
+
+
+def make_engine(tmp_path):
+    ledger = TradeLedger(str(tmp_path / "trades.sqlite3"))
+    return ledger, TriggerEngine(ledger.close_trade)
+
+
+def test_crossed_trades_close_with_reason(tmp_path):
+    ledger, engine = make_engine(tmp_path)
+    ids = {}
+    for buy in (100, 110, 120):
+        trade_id, trade = ledger.open_trade(buy, 20, 20)
+        engine.add_trade(trade_id, trade)
+        ids[buy] = trade_id
+
+    assert engine.on_price(110) == []
+    closed = engine.on_price(121) + engine.on_price(99)
+    assert [(t["trade_id"], t["reason"], t["sell_price"]) for t in closed] == [
+        (ids[100], "target", 121), (ids[120], "stop_loss", 99),
+    ]
+    assert list(ledger.active_trades()) == [ids[110]]
+    assert len(engine) == 1
+
+
+def test_trades_sold_elsewhere_are_skipped(tmp_path):
+    ledger, engine = make_engine(tmp_path)
+    manual, trade = ledger.open_trade(100, 10, 5)
+    engine.add_trade(manual, trade)
+    remote, trade = ledger.open_trade(100, 10, 5)
+    engine.add_trade(remote, trade)
+
+    ledger.close_trade(manual, 101)
+    engine.remove(manual)
+    ledger.close_trade(remote, 101)  # e.g. sold through another worker
+
+    assert engine.on_price(200) == []
+    assert engine.stats()["missed"] == 1
+
+
+def test_sync_picks_up_trades_opened_elsewhere(tmp_path):
+    ledger, engine = make_engine(tmp_path)
+    other = TradeLedger(ledger.path)
+    trade_id, _ = other.open_trade(100, 10, 5)
+
+    engine.sync(ledger)
+    engine.sync(ledger)
+    assert len(engine) == 1
+    assert [t["trade_id"] for t in engine.on_price(94)] == [trade_id]
+
+
+def test_sync_watermark_ignores_local_adds(tmp_path):
+    ledger, engine = make_engine(tmp_path)
+    other = TradeLedger(ledger.path)
+    remote, _ = other.open_trade(100, 10, 5)  # another worker, lower row id
+    local, trade = ledger.open_trade(100, 20, 8)
+    engine.add_trade(local, trade)
+
+    engine.sync(ledger)
+    assert len(engine) == 2
+    assert [t["trade_id"] for t in engine.on_price(110)] == [remote]
+
+
+def test_fallback_prices_never_fire_triggers(tmp_path):
+    ledger, engine = make_engine(tmp_path)
+    trade_id, trade = ledger.open_trade(100, 10, 5)
+    engine.add_trade(trade_id, trade)
+
+    for source in ("default", "spot_estimate", None):
+        assert engine.on_snapshot({"retail_price": 200, "retail_source": source}) == []
+    assert list(ledger.active_trades()) == [trade_id]
+    assert engine.stats()["skipped"] == 3
+
+    closed = engine.on_snapshot({"retail_price": 200, "retail_source": "shankar"})
+    assert [(t["trade_id"], t["reason"]) for t in closed] == [(trade_id, "target")]
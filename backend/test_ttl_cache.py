@@ -0,0 +1,48 @@
+"""
+Tests for ttl_cache.TTLCache
+"""
+import threading
+import time
+
+from ttl_cache import TTLCache
+
+
+def test_concurrent_misses_share_one_load():
+    cache = TTLCache()
+    calls = []
+    gate = threading.Event()
+
+    def loader():
+        calls.append(1)
+        gate.wait(1)
+        return "value"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_load("k", loader, ttl=60)))
+               for _ in range(10)]
+    for t in threads:
+        t.start()
+    time.sleep(0.05)
+    gate.set()
+    for t in threads:
+        t.join()
+
+    assert calls == [1]
+    assert results == ["value"] * 10
+    assert cache.stats()["coalesced"] == 9
+
+
+def test_ttl_expiry_and_lru_eviction():
+    cache = TTLCache(maxsize=2)
+    cache.set("a", 1, ttl=0.01)
+    cache.set("b", 2, ttl=60)
+    time.sleep(0.02)
+    assert cache.get("a") is None
+    assert cache.get("b") == 2
+
+    cache.set("c", 3, ttl=60)
+    cache.get("b")
+    cache.set("d", 4, ttl=60)  # evicts "c", the least recently used
+    assert cache.get("c") is None
+    assert cache.get("b") == 2
+    assert cache.stats()["evictions"] == 1
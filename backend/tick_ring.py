@@ -0,0 +1,186 @@
+"""
+Cross-process tick ring buffer on a memory-mapped file, plus leader election.
+
+One process, the holder of an exclusive `flock` on `<ring>.lock`, fetches
+prices upstream and appends fixed-size tick records; every other worker
+maps the same file and reads ticks without taking any lock. Each 64-byte
+slot carries a sequence number that is odd while the writer is inside it
+(a seqlock): a reader copies the slot and retries if the sequence was odd
+or changed underneath it. Records are unpacked straight from the shared
+pages with `struct.unpack_from`, no intermediate copy of the buffer.
+
+The OS drops the flock when the leader exits, so another worker takes
+over on its next poll.
+"""
+import math
+import mmap
+import os
+import struct
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows: a single process, always the leader
+    fcntl = None
+
+TICK_RING_PATH = os.getenv(
+    "TICK_RING_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "ticks.ring")
+)
+TICK_RING_CAPACITY = int(os.getenv("TICK_RING_CAPACITY", "4096"))  # ticks kept
+
+MAGIC = b"TICKRNG1"
+# magic, capacity, reserved, ticks written
+_HEADER = struct.Struct("<8sIIQ")
+HEADER_SIZE = 64
+_COUNT = struct.Struct("<Q")
+_COUNT_OFFSET = 16
+# seq, tick index, ts, retail, spot_usd, exchange_rate, premium, retail source code
+_SLOT = struct.Struct("<QQdddddI4x")
+SLOT_SIZE = _SLOT.size
+_SEQ = struct.Struct("<Q")
+
+# Retail price sources (see price_resolver) stored as small integer codes
+RETAIL_SOURCES = (None, "shankar", "spot_estimate", "default")
+_READ_RETRIES = 100
+
+
+def _encode(value):
+    return math.nan if value is None else float(value)
+
+
+def _decode(value):
+    return None if math.isnan(value) else value
+
+
+def _decode_price(value):
+    """Retail prices are whole rupees unless the source said otherwise"""
+    return None if math.isnan(value) else int(value) if value.is_integer() else value
+
+
+class LeaderLock:
+    """Non-blocking exclusive flock; held until `release()` or process exit"""
+
+    def __init__(self, path):
+        self.path = path
+        self._fd = None
+
+    @property
+    def held(self):
+        return self._fd is not None
+
+    def acquire(self):
+        """True if this process is (now) the leader"""
+        if self._fd is not None:
+            return True
+        if fcntl is None:
+            self._fd = -1
+            return True
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+        self._fd = fd
+        return True
+
+    def release(self):
+        if self._fd is not None and self._fd >= 0:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+        self._fd = None
+
+
+class TickRing:
+    def __init__(self, path=TICK_RING_PATH, capacity=TICK_RING_CAPACITY):
+        self.path = path
+        self.capacity = capacity
+        self.leader = LeaderLock(path + ".lock")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        size = HEADER_SIZE + capacity * SLOT_SIZE
+
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX)  # serialize first-time initialization
+            header = os.read(fd, _HEADER.size)
+            valid = len(header) == _HEADER.size and _HEADER.unpack(header)[:2] == (MAGIC, capacity)
+            if not valid or os.fstat(fd).st_size != size:
+                os.ftruncate(fd, 0)
+                os.ftruncate(fd, size)
+                os.lseek(fd, 0, os.SEEK_SET)
+                os.write(fd, _HEADER.pack(MAGIC, capacity, 0, 0))
+            self._map = mmap.mmap(fd, size)
+        finally:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            os.close(fd)
+
+    def lead(self):
+        """Try to become the ingestion leader (cheap when already leading or already taken)"""
+        return self.leader.acquire()
+
+    def count(self):
+        """Ticks written since the ring was created; also the next tick's index"""
+        return _COUNT.unpack_from(self._map, _COUNT_OFFSET)[0]
+
+    def append(self, retail, spot_usd, exchange_rate, premium, source=None, ts=None):
+        """Leader only: write one tick into the next slot"""
+        index = self.count()
+        offset = HEADER_SIZE + (index % self.capacity) * SLOT_SIZE
+        seq = _SEQ.unpack_from(self._map, offset)[0]
+        _SEQ.pack_into(self._map, offset, seq + 1)  # odd: write in progress
+        _SLOT.pack_into(
+            self._map, offset, seq + 1, index, time.time() if ts is None else ts,
+            _encode(retail), _encode(spot_usd), _encode(exchange_rate), _encode(premium),
+            RETAIL_SOURCES.index(source) if source in RETAIL_SOURCES else 0,
+        )
+        _SEQ.pack_into(self._map, offset, seq + 2)
+        _COUNT.pack_into(self._map, _COUNT_OFFSET, index + 1)
+        return index
+
+    def _read_slot(self, slot):
+        offset = HEADER_SIZE + slot * SLOT_SIZE
+        for _ in range(_READ_RETRIES):
+            before = _SEQ.unpack_from(self._map, offset)[0]
+            if before & 1:
+                continue
+            record = _SLOT.unpack_from(self._map, offset)
+            if record[0] == before and _SEQ.unpack_from(self._map, offset)[0] == before:
+                return record
+        return None
+
+    def since(self, cursor):
+        """Ticks with index >= cursor still in the ring, oldest first -> (ticks, next_cursor)"""
+        count = self.count()
+        ticks = []
+        for index in range(max(cursor, count - self.capacity), count):
+            record = self._read_slot(index % self.capacity)
+            if record is None or record[1] != index:
+                continue  # overwritten by a newer lap while we read
+            _, _, ts, retail, spot_usd, exchange_rate, premium, source = record
+            ticks.append({
+                "index": index,
+                "ts": ts,
+                "retail_price": _decode_price(retail),
+                "retail_source": RETAIL_SOURCES[source] if source < len(RETAIL_SOURCES) else None,
+                "spot_usd": _decode(spot_usd),
+                "exchange_rate": _decode(exchange_rate),
+                "premium": _decode(premium),
+            })
+        return ticks, count
+
+    def recent(self, n):
+        """The last `n` ticks, oldest first"""
+        return self.since(max(0, self.count() - n))[0]
+
+    def latest(self):
+        ticks = self.recent(1)
+        return ticks[-1] if ticks else None
+
+    def status(self):
+        return {"path": self.path, "capacity": self.capacity, "ticks_written": self.count(), "leader": self.leader.held}
+
+    def close(self):
+        self.leader.release()
+        self._map.close()
@@ -0,0 +1,356 @@
+"""
+Durable trade ledger on SQLite in WAL mode.
+
+Trades live in one table indexed by id and status, so every gunicorn worker
+(and every restart) sees the same book. Buys and sells each run in a single
+`BEGIN IMMEDIATE` transaction, which serializes writers across processes:
+a trade can only be closed once, and ids come from AUTOINCREMENT so they
+are never reused.
+
+Every buy and sell also appends a `trade_events` row in its transaction;
+workers relay those rows to their SSE subscribers, so an auto-close on the
+leader reaches dashboards connected to any worker.
+
+Portfolio aggregates (P&L, win/loss counts and sums, per-reason totals and
+the running max drawdown) are updated inside the same transaction as each
+sell, so reading them never rescans the history.
+"""
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+TRADES_DB_PATH = os.getenv(
+    "TRADES_DB_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "trades.sqlite3")
+)
+
+_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS trades (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        status TEXT NOT NULL DEFAULT 'open',
+        buy_price REAL NOT NULL,
+        booked_profit REAL NOT NULL,
+        min_loss REAL NOT NULL,
+        buy_time TEXT NOT NULL,
+        sell_price REAL,
+        pnl REAL,
+        pnl_percentage REAL,
+        reason TEXT,
+        sell_time TEXT
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_trades_status ON trades (status, id)",
+    "CREATE INDEX IF NOT EXISTS idx_trades_sold ON trades (status, sell_time, id)",
+    """
+    CREATE TABLE IF NOT EXISTS reason_stats (
+        reason TEXT PRIMARY KEY,
+        trades INTEGER NOT NULL DEFAULT 0,
+        wins INTEGER NOT NULL DEFAULT 0,
+        losses INTEGER NOT NULL DEFAULT 0,
+        total_pnl REAL NOT NULL DEFAULT 0,
+        win_pnl REAL NOT NULL DEFAULT 0,
+        loss_pnl REAL NOT NULL DEFAULT 0
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS equity_stats (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        equity REAL NOT NULL,
+        peak REAL NOT NULL,
+        max_drawdown REAL NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS trade_events (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        data TEXT NOT NULL
+    )
+    """,
+]
+
+HISTORY_PAGE_SIZE = int(os.getenv("HISTORY_PAGE_SIZE", "50"))
+HISTORY_MAX_PAGE_SIZE = 500
+TRADE_EVENTS_KEPT = int(os.getenv("TRADE_EVENTS_KEPT", "1000"))  # newest rows kept for relays
+
+
+def format_trade_id(row_id):
+    return f"trade_{row_id}"
+
+
+def parse_trade_id(trade_id):
+    """Row id for a "trade_<n>" string, or None if it is malformed"""
+    prefix, _, number = str(trade_id).partition("_")
+    return int(number) if prefix == "trade" and number.isdigit() else None
+
+
+def format_cursor(trade):
+    """History cursor after a completed trade: <trade_id>@<sell_time>"""
+    return f"{trade['trade_id']}@{trade['sell_time']}"
+
+
+def parse_cursor(cursor):
+    """(sell_time, row id) for a history cursor"""
+    trade_id, _, sell_time = str(cursor).partition("@")
+    row_id = parse_trade_id(trade_id)
+    if row_id is None or not sell_time:
+        raise ValueError(f"Invalid cursor: {cursor}")
+    return sell_time, row_id
+
+
+def normalize_time(value):
+    """
+    An ISO date or datetime as stored trade times are written (naive local
+    time, `datetime.isoformat()`), so they compare as strings; aware values
+    are converted to local time first.
+    """
+    try:
+        parsed = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid timestamp: {value}")
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone().replace(tzinfo=None)
+    return parsed.isoformat()
+
+
+def _active_view(row):
+    return {
+        "buy_price": row["buy_price"],
+        "booked_profit": row["booked_profit"],
+        "min_loss": row["min_loss"],
+        "timestamp": row["buy_time"],
+    }
+
+
+def _completed_view(row):
+    return {
+        "trade_id": format_trade_id(row["id"]),
+        "buy_price": row["buy_price"],
+        "sell_price": row["sell_price"],
+        "pnl": row["pnl"],
+        "pnl_percentage": row["pnl_percentage"],
+        "reason": row["reason"],
+        "buy_time": row["buy_time"],
+        "sell_time": row["sell_time"],
+        "target_profit": row["booked_profit"],
+        "stop_loss": row["min_loss"],
+    }
+
+
+class TradeLedger:
+    def __init__(self, path=TRADES_DB_PATH):
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._local = threading.local()
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        for statement in _SCHEMA:
+            conn.execute(statement)
+        with self._transaction() as conn:
+            if conn.execute("SELECT 1 FROM equity_stats").fetchone() is None:
+                self._rebuild_stats(conn)
+
+    def _conn(self):
+        """One connection per thread; sqlite connections are not thread-safe"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA synchronous=NORMAL")  # durable across crashes in WAL mode
+            self._local.conn = conn
+        return conn
+
+    def _transaction(self):
+        return _Transaction(self._conn())
+
+    def open_trade(self, buy_price, booked_profit, min_loss):
+        """Record a buy and return `(trade_id, active_trade)`"""
+        buy_time = datetime.now().isoformat()
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "INSERT INTO trades (buy_price, booked_profit, min_loss, buy_time) VALUES (?, ?, ?, ?)",
+                (buy_price, booked_profit, min_loss, buy_time),
+            )
+            trade = {
+                "buy_price": buy_price,
+                "booked_profit": booked_profit,
+                "min_loss": min_loss,
+                "timestamp": buy_time,
+            }
+            trade_id = format_trade_id(cursor.lastrowid)
+            self._record_event(conn, {"action": "buy", "trade_id": trade_id, **trade})
+        return trade_id, trade
+
+    def close_trade(self, trade_id, sell_price, reason="manual"):
+        """Close an open trade atomically; None if it is unknown or already closed"""
+        row_id = parse_trade_id(trade_id)
+        if row_id is None:
+            return None
+
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT * FROM trades WHERE id = ? AND status = 'open'", (row_id,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            pnl = sell_price - row["buy_price"]
+            pnl_percentage = (pnl / row["buy_price"]) * 100
+            sell_time = datetime.now().isoformat()
+            conn.execute(
+                "UPDATE trades SET status = 'closed', sell_price = ?, pnl = ?, pnl_percentage = ?, "
+                "reason = ?, sell_time = ? WHERE id = ?",
+                (sell_price, pnl, pnl_percentage, reason, sell_time, row_id),
+            )
+            self._record_sell(conn, pnl, reason)
+            closed = dict(row)
+            closed.update(sell_price=sell_price, pnl=pnl, pnl_percentage=pnl_percentage,
+                          reason=reason, sell_time=sell_time)
+            completed = _completed_view(closed)
+            self._record_event(conn, {"action": "sell", **completed})
+        return completed
+
+    @staticmethod
+    def _record_event(conn, data):
+        event_id = conn.execute("INSERT INTO trade_events (data) VALUES (?)", (json.dumps(data),)).lastrowid
+        conn.execute("DELETE FROM trade_events WHERE id <= ?", (event_id - TRADE_EVENTS_KEPT,))
+
+    def last_event_id(self):
+        row = self._conn().execute("SELECT MAX(id) FROM trade_events").fetchone()
+        return row[0] or 0
+
+    def events_after(self, event_id, limit=100):
+        """Trade events newer than `event_id`, oldest first, as (id, data)"""
+        rows = self._conn().execute(
+            "SELECT id, data FROM trade_events WHERE id > ? ORDER BY id LIMIT ?", (event_id, limit)
+        ).fetchall()
+        return [(row["id"], json.loads(row["data"])) for row in rows]
+
+    def get_active_trade(self, trade_id):
+        row_id = parse_trade_id(trade_id)
+        if row_id is None:
+            return None
+        row = self._conn().execute(
+            "SELECT * FROM trades WHERE id = ? AND status = 'open'", (row_id,)
+        ).fetchone()
+        return _active_view(row) if row else None
+
+    def active_trades(self):
+        """{trade_id: trade} for every open position"""
+        rows = self._conn().execute("SELECT * FROM trades WHERE status = 'open' ORDER BY id")
+        return {format_trade_id(row["id"]): _active_view(row) for row in rows}
+
+    def open_trades_after(self, row_id):
+        """[(trade_id, trade)] for open trades with a row id above `row_id`"""
+        rows = self._conn().execute(
+            "SELECT * FROM trades WHERE status = 'open' AND id > ? ORDER BY id", (row_id,)
+        )
+        return [(format_trade_id(row["id"]), _active_view(row)) for row in rows]
+
+    def completed_trades(self):
+        rows = self._conn().execute("SELECT * FROM trades WHERE status = 'closed' ORDER BY id")
+        return [_completed_view(row) for row in rows]
+
+    def completed_page(self, limit=HISTORY_PAGE_SIZE, cursor=None, since=None, until=None):
+        """
+        Page of completed trades, most recently sold first, and the cursor
+        for the next one.
+
+        `cursor` is the `next_cursor` of the previous page; `since`/`until`
+        are ISO dates or datetimes bounding the sell time. Pages are keyset
+        queries on (sell_time, id), so they cost the same at any depth.
+        """
+        limit = max(1, min(int(limit), HISTORY_MAX_PAGE_SIZE))
+        clauses, params = ["status = 'closed'"], []
+        if cursor is not None:
+            clauses.append("(sell_time, id) < (?, ?)")
+            params.extend(parse_cursor(cursor))
+        if since is not None:
+            clauses.append("sell_time >= ?")
+            params.append(normalize_time(since))
+        if until is not None:
+            clauses.append("sell_time < ?")
+            params.append(normalize_time(until))
+
+        rows = self._conn().execute(
+            f"SELECT * FROM trades WHERE {' AND '.join(clauses)} ORDER BY sell_time DESC, id DESC LIMIT ?",
+            (*params, limit + 1),
+        ).fetchall()
+        trades = [_completed_view(row) for row in rows[:limit]]
+        next_cursor = format_cursor(trades[-1]) if len(rows) > limit else None
+        return trades, next_cursor
+
+    def total_pnl(self):
+        return self.stats()["total_pnl"]
+
+    @staticmethod
+    def _record_sell(conn, pnl, reason):
+        win, loss = int(pnl > 0), int(pnl < 0)
+        conn.execute(
+            "INSERT INTO reason_stats (reason, trades, wins, losses, total_pnl, win_pnl, loss_pnl) "
+            "VALUES (?, 1, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (reason) DO UPDATE SET trades = trades + 1, wins = wins + excluded.wins, "
+            "losses = losses + excluded.losses, total_pnl = total_pnl + excluded.total_pnl, "
+            "win_pnl = win_pnl + excluded.win_pnl, loss_pnl = loss_pnl + excluded.loss_pnl",
+            (reason, win, loss, pnl, pnl if win else 0.0, pnl if loss else 0.0),
+        )
+        # Drawdown of cumulative realized P&L, in the order sells committed
+        conn.execute(
+            "UPDATE equity_stats SET equity = equity + ?, peak = MAX(peak, equity + ?), "
+            "max_drawdown = MAX(max_drawdown, MAX(peak, equity + ?) - (equity + ?)) WHERE id = 1",
+            (pnl, pnl, pnl, pnl),
+        )
+
+    def _rebuild_stats(self, conn):
+        """Seed the aggregate tables from an existing history (first run after upgrade)"""
+        conn.execute("DELETE FROM reason_stats")
+        conn.execute("INSERT INTO equity_stats (id, equity, peak, max_drawdown) VALUES (1, 0, 0, 0)")
+        rows = conn.execute(
+            "SELECT pnl, reason FROM trades WHERE status = 'closed' ORDER BY sell_time, id"
+        ).fetchall()
+        for row in rows:
+            self._record_sell(conn, row["pnl"], row["reason"])
+
+    def stats(self):
+        """Portfolio aggregates over every completed trade; O(number of reasons)"""
+        conn = self._conn()
+        by_reason = {}
+        totals = {"trades": 0, "wins": 0, "losses": 0, "total_pnl": 0.0, "win_pnl": 0.0, "loss_pnl": 0.0}
+        for row in conn.execute("SELECT * FROM reason_stats ORDER BY reason"):
+            by_reason[row["reason"]] = {
+                "trades": row["trades"],
+                "winning_trades": row["wins"],
+                "losing_trades": row["losses"],
+                "total_pnl": round(row["total_pnl"], 2),
+            }
+            for key in totals:
+                totals[key] += row[key]
+        equity = conn.execute("SELECT * FROM equity_stats WHERE id = 1").fetchone()
+
+        return {
+            "total_pnl": round(totals["total_pnl"], 2),
+            "total_trades": totals["trades"],
+            "winning_trades": totals["wins"],
+            "losing_trades": totals["losses"],
+            "average_win": round(totals["win_pnl"] / totals["wins"], 2) if totals["wins"] else 0,
+            "average_loss": round(totals["loss_pnl"] / totals["losses"], 2) if totals["losses"] else 0,
+            "max_drawdown": round(equity["max_drawdown"], 2) if equity else 0,
+            "by_reason": by_reason,
+        }
+
+
+class _Transaction:
+    """`BEGIN IMMEDIATE` ... COMMIT/ROLLBACK; takes the write lock up front"""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        self.conn.execute("BEGIN IMMEDIATE")
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+        return False
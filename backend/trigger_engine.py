@@ -0,0 +1,114 @@
+"""
+Server-side take-profit / stop-loss triggers for open trades.
+
+Open positions are indexed by trigger price in two heaps: a min-heap of
+targets (fires when the price rises to it) and a max-heap of stops (fires
+when the price falls to it). A tick only pops the entries it crossed, so
+its cost depends on the number of triggered trades, not on the number of
+open ones. Trades closed some other way are dropped lazily when their
+heap entries surface.
+"""
+import heapq
+import threading
+
+from trade_ledger import parse_trade_id
+
+# Only scraped retail quotes may fire triggers; fallback prices are placeholders
+TRIGGER_SOURCES = ("shankar",)
+
+
+def trigger_prices(trade):
+    """(target, stop) in INR for a ledger trade; booked_profit/min_loss are rupee amounts"""
+    return trade["buy_price"] + trade["booked_profit"], trade["buy_price"] - trade["min_loss"]
+
+
+class TriggerEngine:
+    def __init__(self, close_trade):
+        """`close_trade(trade_id, price, reason)` closes a position and returns it, or None"""
+        self.close_trade = close_trade
+        self.targets = []  # (target, trade_id)
+        self.stops = []  # (-stop, trade_id)
+        self.live = {}  # trade_id -> (target, stop)
+        self.synced_row_id = 0  # ledger rows seen by sync(); local adds don't move it
+        self.lock = threading.Lock()
+        self.counters = {"ticks": 0, "target": 0, "stop_loss": 0, "missed": 0, "skipped": 0}
+
+    def __len__(self):
+        return len(self.live)
+
+    def add(self, trade_id, target, stop):
+        with self.lock:
+            self.live[trade_id] = (target, stop)
+            heapq.heappush(self.targets, (target, trade_id))
+            heapq.heappush(self.stops, (-stop, trade_id))
+
+    def add_trade(self, trade_id, trade):
+        self.add(trade_id, *trigger_prices(trade))
+
+    def remove(self, trade_id):
+        """Stop watching a trade (e.g. after a manual /sell); its heap entries expire lazily"""
+        with self.lock:
+            self.live.pop(trade_id, None)
+            self._compact()
+
+    def _compact(self):
+        # Rebuild once dead entries dominate so the heaps stay O(open trades)
+        if len(self.targets) > 2 * len(self.live) + 64:
+            self.targets = [(t, i) for i, (t, _) in self.live.items()]
+            self.stops = [(-s, i) for i, (_, s) in self.live.items()]
+            heapq.heapify(self.targets)
+            heapq.heapify(self.stops)
+
+    def sync(self, ledger):
+        """Pick up trades opened since the last sync (e.g. by another worker)"""
+        for trade_id, trade in ledger.open_trades_after(self.synced_row_id):
+            if trade_id not in self.live:
+                self.add_trade(trade_id, trade)
+            self.synced_row_id = max(self.synced_row_id, parse_trade_id(trade_id) or 0)
+
+    def crossed(self, price):
+        """Pop every live trade whose target or stop `price` reached -> [(trade_id, reason)]"""
+        hits = []
+        with self.lock:
+            self.counters["ticks"] += 1
+            while self.targets and self.targets[0][0] <= price:
+                _, trade_id = heapq.heappop(self.targets)
+                if self.live.pop(trade_id, None) is not None:
+                    hits.append((trade_id, "target"))
+            while self.stops and -self.stops[0][0] >= price:
+                _, trade_id = heapq.heappop(self.stops)
+                if self.live.pop(trade_id, None) is not None:
+                    hits.append((trade_id, "stop_loss"))
+            self._compact()
+        return hits
+
+    def on_price(self, price):
+        """Close every trade crossed by `price`; returns the closed trades"""
+        if not price:
+            return []
+        closed = []
+        for trade_id, reason in self.crossed(price):
+            try:
+                trade = self.close_trade(trade_id, price, reason)
+            except Exception as e:
+                print(f"Error closing {trade_id} on {reason}: {e}")
+                trade = None
+            with self.lock:
+                if trade is None:
+                    self.counters["missed"] += 1  # already sold elsewhere
+                    continue
+                self.counters[reason] += 1
+            closed.append(trade)
+        return closed
+
+    def on_snapshot(self, snapshot):
+        """`on_price` for a price-feed snapshot; ticks priced by a fallback source are skipped"""
+        if snapshot.get("retail_source") not in TRIGGER_SOURCES:
+            with self.lock:
+                self.counters["skipped"] += 1
+            return []
+        return self.on_price(snapshot.get("retail_price"))
+
+    def stats(self):
+        with self.lock:
+            return {"open_positions": len(self.live), "heap_entries": len(self.targets), **self.counters}
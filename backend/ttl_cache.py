@@ -0,0 +1,131 @@
+"""
+Bounded LRU cache with per-entry TTLs and single-flight loading.
+
+`get_or_load(key, loader, ttl)` returns a fresh cached value when there is
+one. Otherwise exactly one caller runs `loader()` while concurrent callers
+for the same key wait for its result, so N simultaneous misses cost one
+upstream call.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+
+class _Flight:
+    """An in-progress load other callers can wait on"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class TTLCache:
+    def __init__(self, maxsize=256, name="cache"):
+        self.maxsize = maxsize
+        self.name = name
+        self._entries = OrderedDict()  # key -> (expires_at, stored_at, value)
+        self._flights = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0  # misses that waited on another caller's load
+        self.evictions = 0
+
+    def get(self, key):
+        """Fresh value for `key` or None (counts as a hit/miss)"""
+        with self._lock:
+            entry = self._lookup(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return entry[2]
+
+    def get_entry(self, key):
+        """(value, age_seconds) for a fresh entry, or None; does not touch counters"""
+        with self._lock:
+            entry = self._lookup(key)
+            if entry is None:
+                return None
+            return entry[2], time.monotonic() - entry[1]
+
+    def _lookup(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def set(self, key, value, ttl):
+        now = time.monotonic()
+        with self._lock:
+            self._entries[key] = (now + ttl, now, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_load(self, key, loader, ttl):
+        """Cached value for `key`, loading it once across concurrent callers"""
+        with self._lock:
+            entry = self._lookup(key)
+            if entry is not None:
+                self.hits += 1
+                return entry[2]
+            self.misses += 1
+
+        def load_and_store():
+            value = loader()
+            self.set(key, value, ttl)
+            return value
+
+        return self.load_once(key, load_and_store)
+
+    def load_once(self, key, loader):
+        """Run `loader()` once for all concurrent callers of the same key (no caching)"""
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = loader()
+            return flight.value
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "name": self.name,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "evictions": self.evictions,
+                "hit_ratio": round(self.hits / lookups, 3) if lookups else 0,
+            }
@@ -1,7 +1,20 @@
+import { useEffect, useState } from "react";
 import { LineChart, Line, XAxis, YAxis, Tooltip, ResponsiveContainer, Area, AreaChart } from "recharts";
 import { BarChart3 } from 'lucide-react';
 
-export default function PriceChart({ data }) {
+// Without a `data` prop the chart loads a server-side downsampled series
+export default function PriceChart({ data, series = "spot", range = "1y", points = 500 }) {
+  const [chartData, setChartData] = useState([]);
+
+  useEffect(() => {
+    if (data) return;
+    const params = new URLSearchParams({ series, range, points });
+    fetch(`${import.meta.env.VITE_BACKEND_URL}/chart-data?${params}`)
+      .then((res) => res.json())
+      .then((json) => setChartData(json.data || []))
+      .catch((err) => console.error("Error fetching chart data:", err));
+  }, [data, series, range, points]);
+
   return (
     <div className="bg-gradient-to-br from-white to-slate-50 p-8 rounded-3xl shadow-xl border border-slate-200/60 overflow-hidden">
       <div className="flex items-center justify-between mb-6">
@@ -19,7 +32,7 @@ export default function PriceChart({ data }) {
       
       <div className="relative">
         <ResponsiveContainer width="100%" height={350}>
-          <AreaChart data={data}>
+          <AreaChart data={data || chartData}>
             <defs>
               <linearGradient id="colorGradient" x1="0" y1="0" x2="0" y2="1">
                 <stop offset="5%" stopColor="#8b5cf6" stopOpacity={0.3}/>
@@ -4,6 +4,7 @@ import AIStatusCard from '../components/dashboard/AIStatusCard';
 import ArbitrageOpportunities from '../components/dashboard/ArbitrageOpportunities';
 import GlobalPriceMonitor from '../components/dashboard/GlobalPriceMonitor';
 import ProfitAnalytics from '../components/dashboard/ProfitAnalytics';
+import PriceChart from '../components/PriceChart';
 import CallAlertSystem from '../components/dashboard/CallAlertSystem';
 import TradeMonitoring from '../components/dashboard/TradeMonitoring';
 
@@ -106,6 +107,11 @@ export default function Dashboard() {
           <GlobalPriceMonitor isDarkMode={isDarkMode} />
         </div>
 
+        {/* Spot silver trend, downsampled server-side by /chart-data */}
+        <div className="mb-8">
+          <PriceChart series="spot" range="1y" />
+        </div>
+
         {/* Bottom Row - Profit Analytics */}
         <div className="mb-8">
           <ProfitAnalytics isDarkMode={isDarkMode} />
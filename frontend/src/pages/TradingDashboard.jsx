@@ -13,6 +13,7 @@ export default function TradingDashboard() {
   // Price and market data
   const [price, setPrice] = useState(null);
   const [lastPrice, setLastPrice] = useState(null);
+  const priceRef = useRef(null); // latest price for handlers that outlive a render
   const [loading, setLoading] = useState(true);
   const [isRefreshing, setIsRefreshing] = useState(false);
   const [isConnected, setIsConnected] = useState(false);
@@ -89,7 +90,8 @@ export default function TradingDashboard() {
 
       if (data.currVal && data.currVal !== "--") {
         const newPrice = parseFloat(data.currVal);
-        setLastPrice(price);
+        setLastPrice(priceRef.current);
+        priceRef.current = newPrice;
         setPrice(newPrice);
         setIsConnected(true);
         
@@ -157,6 +159,16 @@ export default function TradingDashboard() {
         }),
       });
 
+      if (res.status === 404) {
+        // The server's trigger engine already closed this position
+        setIsTrading(false);
+        setBuyPrice(null);
+        setCurrentPnL(0);
+        setTradeId(null);
+        fetchTradingHistory();
+        return;
+      }
+
       if (!res.ok) {
         if (reason === "manual") {
           addNotification("Failed to close position", "error");
@@ -216,11 +228,31 @@ export default function TradingDashboard() {
     fetchPrice();
     fetchTradingHistory();
     
+    let eventSource = null;
     if (autoRefresh) {
-      intervalRef.current = setInterval(fetchPrice, 10000);
+      if (window.EventSource) {
+        // Server pushes price ticks only when they change; EventSource resumes via Last-Event-ID
+        eventSource = new EventSource(`${import.meta.env.VITE_BACKEND_URL}/price-stream`);
+        eventSource.addEventListener("price", (event) => {
+          const data = JSON.parse(event.data);
+          if (data.currVal && data.currVal !== "--") {
+            const newPrice = parseFloat(data.currVal);
+            setLastPrice(priceRef.current);
+            priceRef.current = newPrice;
+            setPrice(newPrice);
+            setIsConnected(true);
+          }
+        });
+        eventSource.onerror = () => setIsConnected(false);
+      } else {
+        intervalRef.current = setInterval(fetchPrice, 10000);
+      }
     }
     
     return () => {
+      if (eventSource) {
+        eventSource.close();
+      }
       if (intervalRef.current) {
         clearInterval(intervalRef.current);
       }